@@ -0,0 +1,87 @@
+"""
+Benchmark for the shared message chunker.
+
+Runs the Telegram manual-test generator cases (long, multi, newline, word),
+repeated to larger sizes, through ``chunk_message`` and through the previous
+Discord splitter, which copied the remainder of the text for every chunk.
+
+Usage:
+    python benches/bench_chunking.py [--repeat 200] [--limit 4096]
+"""
+
+import argparse
+import importlib.util
+import time
+from pathlib import Path
+
+from zeroclaw_tools.integrations.chunking import chunk_message
+
+GENERATOR = (
+    Path(__file__).resolve().parents[2]
+    / "tests"
+    / "manual"
+    / "telegram"
+    / "generate_test_messages.py"
+)
+CASES = {
+    "long": "generate_long_message",
+    "multi": "generate_multi_chunk_message",
+    "newline": "generate_newline_message",
+    "word": "generate_word_boundary_message",
+}
+
+
+def load_cases() -> dict[str, str]:
+    """The generator's messages, by case name."""
+    spec = importlib.util.spec_from_file_location("generate_test_messages", GENERATOR)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return {name: getattr(module, func)() for name, func in CASES.items()}
+
+
+def legacy_split(text: str, max_len: int) -> list[str]:
+    """The splitter DiscordBot used before the shared chunker."""
+    if len(text) <= max_len:
+        return [text]
+    chunks = []
+    while text:
+        if len(text) <= max_len:
+            chunks.append(text)
+            break
+        pos = text.rfind("\n", 0, max_len)
+        if pos == -1:
+            pos = text.rfind(" ", 0, max_len)
+        if pos == -1:
+            pos = max_len
+        chunks.append(text[:pos].strip())
+        text = text[pos:].strip()
+    return chunks
+
+
+def best_of(func, *args, runs: int = 5) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200, help="Repeat each case this many times")
+    parser.add_argument("--limit", type=int, default=4096, help="Message limit (Telegram: 4096)")
+    args = parser.parse_args()
+
+    print(f"{'case':<8} {'chars':>10} {'chunks':>7} {'chunker ms':>11} {'legacy ms':>10}")
+    for name, message in load_cases().items():
+        text = message * args.repeat
+        chunks = chunk_message(text, args.limit)
+        assert all(len(chunk) <= args.limit for chunk in chunks)
+        new = best_of(chunk_message, text, args.limit)
+        old = best_of(legacy_split, text, args.limit)
+        print(f"{name:<8} {len(text):>10} {len(chunks):>7} {new * 1000:>11.2f} {old * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@
 Tests for zeroclaw-tools package.
 """
 
+import os
+import stat
+
 import pytest
 
 
@@ -39,6 +42,75 @@ def test_tool_decorator_custom_metadata():
     assert "Echo input back" in echo.description
 
 
+@pytest.mark.asyncio
+async def test_tool_decorator_options():
+    """Timeouts, retries, memoization and concurrency limits apply to sync and async tools."""
+    import asyncio
+    import time
+
+    from zeroclaw_tools import tool
+    from zeroclaw_tools.tools.base import get_tool_metrics
+
+    calls = []
+
+    @tool(cache_ttl=60, retries=2, retry_backoff=0.01)
+    def flaky(x: int) -> str:
+        """Fail on the first attempt."""
+        calls.append(x)
+        if len(calls) == 1:
+            raise RuntimeError("transient")
+        return f"ok {x}"
+
+    assert flaky.invoke({"x": 1}) == "ok 1"
+    assert await flaky.ainvoke({"x": 1}) == "ok 1"
+    assert calls == [1, 1]
+
+    @tool(timeout=0.05)
+    async def sleepy(seconds: float) -> str:
+        """Sleep for a while."""
+        await asyncio.sleep(seconds)
+        return "awake"
+
+    assert sleepy.invoke({"seconds": 0}) == "awake"
+    with pytest.raises(TimeoutError):
+        await sleepy.ainvoke({"seconds": 1})
+
+    running = []
+
+    @tool(max_concurrency=2)
+    def busy(n: int) -> int:
+        """Track how many calls overlap."""
+        running.append(1)
+        peak = len(running)
+        time.sleep(0.05)
+        running.pop()
+        return peak
+
+    peaks = await asyncio.gather(*(busy.ainvoke({"n": n}) for n in range(6)))
+    assert max(peaks) == 2
+
+    # Context variables reach tools run on worker threads, e.g. the memory namespace.
+    from zeroclaw_tools.tools.memory import _active_namespace, memory_namespace
+
+    @tool
+    def namespace() -> str:
+        """Report the active memory namespace."""
+        return _active_namespace.get()
+
+    @tool(timeout=5)
+    async def async_namespace() -> str:
+        """Report the active memory namespace."""
+        return _active_namespace.get()
+
+    with memory_namespace("discord:42"):
+        assert await namespace.ainvoke({}) == "discord:42"
+        assert async_namespace.invoke({}) == "discord:42"
+
+    metrics = get_tool_metrics()
+    assert metrics["flaky"]["retries"] == 1 and metrics["flaky"]["cache_hits"] == 1
+    assert metrics["sleepy"]["timeouts"] == 1 and metrics["busy"]["calls"] == 6
+
+
 def test_agent_creation():
     """Test that agent can be created with default tools."""
     from zeroclaw_tools import create_agent, shell, file_read, file_write
@@ -69,6 +141,54 @@ def test_cli_requires_message_when_not_interactive():
         parse_args([])
 
 
+def test_tool_registry_selection_and_lazy_loading():
+    """Tools are selected by name or glob and only imported when loaded."""
+    from zeroclaw_tools import tool
+    from zeroclaw_tools.__main__ import parse_args
+    from zeroclaw_tools.tools.registry import BUILTIN_TOOLS, ToolRegistry
+
+    @tool
+    def echo(text: str) -> str:
+        """Echo the text back."""
+        return text
+
+    registry = ToolRegistry(discover=False)
+    registry.register("echo", echo)
+    registry.register("ghost", "zeroclaw_missing_plugin:ghost")
+
+    assert registry.select("shell,file_*,-file_search") == [
+        "shell",
+        "file_read",
+        "file_read_many",
+        "file_write",
+        "file_edit",
+        "file_append",
+    ]
+    assert registry.select("echo,shell,echo") == ["echo", "shell"]
+    assert "ghost" in registry.select(None)
+    with pytest.raises(ValueError, match="Unknown tool 'nope'"):
+        registry.select("shell,nope")
+
+    assert [t.name for t in registry.load("echo,shell")] == ["echo", "shell"]
+    assert registry.is_loaded("shell") and not registry.is_loaded("web_search")
+    with pytest.raises(ModuleNotFoundError):
+        registry.get("ghost")
+
+    import importlib
+
+    for module in {target.partition(":")[0] for target in BUILTIN_TOOLS.values()}:
+        importlib.import_module(module)
+    from zeroclaw_tools.tools import shell, web_search
+    from zeroclaw_tools.tools.shell import shell as shell_tool
+
+    assert shell is shell_tool
+    assert shell.name == "shell" and web_search.name == "web_search"
+
+    assert parse_args(["--tools", "shell,file_*", "hi"]).tools == "shell,file_*"
+    with pytest.raises(SystemExit):
+        parse_args(["--tools", "nope", "hi"])
+
+
 @pytest.mark.asyncio
 async def test_invoke_in_event_loop_raises():
     """invoke() should fail fast when called from an active event loop."""
@@ -101,3 +221,1113 @@ async def test_file_tools(tmp_path):
 
     read_result = await file_read.ainvoke({"path": str(test_file)})
     assert "Hello, World!" in read_result
+
+    # Existing modes are kept; non-regular targets are written in place, not replaced.
+    test_file.chmod(0o600)
+    await file_write.ainvoke({"path": str(test_file), "content": "again"})
+    assert test_file.stat().st_mode & 0o777 == 0o600
+    fifo = tmp_path / "fifo"
+    os.mkfifo(fifo)
+    reader = os.open(fifo, os.O_RDONLY | os.O_NONBLOCK)
+    try:
+        await file_write.ainvoke({"path": str(fifo), "content": "piped"})
+        assert os.read(reader, 100) == b"piped"
+        assert stat.S_ISFIFO(fifo.stat().st_mode)
+    finally:
+        os.close(reader)
+
+
+@pytest.mark.asyncio
+async def test_file_read_windows(tmp_path):
+    """file_read serves line, byte, and tail windows with size/line headers."""
+    from zeroclaw_tools import file_read
+
+    test_file = tmp_path / "big.log"
+    test_file.write_text("".join(f"line {i}\n" for i in range(1, 1001)))
+
+    lines = await file_read.ainvoke({"path": str(test_file), "start_line": 10, "end_line": 12})
+    assert lines.splitlines()[1:] == ["line 10", "line 11", "line 12"]
+    assert "lines 10-12 of 1000" in lines
+
+    tail = await file_read.ainvoke({"path": str(test_file), "tail": 2})
+    assert tail.splitlines()[1:] == ["line 999", "line 1000"]
+
+    window = await file_read.ainvoke({"path": str(test_file), "offset": 0, "length": 6})
+    assert window.endswith("\nline 1")
+    assert f"of {test_file.stat().st_size}" in window
+
+    reversed_range = await file_read.ainvoke(
+        {"path": str(test_file), "start_line": 5, "end_line": 2}
+    )
+    assert reversed_range.startswith("Error:")
+    past_end = await file_read.ainvoke({"path": str(test_file), "start_line": 1001})
+    assert "no lines in range, 1000 total" in past_end
+
+    # procfs files report a size of 0 and cannot be mapped.
+    if os.path.exists("/proc/self/status"):
+        status = await file_read.ainvoke({"path": "/proc/self/status", "tail": 3})
+        assert len(status.splitlines()) == 4 and "lines " in status.splitlines()[0]
+
+
+@pytest.mark.asyncio
+async def test_file_read_many(tmp_path):
+    """file_read_many returns every file in order and honors the total budget."""
+    from zeroclaw_tools import file_read_many
+
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"f{i}.txt"
+        path.write_text(f"content-{i}" * 10)
+        paths.append(str(path))
+    paths.append(str(tmp_path / "missing.txt"))
+
+    result = await file_read_many.ainvoke({"paths": paths})
+    assert result.index("content-0") < result.index("content-1") < result.index("content-2")
+    assert "Error: File not found" in result
+
+    limited = await file_read_many.ainvoke({"paths": paths, "total_budget": 120})
+    assert "content-1" in limited
+    assert "content-2" not in limited
+    assert "total budget exhausted" in limited
+
+
+@pytest.mark.asyncio
+async def test_file_search(tmp_path):
+    """file_search finds matches with line numbers and honors .gitignore and binaries."""
+    from zeroclaw_tools import file_search
+
+    (tmp_path / ".gitignore").write_text("build/\n*.log\n")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("import os\n\ndef needle():\n    pass\n")
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "out.py").write_text("needle\n")
+    (tmp_path / "debug.log").write_text("needle\n")
+    (tmp_path / "blob.bin").write_bytes(b"\0needle")
+
+    result = await file_search.ainvoke({"pattern": r"def \w+", "path": str(tmp_path), "context": 1})
+    assert f"{tmp_path / 'src' / 'app.py'}:3: def needle():" in result
+    assert f"{tmp_path / 'src' / 'app.py'}-4-     pass" in result
+
+    result = await file_search.ainvoke({"pattern": "needle", "path": str(tmp_path)})
+    assert "(1 matches in 1 files)" in result
+
+    result = await file_search.ainvoke(
+        {"pattern": "needle", "path": str(tmp_path), "glob": "*.txt"}
+    )
+    assert result.startswith("No matches")
+
+    app = tmp_path / "src" / "app.py"
+    result = await file_search.ainvoke({"pattern": r"^def ", "path": str(app)})
+    assert f"{app}:3: def needle():" in result
+    result = await file_search.ainvoke({"pattern": r"os$", "path": str(app)})
+    assert f"{app}:1: import os" in result
+    result = await file_search.ainvoke({"pattern": r"import\s+os\s+def", "path": str(app)})
+    assert result.startswith("No matches")
+    result = await file_search.ainvoke({"pattern": r"\w+\s*", "path": str(app)})
+    assert "(3 matches in 1 files)" in result
+
+
+@pytest.mark.asyncio
+async def test_file_edit_and_append(tmp_path):
+    """file_edit applies replacements and unified diffs; file_append extends the file."""
+    from zeroclaw_tools import file_append, file_edit
+
+    test_file = tmp_path / "code.py"
+    test_file.write_text("a = 1\nb = 2\nc = 3\n")
+
+    result = await file_edit.ainvoke(
+        {"path": str(test_file), "old_text": "b = 2", "new_text": "b = 20"}
+    )
+    assert "1 replacement" in result
+    assert test_file.read_text() == "a = 1\nb = 20\nc = 3\n"
+
+    result = await file_edit.ainvoke({"path": str(test_file), "old_text": " = ", "new_text": "="})
+    assert "matches 3 times" in result
+
+    diff = "--- a/code.py\n+++ b/code.py\n@@ -2,2 +2,2 @@\n b = 20\n-c = 3\n+c = 30\n"
+    result = await file_edit.ainvoke({"path": str(test_file), "diff": diff})
+    assert "applied 1 hunk" in result
+    assert test_file.read_text() == "a = 1\nb = 20\nc = 30\n"
+
+    await file_append.ainvoke({"path": str(test_file), "content": "d = 4\n"})
+    assert test_file.read_text().endswith("c = 30\nd = 4\n")
+    assert [p.name for p in tmp_path.iterdir()] == ["code.py"]
+
+
+@pytest.mark.asyncio
+async def test_file_cache_session(tmp_path):
+    """Repeated reads hit the session cache until a write invalidates the entry."""
+    from zeroclaw_tools import file_read, file_write
+    from zeroclaw_tools.tools.file import file_cache_session
+
+    test_file = tmp_path / "cached.txt"
+    test_file.write_text("v1")
+
+    with file_cache_session() as cache:
+        assert await file_read.ainvoke({"path": str(test_file)}) == "v1"
+        assert "unchanged since last read" in await file_read.ainvoke({"path": str(test_file)})
+
+        await file_write.ainvoke({"path": str(test_file), "content": "v2"})
+        assert await file_read.ainvoke({"path": str(test_file)}) == "v2"
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    assert await file_read.ainvoke({"path": str(test_file)}) == "v2"
+
+
+@pytest.mark.asyncio
+async def test_memory_tools_migrate_legacy_json(tmp_path, monkeypatch):
+    """The SQLite memory store imports the legacy JSON file once and upserts entries."""
+    import json
+
+    from zeroclaw_tools import memory_recall, memory_store
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    legacy = tmp_path / ".zeroclaw" / "memory_store.json"
+    legacy.parent.mkdir()
+    legacy.write_text(json.dumps({"editor": "vim"}))
+
+    assert "vim" in await memory_recall.ainvoke({"query": "editor"})
+    assert not legacy.exists()
+
+    await memory_store.ainvoke({"key": "editor", "value": "helix"})
+    result = await memory_recall.ainvoke({"query": "EDITOR"})
+    assert "helix" in result
+    assert "vim" not in result
+    assert (await memory_recall.ainvoke({"query": "nothing"})).startswith("No matches")
+
+
+@pytest.mark.asyncio
+async def test_memory_recall_ranked_pages(tmp_path, monkeypatch):
+    """memory_recall ranks matches and pages through them with limit/offset."""
+    from zeroclaw_tools import memory_recall, memory_store
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    for i in range(4):
+        await memory_store.ainvoke({"key": f"note-{i}", "value": f"deploy checklist step {i}"})
+    await memory_store.ainvoke({"key": "deploy", "value": "deploys go out on Tuesdays"})
+
+    first = await memory_recall.ainvoke({"query": "deploy", "limit": 2})
+    assert first.splitlines()[0] == "1-2 of 5 matches:"
+    assert first.splitlines()[1].startswith("- deploy:")
+    assert "offset=2" in first
+
+    last = await memory_recall.ainvoke({"query": "deploy", "limit": 2, "offset": 4})
+    assert last.splitlines()[0] == "5-5 of 5 matches:"
+
+    # Recall only touches accessed_at, which must not rewrite the FTS index,
+    # including in databases created at schema version 4.
+    from zeroclaw_tools.tools.memory import MemoryStore, get_memory_store
+
+    store = get_memory_store()
+    trigger = "SELECT sql FROM sqlite_master WHERE name = 'memories_au'"
+    assert "AFTER UPDATE OF key, value" in store._conn.execute(trigger).fetchone()[0]
+    with store._conn:
+        store._conn.execute("DROP TRIGGER memories_au")
+        store._conn.execute(
+            "CREATE TRIGGER memories_au AFTER UPDATE ON memories BEGIN SELECT 1; END"
+        )
+        store._conn.execute("PRAGMA user_version = 4")
+    reopened = MemoryStore(store.path)
+    assert "AFTER UPDATE OF key, value" in reopened._conn.execute(trigger).fetchone()[0]
+    reopened.close()
+    assert "deploy" in (await memory_recall.ainvoke({"query": "Tuesdays"}))
+
+
+@pytest.mark.asyncio
+async def test_memory_recall_semantic_modes(tmp_path, monkeypatch):
+    """Semantic and hybrid recall find entries that share word stems with the query."""
+    pytest.importorskip("numpy")
+    from zeroclaw_tools import memory_recall, memory_store
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    await memory_store.ainvoke({"key": "deployment", "value": "Production deploys run on Tuesdays"})
+    await memory_store.ainvoke({"key": "pet", "value": "The user has a cat named Miso"})
+
+    semantic = await memory_recall.ainvoke({"query": "deploying", "mode": "semantic"})
+    assert semantic.splitlines()[1].startswith("- deployment:")
+
+    await memory_store.ainvoke({"key": "pet", "value": "The user adopted a deployable robot dog"})
+    hybrid = await memory_recall.ainvoke({"query": "robot", "mode": "hybrid"})
+    assert hybrid.splitlines()[1].startswith("- pet:")
+
+    assert "mode must be one of" in await memory_recall.ainvoke({"query": "x", "mode": "fuzzy"})
+
+
+@pytest.mark.asyncio
+async def test_memory_namespaces_ttl_and_caps(tmp_path, monkeypatch):
+    """Namespaces are isolated, expired entries are hidden and purged, and caps evict LRU."""
+    import time
+
+    from zeroclaw_tools import memory_recall, memory_store
+    from zeroclaw_tools.tools.memory import MemoryStore, memory_namespace
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    with memory_namespace("discord:1"):
+        await memory_store.ainvoke({"key": "color", "value": "green"})
+    with memory_namespace("discord:2"):
+        assert await memory_recall.ainvoke({"query": "color"}) == "No memories stored yet"
+
+    store = MemoryStore(tmp_path / "capped.db", max_entries=2)
+    store.store("a", "first", namespace="t")
+    store.store("b", "second", namespace="t")
+    store.get("a", namespace="t")
+    store.store("c", "third", namespace="t")
+    assert store.get("b", namespace="t") is None
+    assert store.get("a", namespace="t") == "first"
+
+    store.store("tmp", "short lived", namespace="t", ttl=0.01)
+    time.sleep(0.02)
+    assert store.search("short", namespace="t") == (0, [])
+    assert store.compact() >= 1
+    assert store.count("t") == 1
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_memory_bulk_import_export(tmp_path, monkeypatch):
+    """memory_store_many loads lists and JSONL files; export streams them back out."""
+    import io
+    import json
+
+    from zeroclaw_tools import memory_recall, memory_store_many
+    from zeroclaw_tools.tools.memory import get_memory_store
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    seed = tmp_path / "seed.jsonl"
+    seed.write_text(
+        "\n".join(json.dumps({"key": f"fact-{i}", "value": f"v{i}"}) for i in range(50))
+    )
+
+    result = await memory_store_many.ainvoke(
+        {"entries": [{"key": "owner", "value": "Ada"}], "jsonl_path": str(seed)}
+    )
+    assert result == "Stored 51 entries"
+    assert "Ada" in await memory_recall.ainvoke({"query": "owner"})
+
+    bad = await memory_store_many.ainvoke({"entries": [{"key": "x"}, {"value": "no key"}]})
+    assert bad.startswith("Error: Invalid memory entry")
+
+    out = io.StringIO()
+    assert get_memory_store().export_jsonl(out) == 51
+    assert json.loads(out.getvalue().splitlines()[0]) == {"key": "fact-0", "value": "v0"}
+
+
+@pytest.fixture
+def http_server():
+    """
+    Serve canned responses from a local HTTP/1.1 server.
+
+    ``routes[path]`` is a (status, headers, body) tuple or a callable that takes
+    the request handler and returns one.
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    routes: dict = {}
+    requests: list = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _respond(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            requests.append(
+                (
+                    self.command,
+                    self.path,
+                    dict(self.headers),
+                    self.rfile.read(length),
+                    self.client_address,
+                )
+            )
+            route = routes.get(self.path.split("?")[0], (404, {}, b"missing"))
+            status, headers, body = route(self) if callable(route) else route
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client stopped reading early
+
+        do_GET = do_POST = do_PUT = _respond
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.routes, server.requests = routes, requests
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_http_request_pooled_client(http_server):
+    """http_request reuses one pooled connection and keeps the error formats."""
+    import time
+
+    from zeroclaw_tools import http_fetch_many, http_request
+    from zeroclaw_tools.tools.http_client import (
+        _states,
+        aclose_http_client,
+        configure_http,
+        get_http_client,
+    )
+
+    http_server.routes["/ok"] = (200, {"Content-Type": "text/plain"}, b"hello")
+    http_server.routes["/fail"] = (500, {}, b"boom")
+    http_server.routes["/moved"] = (301, {"Location": "/ok"}, b"")
+
+    for _ in range(3):
+        result = await http_request.ainvoke({"url": f"{http_server.url}/ok", "headers": "X-A: 1"})
+        assert result == "Status: 200 (Content-Length: 5)\nhello"
+    assert await http_request.ainvoke({"url": f"{http_server.url}/fail"}) == "HTTP Error 500: boom"
+    moved = await http_request.ainvoke({"url": f"{http_server.url}/moved"})
+    assert moved == "Status: 200 (Content-Length: 5)\nhello"
+
+    ports = {client[1] for *_, client in http_server.requests}
+    assert len(ports) == 1
+    assert http_server.requests[0][2]["X-A"] == "1"
+    assert http_server.requests[0][2]["User-Agent"] == "ZeroClaw/1.0"
+    assert get_http_client() is get_http_client()
+    await aclose_http_client()
+
+    # Requests use the configured client timeouts unless a call sets its own.
+    def slow(handler):
+        time.sleep(0.5)
+        return 200, {}, b"late"
+
+    http_server.routes["/slow"] = slow
+    configure_http(timeout=0.1)
+    try:
+        result = await http_request.ainvoke({"url": f"{http_server.url}/slow"})
+        assert result.startswith("Error:")
+        fetched = await http_fetch_many.ainvoke({"urls": [f"{http_server.url}/slow"], "timeout": 5})
+        assert fetched.endswith("late")
+    finally:
+        configure_http(timeout=30.0)
+        await aclose_http_client()
+
+    # Sync callers still work; each call runs on its own event loop, whose
+    # client is closed afterwards.
+    loops = len(_states)
+    for _ in range(3):
+        assert http_request.invoke({"url": f"{http_server.url}/ok"}).endswith("\nhello")
+    assert len(_states) == loops
+
+
+@pytest.mark.asyncio
+async def test_http_request_streams_capped_body(http_server):
+    """Large bodies are decompressed incrementally and cut off at max_chars."""
+    import gzip
+
+    from zeroclaw_tools import http_request
+
+    payload = gzip.compress(b"x" * 2_000_000)
+    http_server.routes["/big"] = (200, {"Content-Encoding": "gzip"}, payload)
+
+    result = await http_request.ainvoke({"url": f"{http_server.url}/big", "max_chars": 100})
+    status, body, note = result.split("\n")
+    assert status == f"Status: 200 (Content-Length: {len(payload)})"
+    assert body == "x" * 100
+    assert note.startswith("... (truncated at 100 chars,")
+    assert "gzip" in http_server.requests[-1][2]["Accept-Encoding"]
+
+
+@pytest.mark.asyncio
+async def test_http_request_cache(http_server, tmp_path, monkeypatch):
+    """Opt-in GET cache serves fresh hits locally and revalidates stale entries."""
+    from zeroclaw_tools import http_request
+    from zeroclaw_tools.tools.http_cache import get_http_cache
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("ZEROCLAW_HTTP_CACHE", "1")
+    http_server.routes["/fresh"] = (200, {"Cache-Control": "max-age=60"}, b"fresh body")
+
+    def etagged(handler):
+        if handler.headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, b""
+        return 200, {"ETag": '"v1"', "Cache-Control": "no-cache"}, b"tagged body"
+
+    http_server.routes["/etag"] = etagged
+
+    first = await http_request.ainvoke({"url": f"{http_server.url}/fresh"})
+    second = await http_request.ainvoke({"url": f"{http_server.url}/fresh"})
+    assert first.endswith("fresh body") and "[cached]" in second.splitlines()[0]
+    bypass = await http_request.ainvoke({"url": f"{http_server.url}/fresh", "no_cache": True})
+    assert "[cached]" not in bypass
+    assert len(http_server.requests) == 2
+
+    await http_request.ainvoke({"url": f"{http_server.url}/etag"})
+    again = await http_request.ainvoke({"url": f"{http_server.url}/etag"})
+    assert again.endswith("tagged body") and "[revalidated]" in again.splitlines()[0]
+    assert http_server.requests[-1][2]["If-None-Match"] == '"v1"'
+
+    stats = get_http_cache().stats()
+    assert stats["hits"] == 1 and stats["revalidated"] == 1 and stats["misses"] == 2
+    assert stats["hit_ratio"] == 0.5
+
+    # Responses to requests with identifying headers are shared only when marked
+    # public or when they vary on those headers.
+    http_server.routes["/me"] = (200, {"Cache-Control": "max-age=60"}, b"alice")
+    http_server.routes["/pub"] = (200, {"Cache-Control": "public, max-age=60"}, b"shared")
+    for headers in ("Authorization: Bearer a", "Cookie: s=a", "X-API-Key: a", ""):
+        result = await http_request.ainvoke({"url": f"{http_server.url}/me", "headers": headers})
+        assert "[cached]" not in result.splitlines()[0]
+    await http_request.ainvoke({"url": f"{http_server.url}/pub", "headers": "Cookie: s=a"})
+    result = await http_request.ainvoke({"url": f"{http_server.url}/pub", "headers": "Cookie: s=b"})
+    assert "[cached]" in result.splitlines()[0]
+    http_server.routes["/keyed"] = (
+        200,
+        {"Cache-Control": "max-age=60", "Vary": "X-API-Key"},
+        b"keyed",
+    )
+    for key, cached in (("a", False), ("a", True), ("b", False)):
+        result = await http_request.ainvoke(
+            {"url": f"{http_server.url}/keyed", "headers": f"X-API-Key: {key}"}
+        )
+        assert ("[cached]" in result.splitlines()[0]) is cached
+
+
+@pytest.mark.asyncio
+async def test_search_cache_singleflight_and_ttl(tmp_path):
+    """Identical concurrent queries share one fetch; results persist per query-class TTL."""
+    import asyncio
+
+    from zeroclaw_tools.tools.search_cache import SearchCache, classify_query
+
+    assert classify_query("latest python release") == "news"
+    assert classify_query("what is a monad") == "reference"
+    assert classify_query("rust borrow checker") == "default"
+
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "results"
+
+    cache = SearchCache(ttls={"news": 0}, path=tmp_path / "search.db")
+    results = await asyncio.gather(
+        *(cache.get_or_fetch(q, fetch) for q in ["Rust  Async", "rust async", "RUST ASYNC"])
+    )
+    assert results == ["results"] * 3 and len(calls) == 1
+    assert await cache.get_or_fetch("rust async", fetch) == "results" and len(calls) == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "shared": 2, "hit_ratio": 0.75}
+
+    await cache.get_or_fetch("news today", fetch)
+    await cache.get_or_fetch("news today", fetch)
+    assert len(calls) == 3
+
+    reopened = SearchCache(path=tmp_path / "search.db")
+    assert await reopened.get_or_fetch("rust async", fetch) == "results" and len(calls) == 3
+
+    async def fail():
+        raise RuntimeError("quota")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_fetch("broken", fail)
+    assert await cache.get_or_fetch("broken", fetch) == "results"
+
+
+@pytest.mark.asyncio
+async def test_http_request_html_extraction(http_server):
+    """format="markdown"/"text" strips page chrome before applying the budget."""
+    from zeroclaw_tools import http_request
+
+    page = (
+        "<html><head><title>Guide</title><script>var x = 1;</script></head><body>"
+        "<nav><a href='/'>Home</a></nav><div class='cookie-banner'>Cookies!</div>"
+        "<main><h2>Install</h2><p>Run <code>pip install x</code>, then read "
+        "<a href='/docs'>the docs</a>.</p><ul><li>fast</li><li>small</li></ul></main>"
+        "<footer>(c) 2024</footer></body></html>"
+    ).encode()
+    http_server.routes["/page"] = (200, {"Content-Type": "text/html; charset=utf-8"}, page)
+    http_server.routes["/big"] = (
+        200,
+        {"Content-Type": "text/html"},
+        b"<main>" + b"<p>paragraph of text</p>" * 200_000 + b"</main>",
+    )
+
+    markdown = await http_request.ainvoke({"url": f"{http_server.url}/page", "format": "markdown"})
+    body = markdown.split("\n", 1)[1]
+    assert body == (
+        "# Guide\n\n## Install\n\nRun `pip install x`, then read "
+        f"[the docs]({http_server.url}/docs).\n\n- fast\n- small"
+    )
+    text = await http_request.ainvoke({"url": f"{http_server.url}/page", "format": "text"})
+    assert "Cookies" not in text and "Home" not in text and "var x" not in text
+    assert "Run pip install x, then read the docs." in text
+
+    big = await http_request.ainvoke(
+        {"url": f"{http_server.url}/big", "format": "text", "max_chars": 200}
+    )
+    assert big.splitlines()[1] == "paragraph of text"
+    assert "truncated at 200 chars" in big
+    assert "Error: format" in await http_request.ainvoke({"url": "x", "format": "pdf"})
+
+    from zeroclaw_tools.tools.html_text import html_to_text
+
+    # Page wrappers are never chrome, and a page that is all chrome keeps its text.
+    assert html_to_text('<body class="home has-sidebar"><p>hello world</p></body>') == (
+        "hello world"
+    )
+    aspnet = '<body><form id="aspnetForm"><nav>Menu</nav><p>Content</p></form></body>'
+    assert html_to_text(aspnet) == "Content"
+    assert html_to_text('<div class="sidebar"><p>Only text</p></div>') == "Only text"
+
+
+@pytest.mark.asyncio
+async def test_http_fetch_many(http_server):
+    """URLs are fetched concurrently; failures and timeouts yield partial results."""
+    import time
+
+    from zeroclaw_tools import http_fetch_many
+
+    def slow(handler):
+        time.sleep(1.5)
+        return 200, {}, b"slow"
+
+    http_server.routes["/a"] = (200, {}, b"alpha " * 100)
+    http_server.routes["/b"] = (500, {}, b"broken")
+    http_server.routes["/slow"] = slow
+    urls = [f"{http_server.url}/a", f"{http_server.url}/b", f"{http_server.url}/slow"]
+
+    result = await http_fetch_many.ainvoke({"urls": urls, "per_url_budget": 12, "timeout": 0.5})
+    sections = result.split("=== ")[1:]
+    assert sections[0].startswith(f"{urls[0]} ===\nStatus: 200 (Content-Length: 600)\nalpha alpha")
+    assert sections[1] == f"{urls[1]} ===\nHTTP Error 500: broken\n"
+    assert sections[2] == f"{urls[2]} ===\nError: Timed out after 0.5s"
+
+    budgeted = await http_fetch_many.ainvoke({"urls": urls[:1] * 3, "total_budget": 700})
+    assert budgeted.count("alpha") == 116
+    assert budgeted.endswith("... (total budget exhausted)")
+    assert "(skipped, total budget exhausted)" in budgeted
+
+
+@pytest.mark.asyncio
+async def test_http_request_save_to_and_body_file(http_server, tmp_path):
+    """save_to streams downloads to disk; body_file streams uploads from disk."""
+    import hashlib
+
+    from zeroclaw_tools import http_request
+
+    payload = bytes(range(256)) * 4096
+    http_server.routes["/blob"] = (200, {"Content-Type": "application/octet-stream"}, payload)
+    http_server.routes["/upload"] = lambda h: (
+        201,
+        {},
+        str(len(http_server.requests[-1][3])).encode(),
+    )
+
+    target = tmp_path / "out" / "blob.bin"
+    result = await http_request.ainvoke({"url": f"{http_server.url}/blob", "save_to": str(target)})
+    digest = hashlib.sha256(payload).hexdigest()
+    assert result.splitlines()[1] == f"Saved {len(payload)} bytes to {target} (sha256: {digest})"
+    assert target.read_bytes() == payload
+    assert list(target.parent.iterdir()) == [target]
+
+    # Downloading over an existing file keeps its permissions.
+    target.chmod(0o600)
+    await http_request.ainvoke({"url": f"{http_server.url}/blob", "save_to": str(target)})
+    assert target.stat().st_mode & 0o777 == 0o600
+
+    uploaded = await http_request.ainvoke(
+        {"url": f"{http_server.url}/upload", "method": "PUT", "body_file": str(target)}
+    )
+    assert uploaded == f"Status: 201 (Content-Length: 7)\n{len(payload)}"
+    assert http_server.requests[-1][3] == payload
+
+    both = await http_request.ainvoke({"url": "x", "body": "a", "body_file": str(target)})
+    assert both.startswith("Error: Pass either body or body_file")
+
+
+@pytest.mark.asyncio
+async def test_web_search_backends_merge_and_hedge(monkeypatch):
+    """Backend results are merged by canonical URL; hedging and deadlines bound latency."""
+    from zeroclaw_tools import web_search
+    from zeroclaw_tools.tools.search_backends import (
+        SearchResult,
+        StubBackend,
+        canonicalize_url,
+        search_backends,
+        set_search_backends,
+    )
+    from zeroclaw_tools.tools.search_cache import SearchCache, set_search_cache
+
+    assert canonicalize_url("https://www.Example.com/a/?b=2&utm_source=x&a=1#top") == (
+        canonicalize_url("http://example.com/a?a=1&b=2")
+    )
+
+    first = StubBackend(
+        {
+            "*": [
+                SearchResult("A", "https://a.dev/", "short"),
+                SearchResult("B", "https://b.dev", ""),
+            ]
+        },
+        name="one",
+    )
+    second = StubBackend(
+        {"*": [SearchResult("B", "https://www.b.dev/?utm_medium=x", "from two"),
+               SearchResult("C", "https://c.dev", "")]},
+        name="two",
+    )  # fmt: skip
+    slow = StubBackend({"*": [SearchResult("S", "https://slow.dev", "")]}, name="slow", delay=1)
+    broken = StubBackend({}, name="broken", error=RuntimeError("rate limited"))
+
+    results, problems = await search_backends([first, second, slow, broken], "q", deadline=0.2)
+    assert [r.title for r in results] == ["B", "A", "C"]
+    assert results[0].description == "from two"
+    assert sorted(problems) == ["broken: rate limited", "slow: no answer within 0.2s"]
+
+    results, problems = await search_backends([slow, first], "q", hedge_after=0.05)
+    assert [r.title for r in results] == ["A", "B"] and problems == []
+
+    with pytest.raises(RuntimeError, match="rate limited"):
+        await search_backends([broken], "q")
+
+    cache = SearchCache(ttls={"partial": 0})
+    set_search_cache(cache)
+    set_search_backends([first, broken])
+    try:
+        output = await web_search.ainvoke({"query": "anything"})
+        assert output.startswith("- A\n  https://a.dev/\n  short")
+        assert output.endswith("(partial results: broken: rate limited)")
+        # Partial results are not kept past the "partial" TTL.
+        broken.error = None
+        assert "partial" not in await web_search.ainvoke({"query": "anything"})
+        broken.error = RuntimeError("rate limited")
+        set_search_backends([broken])
+        assert await web_search.ainvoke({"query": "other"}) == "Error: rate limited"
+        set_search_backends([])
+        assert (await web_search.ainvoke({"query": "x"})).startswith("Error: No search backend")
+    finally:
+        set_search_backends(None)
+        set_search_cache(None)
+
+
+async def test_fair_scheduler_orders_per_user_and_round_robins():
+    """Jobs run in order per user, users take turns, and queues are bounded."""
+    import asyncio
+
+    from zeroclaw_tools.integrations.scheduler import (
+        FairScheduler,
+        QueueFull,
+        QuotaExceeded,
+        TokenQuota,
+    )
+
+    scheduler = FairScheduler(max_concurrency=2, max_queue=2)
+    started = []
+    running = set()
+    peak = 0
+
+    def job(user, n):
+        async def run():
+            nonlocal peak
+            assert user not in running
+            running.add(user)
+            peak = max(peak, len(running))
+            started.append(f"{user}{n}")
+            await asyncio.sleep(0.01)
+            running.discard(user)
+            return f"{user}{n}"
+
+        return run
+
+    submitted = [scheduler.submit("a", job("a", n)) for n in range(3)]
+    submitted += [scheduler.submit("b", job("b", n)) for n in range(2)]
+    submitted.append(scheduler.submit("c", job("c", 0)))
+    assert [position for position, _ in submitted] == [0, 1, 2, 0, 1, 1]
+    with pytest.raises(QueueFull):
+        scheduler.submit("a", job("a", 3))
+
+    cancelled = submitted[2][1]
+    cancelled.cancel()
+    results = await asyncio.gather(*(f for _, f in submitted if f is not cancelled))
+    assert results == ["a0", "a1", "b0", "b1", "c0"]
+    assert started == ["a0", "b0", "c0", "a1", "b1"]
+    assert peak == 2
+    assert scheduler.running == 0 and scheduler.queued() == 0
+
+    now = [0.0]
+    quota = TokenQuota(tokens_per_minute=60, burst=10, clock=lambda: now[0])
+    quota.check("a")
+    quota.charge("a", 15)
+    with pytest.raises(QuotaExceeded) as excinfo:
+        quota.check("a")
+    assert excinfo.value.retry_after == pytest.approx(5)
+    quota.check("b")
+    now[0] = 6.0
+    quota.check("a")
+
+
+def test_conversation_store_persists_and_evicts(tmp_path):
+    """History is appended incrementally, trimmed, evicted when idle and reloaded."""
+    from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+    from zeroclaw_tools.integrations.history import ConversationStore
+
+    now = [0.0]
+    path = tmp_path / "history.db"
+    store = ConversationStore(
+        path, max_messages=4, max_cached=2, idle_seconds=60, clock=lambda: now[0]
+    )
+    call = {"name": "shell", "args": {"command": "ls"}, "id": "call-1"}
+    store.append(
+        "alice", [HumanMessage(content="list files"), AIMessage(content="", tool_calls=[call])]
+    )
+    store.append(
+        "alice",
+        [
+            ToolMessage(content="a.txt\n" * 200, tool_call_id="call-1"),
+            AIMessage(content="One file."),
+        ],
+    )
+    store.append("bob", [HumanMessage(content="hi")])
+    store.append("carol", [HumanMessage(content="hey")])
+    assert store.cached == 2
+
+    history = store.history("alice")
+    assert [type(m).__name__ for m in history] == [
+        "HumanMessage",
+        "AIMessage",
+        "ToolMessage",
+        "AIMessage",
+    ]
+    assert history[1].tool_calls[0]["id"] == "call-1"
+    assert history[2].content == "a.txt\n" * 200
+
+    store.append("alice", [HumanMessage(content="thanks"), AIMessage(content="You're welcome.")])
+    assert [m.content for m in store.history("alice")][-2:] == ["thanks", "You're welcome."]
+    assert len(store.history("alice")) == 4
+
+    now[0] = 120.0
+    store.evict_idle()
+    assert store.cached == 0
+    store.close()
+
+    reopened = ConversationStore(path, max_messages=4)
+    assert [m.content for m in reopened.history("alice")] == [
+        "a.txt\n" * 200,
+        "One file.",
+        "thanks",
+        "You're welcome.",
+    ]
+    assert [m.content for m in reopened.history("bob")] == ["hi"]
+    rows = reopened._conn.execute("SELECT COUNT(*) FROM turns WHERE user_id = 'alice'").fetchone()
+    assert rows[0] == 4
+
+
+async def test_agent_astream_and_streaming_reply(capsys):
+    """Streamed runs report tool activity and render into edited, size-limited messages."""
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, HumanMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    from zeroclaw_tools import create_agent, tool
+    from zeroclaw_tools.integrations.streaming import StreamingReply
+
+    class ScriptedModel(BaseChatModel):
+        replies: list
+
+        @property
+        def _llm_type(self) -> str:
+            return "scripted"
+
+        def bind_tools(self, tools, **kwargs):
+            return self
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            return ChatResult(generations=[ChatGeneration(message=self.replies.pop(0))])
+
+    @tool
+    def lookup(key: str) -> str:
+        """Look up a value."""
+        return f"value of {key}"
+
+    agent = create_agent(tools=[lookup], model="test-model", api_key="test-key")
+    agent.llm = ScriptedModel(
+        replies=[
+            AIMessage(
+                content="", tool_calls=[{"name": "lookup", "args": {"key": "a"}, "id": "c1"}]
+            ),
+            AIMessage(content="The value is known."),
+        ]
+    )
+    events = [e async for e in agent.astream({"messages": [HumanMessage(content="look up a")]})]
+    assert [e.kind for e in events] == ["tool_call", "tool_result", "done"]
+    assert events[0].data["args"] == {"key": "a"}
+    assert events[1].data.content == "value of a"
+    assert events[-1].data["messages"][-1].content == "The value is known."
+
+    sent, edits = [], []
+
+    async def send(text):
+        sent.append(text)
+        return len(sent) - 1
+
+    async def edit(handle, text):
+        edits.append((handle, text))
+        sent[handle] = text
+
+    now = [0.0]
+    reply = StreamingReply(send, edit, limit=40, interval=1.0, clock=lambda: now[0])
+    await reply.start()
+    assert sent == ["…"]
+    await reply.progress("-# Running lookup(key='a')")
+    assert edits == []  # throttled until the interval has passed
+    now[0] = 1.0
+    await reply.append("The value ")
+    assert sent == ["-# Running lookup(key='a')\nThe value"]
+    await reply.append("is known.")
+    assert len(edits) == 1
+    now[0] = 5.0
+    await reply.append(" " + "word " * 12)
+    await reply.finish("ignored, the answer was streamed")
+    assert all(len(text) <= 40 for text in sent)
+    assert len(sent) >= 2
+    assert " ".join(" ".join(sent).split()) == " ".join(reply.text.split())
+    assert "ignored" not in reply.text
+
+    plain = StreamingReply(send, edit, interval=0)
+    await plain.start()
+    await plain.finish("Complete answer.")
+    assert sent[-1] == "Complete answer."
+
+    # Code blocks cut between messages are closed and reopened, as chunk_message does.
+    code = "Here is code:\n```python\n" + "print('line')\n" * 8 + "```\nDone."
+    sent.clear()
+    fenced = StreamingReply(send, edit, limit=60, interval=0)
+    await fenced.start()
+    for i in range(0, len(code), 7):
+        await fenced.append(code[i : i + 7])
+    await fenced.finish()
+    assert len(sent) > 2
+    for text in sent:
+        assert len(text) <= 60
+        assert text.count("```") % 2 == 0
+    assert all(text.startswith("```python\n") for text in sent[1:-1])
+
+    async def rejected_edit(handle, text):
+        raise RuntimeError("edit rejected")
+
+    flaky = StreamingReply(send, rejected_edit, interval=0.01)
+    await flaky.start()
+    await flaky.append("more")
+    await flaky._flush_task  # a failed background edit is reported, not raised
+    assert "could not update streamed reply: edit rejected" in capsys.readouterr().out
+
+
+def _telegram_test_messages():
+    """The message generator used by the manual Telegram tests."""
+    import importlib.util
+    from pathlib import Path
+
+    path = Path(__file__).resolve().parents[2] / "tests/manual/telegram/generate_test_messages.py"
+    spec = importlib.util.spec_from_file_location("generate_test_messages", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize(
+    ("case", "platform"),
+    [
+        ("long", "telegram"),
+        ("multi", "telegram"),
+        ("newline", "telegram"),
+        ("word", "telegram"),
+        ("multi", "discord"),
+        ("over", "telegram"),
+    ],
+)
+def test_chunk_message_generator_cases(case, platform):
+    """Generator messages split within the platform limit at word or line boundaries."""
+    from zeroclaw_tools.integrations.chunking import chunk_message, limit_for
+
+    generators = _telegram_test_messages()
+    message = {
+        "long": generators.generate_long_message,
+        "multi": generators.generate_multi_chunk_message,
+        "newline": generators.generate_newline_message,
+        "word": generators.generate_word_boundary_message,
+        "over": generators.generate_over_limit_message,
+    }[case]()
+    limit = limit_for(platform)
+
+    chunks = chunk_message(message, limit)
+
+    assert len(chunks) - -(-len(message) // limit) in (0, 1)
+    assert all(0 < len(chunk) <= limit for chunk in chunks)
+    if case == "over":
+        assert "".join(chunks) == message
+    else:
+        assert " ".join(" ".join(chunks).split()) == " ".join(message.split())
+        words = set(message.split())
+        assert all(chunk.split()[-1] in words and chunk.split()[0] in words for chunk in chunks)
+
+
+def test_chunk_message_reopens_code_fences():
+    """A code block cut across messages is closed and reopened with its language."""
+    from zeroclaw_tools.integrations.chunking import chunk_message
+
+    lines = [f"    total += item_{i}  # accumulate" for i in range(200)]
+    text = "Here is the code:\n\n```python\n" + "\n".join(lines) + "\n```\n\nThat is all."
+
+    chunks = chunk_message(text, 1900)
+
+    assert len(chunks) > 2
+    assert all(len(chunk) <= 1900 for chunk in chunks)
+    assert chunks[0].startswith("Here is the code:")
+    for chunk in chunks[:-1]:
+        assert chunk.endswith("\n```")
+    for chunk in chunks[1:]:
+        assert chunk.startswith("```python\n    total")
+    assert chunks[-1].endswith("```\n\nThat is all.")
+    body = [line for chunk in chunks for line in chunk.splitlines() if "total +=" in line]
+    assert body == lines
+
+
+@pytest.mark.parametrize("limit", [1, 5, 10, 20, 40, 100])
+def test_chunk_message_respects_small_limits(limit):
+    """Chunks never exceed the limit, and fence lines stay whole when they fit."""
+    from zeroclaw_tools.integrations.chunking import chunk_message
+
+    texts = [
+        "- item\nfoofoo foo\n`````````python\n" + "foo " * 20,
+        "intro\n```py\nprint(1)\nx = 2\n```\nmid\n~~~\nraw line\n~~~\n" + "word " * 30,
+        '```js title="a b c"\n' + "let x = 1;\n" * 30 + "```\nend",
+    ]
+    for text in texts:
+        chunks = chunk_message(text, limit)
+        assert chunks and all(len(chunk) <= limit for chunk in chunks)
+        if limit == 100:
+            # Every fence fits in half a message here, so each chunk is balanced.
+            for chunk in chunks:
+                fences = [line for line in chunk.splitlines() if line[:3] in ("```", "~~~")]
+                assert len(fences) % 2 == 0
+
+
+async def test_message_coalescer_merges_and_supersedes():
+    """Rapid messages share one run; a busy run is queued behind, cancelled or folded."""
+    import asyncio
+
+    from zeroclaw_tools.integrations.debounce import MessageCoalescer
+
+    runs = []
+    finished = []
+
+    async def run(key, items):
+        runs.append((key, list(items)))
+        await asyncio.sleep(0.2)
+        finished.append(list(items))
+
+    coalescer = MessageCoalescer(run, window=0.05)
+    for text in ("first", "second", "third"):
+        coalescer.add("alice", text)
+        await asyncio.sleep(0.01)
+    coalescer.add("bob", "hello")
+    assert coalescer.pending("alice") == 3
+    await asyncio.sleep(0.1)
+    assert sorted(runs) == [("alice", ["first", "second", "third"]), ("bob", ["hello"])]
+    coalescer.add("alice", "fourth")
+    await coalescer.drain()
+    assert finished[-1] == ["fourth"] and len(finished) == 3
+
+    for mode, expected in (("cancel", ["more"]), ("fold", ["start", "more"])):
+        runs.clear()
+        finished.clear()
+        coalescer = MessageCoalescer(run, window=0.02, on_busy=mode)
+        coalescer.add("alice", "start")
+        await asyncio.sleep(0.05)
+        assert runs == [("alice", ["start"])]
+        coalescer.add("alice", "more")
+        await asyncio.sleep(0.05)
+        await coalescer.drain()
+        assert runs[-1] == ("alice", expected)
+        assert finished == [expected]
+
+
+async def test_discord_bot_history_over_many_turns(tmp_path):
+    """Each turn stores the user's message and the replies once, and never the system prompt."""
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    from zeroclaw_tools import create_agent
+    from zeroclaw_tools.integrations.discord_bot import DiscordBot
+    from zeroclaw_tools.integrations.history import ConversationStore
+    from zeroclaw_tools.integrations.scheduler import FairScheduler
+
+    class EchoModel(BaseChatModel):
+        @property
+        def _llm_type(self) -> str:
+            return "echo"
+
+        def bind_tools(self, tools, **kwargs):
+            return self
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            last = [m for m in messages if isinstance(m, HumanMessage)][-1]
+            reply = AIMessage(content=f"reply to {last.content}")
+            return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    # discord.py is optional; exercise the message handling without a client.
+    bot = DiscordBot.__new__(DiscordBot)
+    bot.agent = create_agent(tools=[], model="test-model", api_key="test-key")
+    bot.agent.llm = EchoModel()
+    bot._history = ConversationStore(tmp_path / "history.db", max_messages=40)
+    bot._quota = None
+
+    for n in range(8):
+        assert await bot._process_message(f"msg {n}", "alice") == f"reply to msg {n}"
+
+    stored = ConversationStore(tmp_path / "history.db", max_messages=40).history("alice")
+    assert not any(isinstance(m, SystemMessage) for m in stored)
+    expected = [text for n in range(8) for text in (f"msg {n}", f"reply to msg {n}")]
+    assert [m.content for m in stored] == expected
+
+    # A failed streamed run puts the error into the streamed message.
+    class Sent:
+        def __init__(self, text):
+            self.text = text
+
+        async def edit(self, content):
+            self.text = content
+
+    class Message:
+        def __init__(self):
+            self.replies = []
+            self.channel = self
+
+        async def reply(self, text):
+            self.replies.append(Sent(text))
+            return self.replies[-1]
+
+        def typing(self):
+            return self
+
+        async def __aenter__(self):
+            return None
+
+        async def __aexit__(self, *exc):
+            return False
+
+    class BrokenModel(EchoModel):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            raise RuntimeError("model down")
+
+    bot.agent.llm = BrokenModel()
+    bot.stream = True
+    bot._scheduler = FairScheduler()
+    message = Message()
+    await bot._respond(("alice", 1), [(message, "hello")])
+    assert [sent.text for sent in message.replies] == ["Error: model down"]
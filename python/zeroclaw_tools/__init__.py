@@ -6,15 +6,7 @@ inconsistent native tool calling behavior. Built on LangGraph for guaranteed exe
 """
 
 from .agent import create_agent, ZeroclawAgent
-from .tools import (
-    shell,
-    file_read,
-    file_write,
-    web_search,
-    http_request,
-    memory_store,
-    memory_recall,
-)
+from .tools import BUILTIN_TOOLS, get_tool_registry, load_tools
 from .tools.base import tool
 
 __version__ = "0.1.0"
@@ -22,11 +14,12 @@ __all__ = [
     "create_agent",
     "ZeroclawAgent",
     "tool",
-    "shell",
-    "file_read",
-    "file_write",
-    "web_search",
-    "http_request",
-    "memory_store",
-    "memory_recall",
+    "load_tools",
+    *BUILTIN_TOOLS,
 ]
+
+
+def __getattr__(name: str):
+    if name in BUILTIN_TOOLS:
+        return get_tool_registry().get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
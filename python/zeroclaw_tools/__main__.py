@@ -11,32 +11,39 @@ from typing import Optional
 from langchain_core.messages import HumanMessage
 
 from .agent import create_agent
-from .tools import (
-    shell,
-    file_read,
-    file_write,
-    web_search,
-    http_request,
-    memory_store,
-    memory_recall,
-)
+from .tools import get_tool_registry, load_tools
+from .tools.http_client import aclose_http_client
 
 
 DEFAULT_SYSTEM_PROMPT = """You are ZeroClaw, an AI assistant with full system access. Use tools to accomplish tasks.
 Be concise and helpful. Execute tools directly without excessive explanation."""
 
 
-async def chat(message: str, api_key: str, base_url: Optional[str], model: str) -> str:
+async def _invoke(agent, messages: list) -> dict:
+    """Run the agent once, then close the HTTP client opened on this event loop."""
+    try:
+        return await agent.ainvoke({"messages": messages})
+    finally:
+        await aclose_http_client()
+
+
+async def chat(
+    message: str,
+    api_key: str,
+    base_url: Optional[str],
+    model: str,
+    tools: Optional[str] = None,
+) -> str:
     """Run a single chat message through the agent."""
     agent = create_agent(
-        tools=[shell, file_read, file_write, web_search, http_request, memory_store, memory_recall],
+        tools=load_tools(tools),
         model=model,
         api_key=api_key,
         base_url=base_url,
         system_prompt=DEFAULT_SYSTEM_PROMPT,
     )
 
-    result = await agent.ainvoke({"messages": [HumanMessage(content=message)]})
+    result = await _invoke(agent, [HumanMessage(content=message)])
     return result["messages"][-1].content or "Done."
 
 
@@ -54,6 +61,15 @@ def _build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--api-key", "-k", default=None, help="API key")
     parser.add_argument("--base-url", "-u", default=None, help="API base URL")
     parser.add_argument("--interactive", "-i", action="store_true", help="Interactive mode")
+    parser.add_argument(
+        "--tools",
+        "-t",
+        default=os.environ.get("ZEROCLAW_TOOLS") or None,
+        help="Comma-separated tool names or globs to enable, e.g. 'shell,file_*' (default: all)",
+    )
+    parser.add_argument(
+        "--list-tools", action="store_true", help="List the available tools and exit"
+    )
     return parser
 
 
@@ -62,7 +78,13 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = _build_parser()
     args = parser.parse_args(argv)
 
-    if not args.interactive and not args.message:
+    if args.tools is not None:
+        try:
+            get_tool_registry().select(args.tools)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if not args.interactive and not args.message and not args.list_tools:
         parser.error("message is required unless --interactive is set")
 
     return args
@@ -72,6 +94,10 @@ def main(argv: list[str] | None = None):
     """CLI main entry point."""
     args = parse_args(argv)
 
+    if args.list_tools:
+        print("\n".join(get_tool_registry().names()))
+        return
+
     api_key = args.api_key or os.environ.get("API_KEY") or os.environ.get("GLM_API_KEY")
     base_url = args.base_url or os.environ.get("API_BASE")
 
@@ -84,15 +110,7 @@ def main(argv: list[str] | None = None):
         print("Type 'exit' to quit\n")
 
         agent = create_agent(
-            tools=[
-                shell,
-                file_read,
-                file_write,
-                web_search,
-                http_request,
-                memory_store,
-                memory_recall,
-            ],
+            tools=load_tools(args.tools),
             model=args.model,
             api_key=api_key,
             base_url=base_url,
@@ -112,7 +130,7 @@ def main(argv: list[str] | None = None):
 
                 history.append(HumanMessage(content=user_input))
 
-                result = asyncio.run(agent.ainvoke({"messages": history}))
+                result = asyncio.run(_invoke(agent, history))
 
                 for msg in result["messages"][len(history) :]:
                     history.append(msg)
@@ -125,7 +143,7 @@ def main(argv: list[str] | None = None):
                 break
     else:
         message = " ".join(args.message)
-        result = asyncio.run(chat(message, api_key, base_url, args.model))
+        result = asyncio.run(chat(message, api_key, base_url, args.model, args.tools))
         print(result)
 
 
@@ -2,21 +2,44 @@
 LangGraph-based agent factory for consistent tool calling.
 """
 
+import contextlib
 import os
-from typing import Any, Optional
-
-from langchain_core.messages import HumanMessage, SystemMessage
+from collections.abc import AsyncIterator
+from typing import Any, NamedTuple, Optional
+
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
 from langchain_core.tools import BaseTool
 from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, MessagesState, END
 from langgraph.prebuilt import ToolNode
 
+from .tools.file import file_cache_session
+
 
 SYSTEM_PROMPT = """You are ZeroClaw, an AI assistant with tool access. Use tools to accomplish tasks.
 Be concise and helpful. Execute tools directly when needed without excessive explanation."""
 GLM_DEFAULT_BASE_URL = "https://api.z.ai/api/coding/paas/v4"
 
 
+class AgentEvent(NamedTuple):
+    """
+    One step of a streamed agent run.
+
+    ``kind`` is "token" (``data`` is text from the model), "tool_call" (a
+    tool call dict with name, args and id), "tool_result" (the ToolMessage)
+    or "done" (the final state, as ``ainvoke`` returns it).
+    """
+
+    kind: str
+    data: Any
+
+
 class ZeroclawAgent:
     """
     LangGraph-based agent with consistent tool calling behavior.
@@ -34,11 +57,13 @@ class ZeroclawAgent:
         base_url: Optional[str] = None,
         temperature: float = 0.7,
         system_prompt: Optional[str] = None,
+        file_cache: bool = False,
     ):
         self.tools = tools
         self.model = model
         self.temperature = temperature
         self.system_prompt = system_prompt or SYSTEM_PROMPT
+        self.file_cache = file_cache
 
         api_key = api_key or os.environ.get("API_KEY") or os.environ.get("GLM_API_KEY")
         base_url = base_url or os.environ.get("API_BASE")
@@ -95,13 +120,57 @@ class ZeroclawAgent:
         Returns:
             Dict with "messages" key containing the conversation
         """
-        messages = input.get("messages", [])
+        messages = self._with_system_prompt(input.get("messages", []))
+
+        if self.file_cache:
+            with file_cache_session():
+                return await self._graph.ainvoke({"messages": messages}, config)
+        return await self._graph.ainvoke({"messages": messages}, config)
 
+    async def astream(
+        self, input: dict[str, Any], config: Optional[dict] = None
+    ) -> AsyncIterator[AgentEvent]:
+        """
+        Run the agent, yielding model tokens and tool activity as they happen.
+
+        Args:
+            input: Dict with "messages" key containing list of messages
+            config: Optional LangGraph config
+
+        Yields:
+            AgentEvent items, ending with a "done" event carrying the same
+            result ``ainvoke`` would return
+        """
+        messages = self._with_system_prompt(input.get("messages", []))
+        final: dict = {"messages": messages}
+
+        with file_cache_session() if self.file_cache else contextlib.nullcontext():
+            async for mode, chunk in self._graph.astream(
+                {"messages": messages}, config, stream_mode=["messages", "updates", "values"]
+            ):
+                if mode == "messages":
+                    message = chunk[0]
+                    if isinstance(message, AIMessageChunk) and isinstance(message.content, str):
+                        if message.content:
+                            yield AgentEvent("token", message.content)
+                elif mode == "updates":
+                    for update in chunk.values():
+                        for message in (update or {}).get("messages", []):
+                            if isinstance(message, AIMessage):
+                                for call in message.tool_calls:
+                                    yield AgentEvent("tool_call", call)
+                            elif isinstance(message, ToolMessage):
+                                yield AgentEvent("tool_result", message)
+                else:
+                    final = chunk
+
+        yield AgentEvent("done", final)
+
+    def _with_system_prompt(self, messages: list) -> list:
         if messages and isinstance(messages[0], HumanMessage):
             if not any(isinstance(m, SystemMessage) for m in messages):
                 messages = [SystemMessage(content=self.system_prompt)] + messages
-
-        return await self._graph.ainvoke({"messages": messages}, config)
+        return messages
 
     def invoke(self, input: dict[str, Any], config: Optional[dict] = None) -> dict:
         """
@@ -127,6 +196,7 @@ def create_agent(
     base_url: Optional[str] = None,
     temperature: float = 0.7,
     system_prompt: Optional[str] = None,
+    file_cache: bool = False,
 ) -> ZeroclawAgent:
     """
     Create a ZeroClaw agent with LangGraph-based tool calling.
@@ -138,6 +208,8 @@ def create_agent(
         base_url: Base URL for the provider API
         temperature: Sampling temperature
         system_prompt: Custom system prompt
+        file_cache: Cache file_read results for the duration of each invocation,
+            answering repeated reads of unchanged files with a short notice
 
     Returns:
         Configured ZeroclawAgent instance
@@ -170,4 +242,5 @@ def create_agent(
         base_url=base_url,
         temperature=temperature,
         system_prompt=system_prompt,
+        file_cache=file_cache,
     )
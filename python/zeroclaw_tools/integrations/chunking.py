@@ -0,0 +1,179 @@
+"""
+Markdown-aware splitting of long replies into platform-sized messages.
+"""
+
+import bisect
+import re
+from collections.abc import Iterator
+from typing import Optional
+
+
+# Hard per-message limits, and the limits the integrations split at.
+PLATFORM_LIMITS = {"discord": 2000, "telegram": 4096}
+SAFE_LIMITS = {"discord": 1900, "telegram": 4096}
+
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})([^\n]*)$", re.MULTILINE)
+
+
+def limit_for(platform: str, safe: bool = True) -> int:
+    """Message size to split at for ``platform`` ("discord" or "telegram")."""
+    try:
+        return (SAFE_LIMITS if safe else PLATFORM_LIMITS)[platform]
+    except KeyError:
+        raise ValueError(
+            f"Unknown platform '{platform}'. Known: {', '.join(PLATFORM_LIMITS)}"
+        ) from None
+
+
+def split_index(text: str, start: int, end: int) -> int:
+    """
+    Where to end a chunk of ``text`` that starts at ``start`` and may reach ``end``.
+
+    Prefers the last line break, then the last space, in the second half of
+    the window, so every chunk is at least half full and splitting stays
+    linear in the length of the text; otherwise cuts at ``end``.
+    """
+    floor = start + (end - start) // 2
+    for separator in ("\n", " "):
+        pos = text.rfind(separator, floor, end)
+        if pos > start:
+            return pos
+    return end
+
+
+class CodeFences:
+    """Code fence lines of a text, with whether a fence is open after each."""
+
+    def __init__(self, text: str):
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        self.open_after: list[Optional[tuple[str, str]]] = []
+        opener: Optional[tuple[str, str]] = None
+        for match in _FENCE.finditer(text):
+            marker, info = match.group(1), match.group(2)
+            if opener is None:
+                if marker[0] == "`" and "`" in info:
+                    continue  # inline code such as ```x```, not a fence
+                opener = (match.group(0).strip(), marker)
+            elif marker[0] == opener[1][0] and len(marker) >= len(opener[1]) and not info.strip():
+                opener = None
+            else:
+                continue
+            self.starts.append(match.start())
+            self.ends.append(match.end())
+            self.open_after.append(opener)
+
+    def open_at(self, index: int) -> Optional[tuple[str, str]]:
+        """The (opening line, marker) of the fence open at ``index``, if any."""
+        i = bisect.bisect_right(self.ends, index) - 1
+        return self.open_after[i] if i >= 0 else None
+
+    def line_around(self, index: int) -> Optional[tuple[int, int]]:
+        """Start and end of the fence line that ``index`` falls strictly inside, if any."""
+        i = bisect.bisect_right(self.starts, index) - 1
+        if i >= 0 and self.starts[i] < index < self.ends[i]:
+            return self.starts[i], self.ends[i]
+        return None
+
+    def closable(self, index: int, limit: int) -> Optional[tuple[str, str]]:
+        """
+        The fence open at ``index``, if it can be closed and reopened in ``limit``.
+
+        Reopening and closing together must leave at least half of a message
+        for text; longer fence lines are split as plain text instead.
+        """
+        opener = self.open_at(index)
+        if opener is None or len(opener[0]) + len(opener[1]) + 2 >= limit // 2:
+            return None
+        return opener
+
+    def reopen(self, index: int, limit: int) -> str:
+        """The line that reopens the fence open at ``index`` in a new message of ``limit``."""
+        opener = self.closable(index, limit)
+        return opener[0] + "\n" if opener else ""
+
+    def cut(self, text: str, start: int, end: int) -> int:
+        """Like ``split_index``, but never inside a fence line that fits before ``end``."""
+        cut = split_index(text, start, end)
+        line = self.line_around(cut)
+        if line is not None:
+            if line[0] - 1 > start:
+                cut = line[0] - 1
+            elif line[1] < end:
+                cut = split_index(text, line[1], end)
+        return cut
+
+
+def next_chunk(text: str, pos: int, limit: int, fences: CodeFences) -> tuple[str, int]:
+    """
+    The piece of ``text`` starting at ``pos``, and where the piece after it starts.
+
+    The piece is at most ``limit`` characters, ends at a line break or space
+    where possible, and closes a code block left open at its end; it is empty
+    when that part of the text is only whitespace. ``fences`` indexes ``text``.
+    """
+    length = len(text)
+    prefix = fences.reopen(pos, limit)
+    room = limit - len(prefix)
+
+    # Leave space to close a fence that is open where the chunk ends.
+    closing = fences.closable(length, limit)
+    if length - pos + (len(closing[1]) + 1 if closing else 0) <= room:
+        cut = length
+    else:
+        opener = fences.closable(pos, limit)
+        reserve = len(opener[1]) + 1 if opener else 0
+        while True:
+            cut = fences.cut(text, pos, pos + room - reserve)
+            closing = fences.closable(cut, limit)
+            needed = len(closing[1]) + 1 if closing else 0
+            if needed <= reserve:
+                break
+            # A fence opened inside this chunk: cut again with room to close it.
+            reserve = needed
+
+    body = text[pos:cut]
+    if closing is None:
+        body = body.rstrip()
+    chunk = ""
+    if body.strip():
+        chunk = prefix + body
+        if closing is not None:
+            chunk += "\n" + closing[1]
+
+    pos = cut
+    if pos < length and text[pos] in "\n ":
+        pos += 1
+    if fences.open_at(pos) is None:
+        while pos < length and text[pos].isspace():
+            pos += 1
+    return chunk, pos
+
+
+def iter_chunks(text: str, limit: int) -> Iterator[str]:
+    """
+    Yield pieces of ``text`` of at most ``limit`` characters.
+
+    Pieces end at line breaks or spaces where possible. A code block that is
+    cut in two is closed at the end of one piece and reopened (with its
+    language tag) at the start of the next, so each piece renders on its own.
+    The text is scanned once; no intermediate copies of the remainder are made.
+    """
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    if len(text) <= limit:
+        if text.strip():
+            yield text
+        return
+
+    fences = CodeFences(text)
+    pos = 0
+    while pos < len(text):
+        chunk, pos = next_chunk(text, pos, limit, fences)
+        if chunk:
+            yield chunk
+
+
+def chunk_message(text: str, limit: int) -> list[str]:
+    """Split ``text`` into messages of at most ``limit`` characters (see ``iter_chunks``)."""
+    return list(iter_chunks(text, limit))
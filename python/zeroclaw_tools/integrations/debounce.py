@@ -0,0 +1,104 @@
+"""
+Coalescing of rapid consecutive messages into a single agent run.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, Generic, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+BUSY_MODES = ("queue", "cancel", "fold")
+
+
+class _Batch(Generic[T]):
+    __slots__ = ("items", "deadline", "timer")
+
+    def __init__(self, deadline: float):
+        self.items: list[T] = []
+        self.deadline = deadline
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class MessageCoalescer(Generic[T]):
+    """
+    Collects messages per key and runs them as one batch once the key goes quiet.
+
+    Each message restarts a ``window``-second timer for its key; when the
+    timer fires, everything collected is passed to ``run`` together. A batch
+    is never held back more than ``max_wait`` seconds after its first message.
+
+    ``on_busy`` decides what a message does while an earlier batch for the
+    same key is still running:
+
+    - "queue": wait and run as the next batch
+    - "cancel": cancel the running batch; only the new messages are run
+    - "fold": cancel the running batch and run its messages again together
+      with the new ones
+    """
+
+    def __init__(
+        self,
+        run: Callable[[Hashable, list[T]], Awaitable[Any]],
+        window: float = 0.8,
+        max_wait: float = 5.0,
+        on_busy: str = "queue",
+    ):
+        if on_busy not in BUSY_MODES:
+            raise ValueError(f"on_busy must be one of {', '.join(BUSY_MODES)}")
+        self.run = run
+        self.window = window
+        self.max_wait = max_wait
+        self.on_busy = on_busy
+        self.merged = 0
+        self._batches: dict[Hashable, _Batch[T]] = {}
+        self._running: dict[Hashable, tuple[asyncio.Task, list[T]]] = {}
+
+    def add(self, key: Hashable, item: T) -> None:
+        """Add a message for ``key``, (re)starting its quiet-period timer."""
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _Batch(loop.time() + self.max_wait)
+        else:
+            self.merged += 1
+            batch.timer.cancel()
+
+        running = self._running.pop(key, None) if self.on_busy != "queue" else None
+        if running is not None:
+            task, items = running
+            task.cancel()
+            if self.on_busy == "fold":
+                batch.items[:0] = items
+                self.merged += len(items)
+
+        batch.items.append(item)
+        delay = max(min(self.window, batch.deadline - loop.time()), 0)
+        batch.timer = loop.call_later(delay, self._fire, key)
+
+    def _fire(self, key: Hashable) -> None:
+        batch = self._batches.pop(key)
+        task = asyncio.ensure_future(self.run(key, batch.items))
+        self._running[key] = (task, batch.items)
+        task.add_done_callback(lambda done: self._finished(key, done))
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        running = self._running.get(key)
+        if running is not None and running[0] is task:
+            del self._running[key]
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Error: {task.exception()}")
+
+    def pending(self, key: Hashable) -> int:
+        """Messages collected for ``key`` that have not started running."""
+        batch = self._batches.get(key)
+        return len(batch.items) if batch is not None else 0
+
+    async def drain(self) -> None:
+        """Run every collected batch now and wait for all running batches."""
+        for key in list(self._batches):
+            self._batches[key].timer.cancel()
+            self._fire(key)
+        tasks = [task for task, _ in self._running.values()]
+        await asyncio.gather(*tasks, return_exceptions=True)
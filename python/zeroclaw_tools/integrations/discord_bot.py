@@ -2,7 +2,10 @@
 Discord bot integration for ZeroClaw.
 """
 
+import asyncio
 import os
+import uuid
+from pathlib import Path
 from typing import Optional, Set
 
 try:
@@ -13,16 +16,39 @@ except ImportError:
     DISCORD_AVAILABLE = False
     discord = None
 
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, SystemMessage
 
 from ..agent import create_agent
-from ..tools import shell, file_read, file_write, web_search
+from ..tools.memory import memory_namespace
+from ..tools.registry import ToolSpec, load_tools
+from .chunking import SAFE_LIMITS, chunk_message
+from .debounce import MessageCoalescer
+from .history import ConversationStore, default_history_path
+from .scheduler import FairScheduler, QueueFull, QuotaExceeded, TokenQuota
+from .streaming import StreamingReply
+
+
+DEFAULT_TOOLS = "shell,file_read,file_write,web_search"
 
 
 class DiscordBot:
     """
     Discord bot powered by ZeroClaw agent with LangGraph tool calling.
 
+    Each user's messages are answered in order, one at a time, with at most
+    ``max_concurrency`` agent runs across all users (taking turns fairly).
+    A user may have ``max_queue`` messages waiting; with ``tokens_per_minute``
+    set, LLM token usage is also rate limited per user. Conversation history
+    is kept in SQLite (``history_path``, by default ~/.zeroclaw/history.db)
+    so it survives restarts. With ``stream`` on, the reply is posted at once
+    and edited as the model writes and tools run.
+
+    Messages a user sends in the same channel within ``debounce_ms`` of each
+    other are answered together by one run. ``on_busy`` sets what a new
+    message does while that user's previous run in the channel is still
+    going: "queue" it for the next run, "cancel" the old run, or "fold" both
+    into a fresh run.
+
     Example:
         ```python
         import os
@@ -32,7 +58,8 @@ class DiscordBot:
             token=os.environ["DISCORD_TOKEN"],
             guild_id=123456789,
             allowed_users=["123456789"],
-            api_key=os.environ["API_KEY"]
+            api_key=os.environ["API_KEY"],
+            tools="shell,file_*,web_search",
         )
 
         bot.run()
@@ -48,6 +75,14 @@ class DiscordBot:
         base_url: Optional[str] = None,
         model: str = "glm-5",
         prefix: str = "",
+        tools: ToolSpec = DEFAULT_TOOLS,
+        max_concurrency: int = 4,
+        max_queue: int = 5,
+        tokens_per_minute: Optional[float] = None,
+        history_path: Optional[str] = None,
+        stream: bool = True,
+        debounce_ms: int = 800,
+        on_busy: str = "queue",
     ):
         if not DISCORD_AVAILABLE:
             raise ImportError(
@@ -62,6 +97,7 @@ class DiscordBot:
         self.base_url = base_url or os.environ.get("API_BASE")
         self.model = model
         self.prefix = prefix
+        self.stream = stream
 
         if not self.api_key:
             raise ValueError(
@@ -69,14 +105,22 @@ class DiscordBot:
             )
 
         self.agent = create_agent(
-            tools=[shell, file_read, file_write, web_search],
+            tools=load_tools(tools),
             model=self.model,
             api_key=self.api_key,
             base_url=self.base_url,
         )
 
-        self._histories: dict[str, list] = {}
         self._max_history = 20
+        self._history = ConversationStore(
+            Path(history_path) if history_path else default_history_path(),
+            max_messages=self._max_history * 2,
+        )
+        self._scheduler = FairScheduler(max_concurrency=max_concurrency, max_queue=max_queue)
+        self._quota = TokenQuota(tokens_per_minute) if tokens_per_minute else None
+        self._coalescer = MessageCoalescer(
+            self._respond, window=debounce_ms / 1000, on_busy=on_busy
+        )
 
         intents = discord.Intents.default()
         intents.message_content = True
@@ -116,61 +160,140 @@ class DiscordBot:
 
             print(f"[{message.author}] {content[:50]}...")
 
-            async with message.channel.typing():
-                try:
-                    response = await self._process_message(content, user_id)
-                    for chunk in self._split_message(response):
-                        await message.reply(chunk)
-                except Exception as e:
-                    print(f"Error: {e}")
-                    await message.reply(f"Error: {e}")
-
-    async def _process_message(self, content: str, user_id: str) -> str:
-        """Process a message and return the response."""
-        messages = []
+            self._coalescer.add((user_id, message.channel.id), (message, content))
 
-        if user_id in self._histories:
-            for msg in self._histories[user_id][-10:]:
-                messages.append(msg)
+    async def _respond(self, key: tuple, batch: list) -> None:
+        """Answer a batch of (message, content) pairs from one user and channel with one run."""
+        user_id = key[0]
+        message = batch[-1][0]
+        content = "\n".join(text for _, text in batch)
 
-        messages.append(HumanMessage(content=content))
-
-        result = await self.agent.ainvoke({"messages": messages})
+        reply = None
+        if self.stream:
+            reply = StreamingReply(
+                send=message.reply, edit=lambda sent, text: sent.edit(content=text)
+            )
 
-        if user_id not in self._histories:
-            self._histories[user_id] = []
-        self._histories[user_id].append(HumanMessage(content=content))
+        try:
+            if self._quota is not None:
+                self._quota.check(user_id)
+            position, result = self._scheduler.submit(
+                user_id, lambda: self._process_message(content, user_id, reply)
+            )
+        except QueueFull:
+            await message.reply("Busy: too many of your messages are already queued.")
+            return
+        except QuotaExceeded as e:
+            await message.reply(f"Rate limit reached, try again in {e.retry_after:.0f}s.")
+            return
 
-        for msg in result["messages"][len(messages) :]:
-            self._histories[user_id].append(msg)
+        if position:
+            await message.reply(f"Busy, queued #{position}")
 
-        self._histories[user_id] = self._histories[user_id][-self._max_history * 2 :]
+        try:
+            async with message.channel.typing():
+                response = await result
+            if reply is None:
+                for chunk in self._split_message(response):
+                    await message.reply(chunk)
+        except asyncio.CancelledError:
+            # A newer message superseded this run (on_busy="cancel" or "fold").
+            if reply is not None and reply.messages:
+                await reply.progress("-# Interrupted by a newer message")
+                await reply.finish()
+            raise
+        except Exception as e:
+            print(f"Error: {e}")
+            if reply is not None and reply.messages:
+                # Replace the streamed placeholder rather than leaving it behind.
+                await reply.progress(f"Error: {e}")
+                await reply.finish()
+            else:
+                await message.reply(f"Error: {e}")
+
+    async def _process_message(
+        self, content: str, user_id: str, reply: Optional[StreamingReply] = None
+    ) -> str:
+        """Process a message and return the response, streaming it into ``reply`` if given."""
+        history = self._history.history(user_id)
+        messages = [m for m in history if not isinstance(m, SystemMessage)][-10:]
+        prompt = HumanMessage(content=content, id=str(uuid.uuid4()))
+        messages.append(prompt)
+
+        with memory_namespace(f"discord:{user_id}"):
+            if reply is None:
+                result = await self.agent.ainvoke({"messages": messages})
+            else:
+                result = await self._stream_run(messages, reply)
+
+        turn = self._new_turn(result["messages"], prompt)
+        self._history.append(user_id, turn)
+
+        if self._quota is not None:
+            self._quota.charge(user_id, self._token_usage(turn[1:]))
 
         final = result["messages"][-1]
         return final.content or "Done."
 
-    @staticmethod
-    def _split_message(text: str, max_len: int = 1900) -> list[str]:
-        """Split long messages for Discord's character limit."""
-        if len(text) <= max_len:
-            return [text]
+    async def _stream_run(self, messages: list, reply: StreamingReply) -> dict:
+        """Run the agent, rendering tokens and tool calls into ``reply`` as they arrive."""
+        await reply.start()
+        result: dict = {"messages": messages}
+        async for event in self.agent.astream({"messages": messages}):
+            if event.kind == "token":
+                await reply.append(event.data)
+            elif event.kind == "tool_call":
+                await reply.progress(self._tool_line(event.data))
+            elif event.kind == "done":
+                result = event.data
+        await reply.finish(result["messages"][-1].content or "Done.")
+        return result
 
-        chunks = []
-        while text:
-            if len(text) <= max_len:
-                chunks.append(text)
-                break
+    @staticmethod
+    def _new_turn(messages: list, prompt: HumanMessage) -> list:
+        """
+        The messages of this turn: the user's message and everything after it.
+
+        The agent may prepend a system prompt, so positions in its result do not
+        line up with the input; the prompt is located by id instead. System
+        messages are never part of the stored history.
+        """
+        start = next(
+            (
+                i
+                for i in range(len(messages) - 1, -1, -1)
+                if messages[i].id == prompt.id
+                or (isinstance(messages[i], HumanMessage) and messages[i].content == prompt.content)
+            ),
+            None,
+        )
+        turn = [prompt] if start is None else messages[start:]
+        return [m for m in turn if not isinstance(m, SystemMessage)]
 
-            pos = text.rfind("\n", 0, max_len)
-            if pos == -1:
-                pos = text.rfind(" ", 0, max_len)
-            if pos == -1:
-                pos = max_len
+    @staticmethod
+    def _tool_line(call: dict) -> str:
+        """A one-line summary of a tool call, shown while the run is in progress."""
+        args = ", ".join(f"{k}={v!r}" for k, v in (call.get("args") or {}).items())
+        if len(args) > 80:
+            args = args[:77] + "..."
+        return f"-# Running {call.get('name', 'tool')}({args})"
 
-            chunks.append(text[:pos].strip())
-            text = text[pos:].strip()
+    @staticmethod
+    def _token_usage(messages: list) -> int:
+        """Tokens used by a run, from provider usage metadata or estimated from length."""
+        total = 0
+        for msg in messages:
+            usage = getattr(msg, "usage_metadata", None)
+            if usage:
+                total += usage.get("total_tokens", 0)
+            else:
+                total += len(str(msg.content)) // 4
+        return total
 
-        return chunks
+    @staticmethod
+    def _split_message(text: str, max_len: int = SAFE_LIMITS["discord"]) -> list[str]:
+        """Split long messages for Discord's character limit."""
+        return chunk_message(text, max_len) or [text]
 
     def run(self):
         """Start the Discord bot."""
@@ -0,0 +1,173 @@
+"""
+Bounded, persistent per-user conversation history for chat integrations.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Optional
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    user_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (user_id, seq)
+) WITHOUT ROWID
+"""
+
+# Bodies at least this large are stored zlib-compressed.
+_COMPRESS_MIN = 256
+_RAW, _ZLIB = b"j", b"z"
+
+
+def default_history_path() -> Path:
+    """Get the default path to the conversation history database."""
+    return Path.home() / ".zeroclaw" / "history.db"
+
+
+def encode_message(message: BaseMessage) -> bytes:
+    """Serialize a message as compact JSON, dropping empty fields, compressed when large."""
+    record = message_to_dict(message)
+    record["data"] = {k: v for k, v in record["data"].items() if v not in (None, "", [], {})}
+    raw = json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode()
+    if len(raw) >= _COMPRESS_MIN:
+        packed = zlib.compress(raw, 6)
+        if len(packed) < len(raw):
+            return _ZLIB + packed
+    return _RAW + raw
+
+
+def decode_message(data: bytes) -> BaseMessage:
+    """Inverse of ``encode_message``."""
+    raw = zlib.decompress(data[1:]) if data[:1] == _ZLIB else data[1:]
+    record = json.loads(raw)
+    record["data"].setdefault("content", "")
+    return messages_from_dict([record])[0]
+
+
+class _Conversation:
+    __slots__ = ("messages", "next_seq", "used_at")
+
+    def __init__(self, messages: list[BaseMessage], next_seq: int, used_at: float):
+        self.messages = messages
+        self.next_seq = next_seq
+        self.used_at = used_at
+
+
+class ConversationStore:
+    """
+    Per-user message history in SQLite with an LRU cache in front.
+
+    A user's history is read from disk the first time it is needed and kept
+    in memory while in use; at most ``max_cached`` users stay cached, and
+    users idle for ``idle_seconds`` are dropped from memory. Each new turn
+    is appended to the database as it happens, and only the last
+    ``max_messages`` messages per user are kept, in memory and on disk.
+    Pass ``path=None`` for a store that lives only in memory.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_messages: int = 40,
+        max_cached: int = 256,
+        idle_seconds: float = 1800.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_messages = max_messages
+        self.max_cached = max_cached
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._cache: OrderedDict[str, _Conversation] = OrderedDict()
+        self._lock = threading.Lock()
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(path) if path is not None else ":memory:", timeout=30, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+
+    @property
+    def cached(self) -> int:
+        """Number of users whose history is currently held in memory."""
+        return len(self._cache)
+
+    def _load(self, user_id: str, now: float) -> _Conversation:
+        conversation = self._cache.get(user_id)
+        if conversation is None:
+            rows = self._conn.execute(
+                "SELECT seq, data FROM turns WHERE user_id = ? ORDER BY seq DESC LIMIT ?",
+                (user_id, self.max_messages),
+            ).fetchall()
+            rows.reverse()
+            conversation = _Conversation(
+                [decode_message(data) for _, data in rows],
+                rows[-1][0] + 1 if rows else 0,
+                now,
+            )
+            self._cache[user_id] = conversation
+        conversation.used_at = now
+        self._cache.move_to_end(user_id)
+        self._evict(now)
+        return conversation
+
+    def _evict(self, now: float) -> None:
+        """Drop idle users and the least recently used ones beyond ``max_cached``."""
+        while self._cache:
+            user_id, oldest = next(iter(self._cache.items()))
+            if len(self._cache) <= self.max_cached and now - oldest.used_at < self.idle_seconds:
+                break
+            del self._cache[user_id]
+
+    def history(self, user_id: str) -> list[BaseMessage]:
+        """Return the user's stored messages, oldest first."""
+        with self._lock:
+            return list(self._load(user_id, self._clock()).messages)
+
+    def append(self, user_id: str, messages: Iterable[BaseMessage]) -> None:
+        """Add a turn's messages to the user's history."""
+        messages = list(messages)
+        if not messages:
+            return
+        with self._lock:
+            conversation = self._load(user_id, self._clock())
+            start = conversation.next_seq
+            conversation.next_seq += len(messages)
+            conversation.messages.extend(messages)
+            del conversation.messages[: -self.max_messages]
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO turns VALUES (?, ?, ?)",
+                    [(user_id, start + i, encode_message(m)) for i, m in enumerate(messages)],
+                )
+                self._conn.execute(
+                    "DELETE FROM turns WHERE user_id = ? AND seq < ?",
+                    (user_id, conversation.next_seq - self.max_messages),
+                )
+
+    def clear(self, user_id: str) -> None:
+        """Forget the user's history."""
+        with self._lock, self._conn:
+            self._cache.pop(user_id, None)
+            self._conn.execute("DELETE FROM turns WHERE user_id = ?", (user_id,))
+
+    def evict_idle(self) -> None:
+        """Drop users idle for ``idle_seconds`` from memory (their history stays on disk)."""
+        with self._lock:
+            self._evict(self._clock())
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
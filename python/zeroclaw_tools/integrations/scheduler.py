@@ -0,0 +1,163 @@
+"""
+Per-user ordered queues with fair global concurrency for chat integrations.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional
+
+
+class QueueFull(Exception):
+    """The user already has the maximum number of messages waiting."""
+
+
+class QuotaExceeded(Exception):
+    """The user has used up their token allowance for now."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Token quota exceeded, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class TokenQuota:
+    """
+    Per-user token bucket over LLM token usage.
+
+    Each user may spend up to ``burst`` tokens at once, refilled at
+    ``tokens_per_minute``. Usage is charged after a run, so a single large
+    run can overdraw the bucket; the user then waits until it is positive.
+    """
+
+    def __init__(
+        self,
+        tokens_per_minute: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = tokens_per_minute / 60
+        self.burst = burst if burst is not None else tokens_per_minute
+        self._clock = clock
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _level(self, user_id: str, now: float) -> float:
+        level, updated = self._buckets.get(user_id, (self.burst, now))
+        return min(self.burst, level + (now - updated) * self.rate)
+
+    def available(self, user_id: str) -> float:
+        """Tokens the user can spend right now (negative when overdrawn)."""
+        with self._lock:
+            return self._level(user_id, self._clock())
+
+    def check(self, user_id: str) -> None:
+        """
+        Raise if the user is out of tokens.
+
+        Raises:
+            QuotaExceeded: With the seconds until the bucket is positive again
+        """
+        level = self.available(user_id)
+        if level <= 0:
+            raise QuotaExceeded(-level / self.rate if self.rate else float("inf"))
+
+    def charge(self, user_id: str, tokens: float) -> None:
+        """Deduct ``tokens`` from the user's bucket."""
+        with self._lock:
+            now = self._clock()
+            self._buckets[user_id] = (self._level(user_id, now) - tokens, now)
+            if len(self._buckets) > 10_000:
+                # Full buckets carry no information; drop them.
+                full = [u for u in self._buckets if self._level(u, now) >= self.burst]
+                for user in full:
+                    del self._buckets[user]
+
+
+class FairScheduler:
+    """
+    Runs jobs one at a time per user and at most ``max_concurrency`` overall.
+
+    Each user's jobs run in submission order, so a user's conversation is
+    never processed twice at once. When global slots are busy, users take
+    turns round-robin: after a job finishes its user goes to the back of the
+    line, so a user with many queued messages cannot starve the others.
+    At most ``max_queue`` jobs may wait per user.
+    """
+
+    def __init__(self, max_concurrency: int = 4, max_queue: int = 5):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._pending: dict[str, deque[tuple[Callable[[], Awaitable[Any]], asyncio.Future]]] = {}
+        self._ready: deque[str] = deque()
+        self._active: dict[str, asyncio.Task] = {}
+
+    @property
+    def running(self) -> int:
+        """Number of jobs currently running."""
+        return len(self._active)
+
+    def queued(self, user_id: Optional[str] = None) -> int:
+        """Jobs waiting to start, for one user or overall."""
+        if user_id is not None:
+            return len(self._pending.get(user_id, ()))
+        return sum(len(queue) for queue in self._pending.values())
+
+    def submit(self, user_id: str, job: Callable[[], Awaitable[Any]]) -> tuple[int, asyncio.Future]:
+        """
+        Queue ``job`` for ``user_id``.
+
+        Returns:
+            The job's place in the user's queue (0 when it started right away)
+            and a future for its result. Cancelling the future cancels the job.
+
+        Raises:
+            QueueFull: If the user already has ``max_queue`` jobs waiting
+        """
+        queue = self._pending.setdefault(user_id, deque())
+        if len(queue) >= self.max_queue:
+            raise QueueFull(f"{len(queue)} messages already queued")
+        future = asyncio.get_running_loop().create_future()
+        queue.append((job, future))
+        if user_id not in self._active and user_id not in self._ready:
+            self._ready.append(user_id)
+        self._dispatch()
+        waiting = [f for _, f in self._pending.get(user_id, ())]
+        position = waiting.index(future) + 1 if future in waiting else 0
+        return position, future
+
+    def _dispatch(self) -> None:
+        while len(self._active) < self.max_concurrency and self._ready:
+            user_id = self._ready.popleft()
+            queue = self._pending[user_id]
+            while queue and queue[0][1].done():
+                queue.popleft()
+            if not queue:
+                del self._pending[user_id]
+                continue
+            job, future = queue.popleft()
+            task = asyncio.ensure_future(self._run(user_id, job, future))
+            self._active[user_id] = task
+            future.add_done_callback(lambda f, t=task: t.cancel() if f.cancelled() else None)
+
+    async def _run(
+        self, user_id: str, job: Callable[[], Awaitable[Any]], future: asyncio.Future
+    ) -> None:
+        try:
+            result = await job()
+        except asyncio.CancelledError:
+            future.cancel()
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+        finally:
+            del self._active[user_id]
+            if self._pending.get(user_id):
+                self._ready.append(user_id)
+            else:
+                self._pending.pop(user_id, None)
+            self._dispatch()
@@ -0,0 +1,145 @@
+"""
+Progressive chat replies built from streamed agent output via message edits.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional
+
+from .chunking import PLATFORM_LIMITS, CodeFences, next_chunk
+
+
+EDIT_INTERVAL = 1.0
+PLACEHOLDER = "…"
+
+
+class StreamingReply:
+    """
+    A reply that grows as the agent streams, spread over as many messages as needed.
+
+    The first message is posted by ``start`` and then edited in place as text
+    arrives, at most once per ``interval`` seconds so edits stay within the
+    platform's rate limits. When the text outgrows ``limit`` characters the
+    message is completed and the rest continues in a new one; a code block
+    cut at that point is closed and reopened as ``chunk_message`` does.
+
+    Args:
+        send: Coroutine posting a new message with the given text; returns a handle
+        edit: Coroutine replacing the text of a handle returned by ``send``
+        limit: Maximum characters per message
+        interval: Minimum seconds between edits of the same message
+        placeholder: Text shown before anything has streamed
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[Any]],
+        edit: Callable[[Any, str], Awaitable[Any]],
+        limit: int = PLATFORM_LIMITS["discord"],
+        interval: float = EDIT_INTERVAL,
+        placeholder: str = PLACEHOLDER,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.send = send
+        self.edit = edit
+        self.limit = limit
+        self.interval = interval
+        self.placeholder = placeholder
+        self.messages: list[Any] = []
+        self._clock = clock
+        self._text = ""
+        self._start = 0
+        self._shown: Optional[str] = None
+        self._turn_text = ""
+        self._last_edit = float("-inf")
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def text(self) -> str:
+        """Everything rendered so far."""
+        return self._text
+
+    async def start(self) -> None:
+        """Post the placeholder message."""
+        async with self._lock:
+            await self._show(self.placeholder)
+
+    async def append(self, text: str) -> None:
+        """Add streamed model text."""
+        self._text += text
+        self._turn_text += text
+        await self._schedule()
+
+    async def progress(self, line: str) -> None:
+        """Add a status line, such as a tool being called, on a line of its own."""
+        if self._text and not self._text.endswith("\n"):
+            self._text += "\n"
+        self._text += line + "\n"
+        self._turn_text = ""
+        await self._schedule()
+
+    async def finish(self, final_text: str = "") -> None:
+        """
+        Show everything that is still pending.
+
+        ``final_text`` is the complete final answer; it is added only when the
+        model did not stream it (some providers return the answer in one piece).
+        """
+        if final_text and not self._turn_text.strip():
+            if self._text and not self._text.endswith("\n"):
+                self._text += "\n"
+            self._text += final_text
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self._flush()
+
+    async def _schedule(self) -> None:
+        """Flush now if the last edit is old enough, otherwise once it is."""
+        wait = self._last_edit + self.interval - self._clock()
+        if wait <= 0:
+            await self._flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_later(wait))
+
+    async def _flush_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._flush_task = None
+        # Nothing awaits this task, so report a failed edit here; the text
+        # stays pending and goes out with the next flush.
+        try:
+            await self._flush()
+        except Exception as e:
+            print(f"Error: could not update streamed reply: {e}")
+
+    async def _flush(self) -> None:
+        async with self._lock:
+            # Text may grow while an edit is awaited; work on what is here now.
+            text = self._text
+            fences = CodeFences(text)
+            while (
+                len(fences.reopen(self._start, self.limit)) + len(text) - self._start > self.limit
+            ):
+                # Completed messages are cut like chunk_message cuts, closing
+                # a code block here and reopening it in the next message.
+                chunk, self._start = next_chunk(text, self._start, self.limit, fences)
+                if chunk:
+                    await self._show(chunk)
+                    self._shown = None
+            body = text[self._start :].rstrip()
+            if body:
+                body = fences.reopen(self._start, self.limit) + body
+            await self._show(body or self.placeholder)
+
+    async def _show(self, text: str) -> None:
+        """Put ``text`` in the current message, posting it if it does not exist yet."""
+        if text == self._shown:
+            return
+        if self._shown is None:
+            self.messages.append(await self.send(text))
+        else:
+            await self.edit(self.messages[-1], text)
+        self._shown = text
+        self._last_edit = self._clock()
@@ -2,19 +2,39 @@
 Built-in tools for ZeroClaw agents.
 """
 
+import sys
+import types
+
 from .base import tool
-from .shell import shell
-from .file import file_read, file_write
-from .web import web_search, http_request
-from .memory import memory_store, memory_recall
+from .registry import BUILTIN_TOOLS, ToolRegistry, get_tool_registry, load_tools
 
 __all__ = [
     "tool",
-    "shell",
-    "file_read",
-    "file_write",
-    "web_search",
-    "http_request",
-    "memory_store",
-    "memory_recall",
+    "load_tools",
+    "get_tool_registry",
+    "ToolRegistry",
+    *BUILTIN_TOOLS,
 ]
+
+
+def __getattr__(name: str):
+    # Tool modules are imported on first access, so importing the package
+    # does not pull in the dependencies of every tool.
+    if name in BUILTIN_TOOLS:
+        tool = globals()[name] = get_tool_registry().get(name)
+        return tool
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _ToolsPackage(types.ModuleType):
+    """Keep tool names bound to tools when a same-named submodule is imported."""
+
+    def __setattr__(self, name: str, value) -> None:
+        # Importing zeroclaw_tools.tools.shell would otherwise replace the
+        # shell tool with its module; the module stays in sys.modules.
+        if name in BUILTIN_TOOLS and isinstance(value, types.ModuleType):
+            value = get_tool_registry().get(name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _ToolsPackage
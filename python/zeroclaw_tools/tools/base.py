@@ -2,27 +2,311 @@
 Base utilities for creating tools.
 """
 
-from typing import Any, Callable, Optional
+import asyncio
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Optional
 
+from langchain_core.tools import StructuredTool
 from langchain_core.tools import tool as langchain_tool
 
+from .http_client import aclose_http_client
+
+
+_TOOL_WORKERS = 32
+_LATENCY_SAMPLES = 1024
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_metrics: dict[str, "ToolMetrics"] = {}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the thread pool that runs sync tools from async callers."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_TOOL_WORKERS, thread_name_prefix="zeroclaw-tool"
+            )
+        return _executor
+
+
+class ToolMetrics:
+    """Call counts and a rolling latency sample for one tool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self._latencies: deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self._lock = threading.Lock()
+
+    def record(
+        self, latency: float, error: Optional[BaseException] = None, cached: bool = False
+    ) -> None:
+        with self._lock:
+            self.calls += 1
+            self.cache_hits += cached
+            self._latencies.append(latency)
+            if error is not None:
+                self.errors += 1
+                if isinstance(error, TimeoutError):
+                    self.timeouts += 1
+
+    def snapshot(self) -> dict[str, float]:
+        """Counters plus mean/p50/p95/max latency (ms) over the most recent calls."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                "calls": self.calls,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "retries": self.retries,
+                "cache_hits": self.cache_hits,
+                "error_rate": self.errors / self.calls if self.calls else 0.0,
+            }
+        if latencies:
+            stats["mean_ms"] = 1000 * sum(latencies) / len(latencies)
+            stats["p50_ms"] = 1000 * latencies[len(latencies) // 2]
+            stats["p95_ms"] = 1000 * latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+            stats["max_ms"] = 1000 * latencies[-1]
+        return stats
+
+
+def get_tool_metrics() -> dict[str, dict[str, float]]:
+    """Return a metrics snapshot for every tool created with ``tool``."""
+    return {name: metrics.snapshot() for name, metrics in _metrics.items()}
+
+
+class _ResultCache:
+    """Thread-safe LRU of tool results with an optional time to live."""
+
+    def __init__(self, ttl: Optional[float], maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(args: tuple, kwargs: dict) -> str:
+        return json.dumps([args, kwargs], sort_keys=True, default=repr)
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if self.ttl is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[1]
+
+    def put(self, key: str, value: Any) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+async def _closing(work: Awaitable) -> Any:
+    """
+    Await ``work`` on a throwaway event loop, then close that loop's HTTP client.
+
+    Sync calls of async tools run under their own ``asyncio.run``; without this
+    each call would leave a pooled client and its sockets behind.
+    """
+    try:
+        return await work
+    finally:
+        await aclose_http_client()
+
+
+def _wrap(
+    func: Callable,
+    name: str,
+    timeout: Optional[float],
+    max_concurrency: Optional[int],
+    cache_ttl: Optional[float],
+    cache_maxsize: Optional[int],
+    retries: int,
+    retry_backoff: float,
+) -> tuple[Callable, Callable, ToolMetrics]:
+    """
+    Build sync and async entry points for ``func`` with the requested behavior.
+
+    A sync ``func`` runs on the shared thread pool when awaited (or when it
+    has a timeout); an async ``func`` is driven by ``asyncio.run`` on a
+    worker thread when invoked synchronously. Each attempt gets ``timeout``
+    seconds, failed attempts are retried with exponential backoff, and only
+    successful results are cached. Work moved to another thread runs in a
+    copy of the caller's context, so context variables (memory namespace,
+    file cache session, callbacks) carry over.
+    """
+    is_async = inspect.iscoroutinefunction(func)
+    metrics = _metrics[name] = ToolMetrics(name)
+    cache = None
+    if cache_ttl is not None or cache_maxsize is not None:
+        cache = _ResultCache(cache_ttl, cache_maxsize or 128)
+    thread_slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+    loop_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+        weakref.WeakKeyDictionary()
+    )
+
+    def timed_out() -> TimeoutError:
+        return TimeoutError(f"Tool {name} timed out after {timeout:g}s")
+
+    def call_sync(args: tuple, kwargs: dict) -> Any:
+        """Run a sync ``func`` on a pool thread, holding a concurrency slot."""
+        if thread_slots is None:
+            return func(*args, **kwargs)
+        with thread_slots:
+            return func(*args, **kwargs)
+
+    def loop_slot() -> Any:
+        if not max_concurrency:
+            return contextlib.nullcontext()
+        loop = asyncio.get_running_loop()
+        slots = loop_slots.get(loop)
+        if slots is None:
+            slots = loop_slots[loop] = asyncio.Semaphore(max_concurrency)
+        return slots
+
+    def attempt_sync(args: tuple, kwargs: dict) -> Any:
+        context = contextvars.copy_context()
+        if is_async:
+            work = _closing(attempt_async(args, kwargs))
+            return _get_executor().submit(context.run, asyncio.run, work).result()
+        # Take the slot before starting the clock, so queueing does not count
+        # against the timeout; a timed-out call keeps its slot until it returns.
+        if thread_slots is not None:
+            thread_slots.acquire()
+        if timeout is None:
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if thread_slots is not None:
+                    thread_slots.release()
+        future = _get_executor().submit(context.run, func, *args, **kwargs)
+        if thread_slots is not None:
+            future.add_done_callback(lambda _: thread_slots.release())
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            raise timed_out() from None
+
+    async def attempt_async(args: tuple, kwargs: dict) -> Any:
+        async with loop_slot():
+            if is_async:
+                work = func(*args, **kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                context = contextvars.copy_context()
+                work = loop.run_in_executor(_get_executor(), context.run, call_sync, args, kwargs)
+            if timeout is None:
+                return await work
+            try:
+                return await asyncio.wait_for(work, timeout)
+            except asyncio.TimeoutError:
+                raise timed_out() from None
+
+    @functools.wraps(func)
+    def run_sync(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        key = cache.key(args, kwargs) if cache is not None else ""
+        if cache is not None:
+            hit, value = cache.get(key)
+            if hit:
+                metrics.record(time.perf_counter() - started, cached=True)
+                return value
+        for attempt in range(retries + 1):
+            try:
+                result = attempt_sync(args, kwargs)
+                break
+            except Exception as e:
+                if attempt == retries:
+                    metrics.record(time.perf_counter() - started, e)
+                    raise
+                metrics.retries += 1
+                time.sleep(retry_backoff * 2**attempt)
+        if cache is not None:
+            cache.put(key, result)
+        metrics.record(time.perf_counter() - started)
+        return result
+
+    @functools.wraps(func)
+    async def run_async(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        key = cache.key(args, kwargs) if cache is not None else ""
+        if cache is not None:
+            hit, value = cache.get(key)
+            if hit:
+                metrics.record(time.perf_counter() - started, cached=True)
+                return value
+        for attempt in range(retries + 1):
+            try:
+                result = await attempt_async(args, kwargs)
+                break
+            except Exception as e:
+                if attempt == retries:
+                    metrics.record(time.perf_counter() - started, e)
+                    raise
+                metrics.retries += 1
+                await asyncio.sleep(retry_backoff * 2**attempt)
+        if cache is not None:
+            cache.put(key, result)
+        metrics.record(time.perf_counter() - started)
+        return result
+
+    return run_sync, run_async, metrics
+
 
 def tool(
     func: Optional[Callable] = None,
     *,
     name: Optional[str] = None,
     description: Optional[str] = None,
+    timeout: Optional[float] = None,
+    max_concurrency: Optional[int] = None,
+    cache_ttl: Optional[float] = None,
+    cache_maxsize: Optional[int] = None,
+    retries: int = 0,
+    retry_backoff: float = 0.5,
 ) -> Any:
     """
     Decorator to create a LangChain tool from a function.
 
     This is a convenience wrapper around langchain_core.tools.tool that
-    provides a simpler interface for ZeroClaw users.
+    provides a simpler interface for ZeroClaw users. Both sync and async
+    functions work with ``invoke`` and ``ainvoke``; sync functions run on a
+    shared thread pool when awaited. Latency and error counts are recorded
+    for every tool (see ``get_tool_metrics``).
 
     Args:
         func: The function to wrap (when used without parentheses)
         name: Optional custom name for the tool
         description: Optional custom description
+        timeout: Seconds allowed per attempt before raising TimeoutError
+        max_concurrency: Maximum number of calls running at once
+        cache_ttl: Memoize results by arguments for this many seconds
+        cache_maxsize: Maximum memoized results (default 128 when caching)
+        retries: Extra attempts after a failure or timeout
+        retry_backoff: Delay before the first retry, doubled for each later one
 
     Returns:
         A BaseTool instance
@@ -35,16 +319,31 @@ def tool(
         def my_tool(query: str) -> str:
             \"\"\"Description of what this tool does.\"\"\"
             return f"Result: {query}"
+
+        @tool(timeout=10, retries=2, cache_ttl=300, max_concurrency=4)
+        async def lookup(sku: str) -> str:
+            \"\"\"Look up a product in the inventory service.\"\"\"
+            ...
         ```
     """
-    if func is not None:
-        if name is not None:
-            return langchain_tool(name, func, description=description)
-        return langchain_tool(func, description=description)
 
     def decorator(f: Callable) -> Any:
         if name is not None:
-            return langchain_tool(name, f, description=description)
-        return langchain_tool(f, description=description)
+            base = langchain_tool(name, f, description=description)
+        else:
+            base = langchain_tool(f, description=description)
+        run_sync, run_async, metrics = _wrap(
+            f, base.name, timeout, max_concurrency, cache_ttl, cache_maxsize, retries, retry_backoff
+        )
+        return StructuredTool(
+            name=base.name,
+            description=base.description,
+            args_schema=base.args_schema,
+            func=run_sync,
+            coroutine=run_async,
+            metadata={"metrics": metrics},
+        )
 
+    if func is not None:
+        return decorator(func)
     return decorator
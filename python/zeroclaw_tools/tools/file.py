@@ -2,47 +2,648 @@
 File read/write tools.
 """
 
+import contextlib
+import mmap
 import os
+import re
+import stat
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Optional, Union
 
 from langchain_core.tools import tool
 
 
 MAX_FILE_SIZE = 100_000
+MAX_BATCH_SIZE = 200_000
+_SCAN_CHUNK = 1 << 20
+# Cap on windowed reads of files that cannot be mapped (procfs, pipes).
+_STREAM_LIMIT = 64 << 20
+_Buffer = Union[mmap.mmap, bytes]
+_READ_WORKERS = 8
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@")
+
+
+def _read_umask() -> int:
+    """
+    Return the process umask.
+
+    Read from /proc where available; otherwise os.umask has to be set and
+    restored, which is only safe at import time, before tools run on threads.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+    mask = os.umask(0o022)
+    os.umask(mask)
+    return mask
+
+
+_UMASK = _read_umask()
+
+
+class FileCache:
+    """
+    Byte-bounded LRU of file_read results for a single agent session.
+
+    Entries are validated against the file's (inode, size, mtime_ns) on every
+    lookup and dropped by the write tools, so a hit is always current. When
+    ``report_unchanged`` is set, a repeated read of an unchanged window returns
+    a short notice instead of resending content the model has already seen.
+    """
+
+    def __init__(self, max_bytes: int = 16_000_000, report_unchanged: bool = True):
+        self.max_bytes = max_bytes
+        self.report_unchanged = report_unchanged
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[tuple[int, int, int], str]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, signature: tuple[int, int, int]) -> Optional[str]:
+        """Return the cached result for ``key`` if the file still has ``signature``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != signature:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple, signature: tuple[int, int, int], value: str) -> None:
+        """Cache ``value`` for ``key``, evicting least recently used entries."""
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (signature, value)
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, path: str) -> None:
+        """Drop every cached window of ``path``."""
+        real = os.path.realpath(path)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == real]:
+                self._drop(key)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _drop(self, key: tuple) -> None:
+        _, value = self._entries.pop(key)
+        self._size -= len(value)
+
+
+_active_cache: ContextVar[Optional[FileCache]] = ContextVar("zeroclaw_file_cache", default=None)
+
+
+@contextlib.contextmanager
+def file_cache_session(cache: Optional[FileCache] = None) -> Iterator[FileCache]:
+    """
+    Enable file_read caching for the duration of the block.
+
+    Example:
+        ```python
+        with file_cache_session() as cache:
+            await agent.ainvoke({"messages": messages})
+        print(cache.hits, cache.misses)
+        ```
+    """
+    cache = cache or FileCache()
+    token = _active_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _active_cache.reset(token)
+
+
+def _invalidate_cached(path: str) -> None:
+    """Drop ``path`` from the active session cache, if any."""
+    cache = _active_cache.get()
+    if cache is not None:
+        cache.invalidate(path)
+
+
+def _count_newlines(mm: _Buffer, start: int, end: int) -> int:
+    """Count newlines in ``mm[start:end]`` one chunk at a time."""
+    count = 0
+    for pos in range(start, end, _SCAN_CHUNK):
+        count += mm[pos : min(pos + _SCAN_CHUNK, end)].count(b"\n")
+    return count
+
+
+def _count_lines(mm: _Buffer) -> int:
+    """Count lines in a mapped file without materializing it."""
+    size = len(mm)
+    count = _count_newlines(mm, 0, size)
+    if size and mm[size - 1 : size] != b"\n":
+        count += 1
+    return count
+
+
+def _skip_lines(mm: _Buffer, pos: int, count: int) -> int:
+    """Return the offset just past the ``count``-th newline at or after ``pos``."""
+    size = len(mm)
+    while count > 0 and pos < size:
+        chunk = mm[pos : pos + _SCAN_CHUNK]
+        found = chunk.count(b"\n")
+        if found < count:
+            count -= found
+            pos += len(chunk)
+            continue
+        idx = -1
+        for _ in range(count):
+            idx = chunk.find(b"\n", idx + 1)
+        return pos + idx + 1
+    return size if count > 0 else pos
+
+
+def _tail_offset(mm: _Buffer, lines: int) -> int:
+    """Return the offset where the last ``lines`` lines start, capped at MAX_FILE_SIZE bytes."""
+    size = len(mm)
+    end = size - 1 if size and mm[size - 1 : size] == b"\n" else size
+    floor = max(0, size - MAX_FILE_SIZE)
+    pos = end
+    for _ in range(lines):
+        pos = mm.rfind(b"\n", floor, pos)
+        if pos == -1:
+            return floor
+    return pos + 1
+
+
+def _read_window(
+    path: str, offset: int, length: int, start_line: int, end_line: int, tail: int
+) -> str:
+    """Serve a byte, line, or tail window of ``path`` via mmap, or a plain read if unmappable."""
+    if start_line > 0 and end_line > 0 and start_line > end_line:
+        raise ValueError(f"start_line ({start_line}) is after end_line ({end_line})")
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        except (OSError, ValueError):
+            mm = None
+        if mm is None:
+            # procfs and other special files report no size and cannot be mapped.
+            return _window(f.read(_STREAM_LIMIT), offset, length, start_line, end_line, tail)
+        with mm:
+            return _window(mm, offset, length, start_line, end_line, tail)
+
+
+def _window(
+    mm: _Buffer, offset: int, length: int, start_line: int, end_line: int, tail: int
+) -> str:
+    """Slice the requested window out of ``mm`` and prefix its size/line header."""
+    size = len(mm)
+    total_lines = _count_lines(mm)
+    if tail > 0:
+        start = _tail_offset(mm, tail)
+        end = size
+    elif start_line > 0 or end_line > 0:
+        first = max(start_line, 1)
+        start = _skip_lines(mm, 0, first - 1)
+        end = _skip_lines(mm, start, end_line - first + 1) if end_line >= first else size
+    else:
+        start = min(max(offset, 0), size)
+        end = start + (length if length > 0 else MAX_FILE_SIZE)
+    end = min(end, start + MAX_FILE_SIZE, size)
+    data = mm[start:end]
+    if not data:
+        return f"[bytes {start}-{end} of {size} | no lines in range, {total_lines} total]\n"
+    first_line = _count_newlines(mm, 0, start) + 1
+    last_line = first_line + data.count(b"\n", 0, len(data) - 1)
+    header = f"[bytes {start}-{end} of {size} | lines {first_line}-{last_line} of {total_lines}]"
+    return f"{header}\n{data.decode('utf-8', errors='replace')}"
 
 
 @tool
-def file_read(path: str) -> str:
+def file_read(
+    path: str,
+    offset: int = 0,
+    length: int = 0,
+    start_line: int = 0,
+    end_line: int = 0,
+    tail: int = 0,
+) -> str:
     """
     Read the contents of a file at the given path.
 
+    Without window arguments the first 100KB of the file is returned. Large files
+    can be inspected in pieces by byte range, line range, or from the end.
+
     Args:
         path: The file path to read (absolute or relative)
+        offset: Byte offset to start reading from
+        length: Number of bytes to read (defaults to 100KB, which is also the cap)
+        start_line: First line to read (1-based, inclusive)
+        end_line: Last line to read (1-based, inclusive; 0 reads to the cap)
+        tail: Read the last N lines of the file
 
     Returns:
-        The file contents, or an error message
+        The file contents (prefixed with a size/line header for windowed reads),
+        a short notice if the same window was already read and the file is
+        unchanged, or an error message
     """
     try:
-        with open(path, "r", encoding="utf-8", errors="replace") as f:
-            content = f.read()
-            if len(content) > MAX_FILE_SIZE:
-                return content[:MAX_FILE_SIZE] + f"\n... (truncated, {len(content)} bytes total)"
-            return content
+        cache = _active_cache.get()
+        if cache is None:
+            return _read(path, offset, length, start_line, end_line, tail)
+
+        st = os.stat(path)
+        if st.st_size == 0:
+            # Empty and procfs-style files: the size/mtime signature can't see changes.
+            return _read(path, offset, length, start_line, end_line, tail)
+        signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+        key = (os.path.realpath(path), offset, length, start_line, end_line, tail)
+        cached = cache.get(key, signature)
+        if cached is not None:
+            if cache.report_unchanged:
+                return f"(unchanged since last read: {path})"
+            return cached
+        result = _read(path, offset, length, start_line, end_line, tail)
+        cache.put(key, signature, result)
+        return result
     except FileNotFoundError:
         return f"Error: File not found: {path}"
     except PermissionError:
         return f"Error: Permission denied: {path}"
+    except IsADirectoryError:
+        return f"Error: Is a directory: {path}"
     except Exception as e:
         return f"Error: {e}"
 
 
+def _read(path: str, offset: int, length: int, start_line: int, end_line: int, tail: int) -> str:
+    """Read ``path`` for file_read, dispatching to a windowed read when requested."""
+    if offset or length or start_line or end_line or tail:
+        return _read_window(path, offset, length, start_line, end_line, tail)
+
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        data = f.read(MAX_FILE_SIZE)
+    content = data.decode("utf-8", errors="replace")
+    if size > MAX_FILE_SIZE:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            total_lines = _count_lines(mm)
+        return content + f"\n... (truncated, {size} bytes total, {total_lines} lines)"
+    return content
+
+
+def _read_prefix(path: str, limit: int) -> tuple[int, bytes]:
+    """Return the size of ``path`` and up to ``limit`` bytes from its start."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        return size, f.read(limit)
+
+
+@tool
+def file_read_many(
+    paths: list[str], max_bytes_each: int = 20_000, total_budget: int = MAX_BATCH_SIZE
+) -> str:
+    """
+    Read several files in one call.
+
+    Files are read in parallel and returned in the given order, each under a
+    "=== path ===" header. Use this instead of repeated file_read calls when
+    exploring a codebase.
+
+    Args:
+        paths: The file paths to read
+        max_bytes_each: Maximum bytes returned per file
+        total_budget: Maximum bytes returned across all files (capped at 200KB)
+
+    Returns:
+        The concatenated file contents with per-file headers
+    """
+    if not paths:
+        return "Error: No paths given"
+
+    budget = min(max(total_budget, 0), MAX_BATCH_SIZE)
+    limit = min(max(max_bytes_each, 0), budget)
+    workers = min(_READ_WORKERS, len(paths))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_read_prefix, p, limit) for p in paths]
+
+    sections = []
+    for path, future in zip(paths, futures):
+        try:
+            size, data = future.result()
+        except FileNotFoundError:
+            sections.append(f"=== {path} ===\nError: File not found: {path}")
+            continue
+        except PermissionError:
+            sections.append(f"=== {path} ===\nError: Permission denied: {path}")
+            continue
+        except IsADirectoryError:
+            sections.append(f"=== {path} ===\nError: Is a directory: {path}")
+            continue
+        except Exception as e:
+            sections.append(f"=== {path} ===\nError: {e}")
+            continue
+
+        data = data[:budget]
+        budget -= len(data)
+        header = f"=== {path} ({size} bytes"
+        if len(data) < size:
+            header += f", showing first {len(data)}"
+        sections.append(f"{header}) ===\n{data.decode('utf-8', errors='replace')}")
+
+    if budget == 0:
+        sections.append("... (total budget exhausted)")
+    return "\n".join(sections)
+
+
+class ReplacementFile:
+    """
+    A file that replaces ``path`` once it has been completely written.
+
+    Data goes to a temporary file in the same directory which ``commit``
+    renames over the target, so readers never observe a partially written
+    file and a failed write leaves the target untouched. An existing file
+    keeps its permissions; a new one gets the default mode under the process
+    umask. Devices, FIFOs and sockets (e.g. /dev/null) must not be replaced
+    by a regular file, so they are written in place.
+
+    As a context manager it commits when the block succeeds and discards the
+    data otherwise. Parent directories are created as needed.
+
+    Example:
+        ```python
+        with ReplacementFile("config.json") as f:
+            f.write(data)
+        ```
+    """
+
+    def __init__(self, path: str, fsync: bool = False, suffix: str = ".tmp"):
+        _invalidate_cached(path)
+        self.path = os.path.realpath(path)
+        self.fsync = fsync
+        parent = os.path.dirname(self.path)
+        os.makedirs(parent, exist_ok=True)
+        try:
+            mode = os.stat(self.path).st_mode
+        except FileNotFoundError:
+            mode = None
+        self._tmp_path: Optional[str] = None
+        if mode is not None and not stat.S_ISREG(mode):
+            self._file = open(self.path, "wb")  # noqa: SIM115 (closed by commit/discard)
+            return
+        self._mode = stat.S_IMODE(mode) if mode is not None else 0o666 & ~_UMASK
+        fd, self._tmp_path = tempfile.mkstemp(
+            dir=parent, prefix=f".{os.path.basename(self.path)}.", suffix=suffix
+        )
+        self._file = os.fdopen(fd, "wb")
+
+    def __enter__(self) -> "ReplacementFile":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+    def write(self, data: bytes) -> int:
+        """Append ``data`` to the new contents."""
+        return self._file.write(data)
+
+    def commit(self) -> None:
+        """Move the new contents into place (syncing them to disk first if ``fsync``)."""
+        tmp_path = self._tmp_path
+        try:
+            if self.fsync and tmp_path is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._file.close()
+            if tmp_path is not None:
+                os.chmod(tmp_path, self._mode)
+                os.replace(tmp_path, self.path)
+                self._tmp_path = None
+        except BaseException:
+            self.discard()
+            raise
+
+        if self.fsync and tmp_path is not None and hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(os.path.dirname(self.path), os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def discard(self) -> None:
+        """Drop the new contents, leaving the target as it was."""
+        self._file.close()
+        if self._tmp_path is not None:
+            with contextlib.suppress(OSError):
+                os.unlink(self._tmp_path)
+            self._tmp_path = None
+
+
+def _write_bytes(path: str, data: bytes, atomic: bool = True, fsync: bool = False) -> None:
+    """Write ``data`` to ``path``, atomically unless ``atomic`` is off (see ``ReplacementFile``)."""
+    if atomic:
+        with ReplacementFile(path, fsync=fsync) as f:
+            f.write(data)
+        return
+
+    _invalidate_cached(path)
+    path = os.path.realpath(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _read_text(path: str) -> str:
+    """Read a file as text, round-tripping bytes that are not valid UTF-8."""
+    with open(path, "rb") as f:
+        return f.read().decode("utf-8", errors="surrogateescape")
+
+
+def _parse_hunks(diff: str) -> list[tuple[int, list[str], list[str], bool]]:
+    """
+    Parse unified diff hunks into (old start, old lines, new lines, ends with newline).
+
+    File headers (---/+++) and anything before the first hunk are ignored.
+    """
+    hunks = []
+    current = None
+    last_side = ""
+    for line in diff.splitlines():
+        header = _HUNK_HEADER.match(line)
+        if header:
+            current = [int(header.group(1)), [], [], True]
+            if header.group(2) == "0":
+                current[0] += 1
+            hunks.append(current)
+            continue
+        if current is None:
+            continue
+        if line.startswith("\\"):
+            if last_side in (" ", "+"):
+                current[3] = False
+            continue
+        tag, body = (line[0], line[1:]) if line else (" ", "")
+        if tag == " ":
+            current[1].append(body)
+            current[2].append(body)
+        elif tag == "-":
+            current[1].append(body)
+        elif tag == "+":
+            current[2].append(body)
+        else:
+            raise ValueError(f"Malformed diff line: {line!r}")
+        last_side = tag
+    if not hunks:
+        raise ValueError("No hunks found in diff")
+    return [tuple(h) for h in hunks]
+
+
+def _locate(lines: list[str], needle: list[str], expected: int) -> Optional[int]:
+    """Find ``needle`` in ``lines``, searching outward from the expected index."""
+    stripped = [line.rstrip("\r\n") for line in lines]
+    limit = len(lines) - len(needle)
+    for distance in range(max(expected, limit - expected, 0) + 1):
+        for pos in (expected - distance, expected + distance):
+            if 0 <= pos <= limit and stripped[pos : pos + len(needle)] == needle:
+                return pos
+    return None
+
+
+def _apply_unified_diff(text: str, diff: str) -> tuple[str, int]:
+    """Apply a unified diff to ``text``, returning the new text and hunk count."""
+    lines = text.splitlines(keepends=True)
+    newline = "\r\n" if "\r\n" in text else "\n"
+    hunks = _parse_hunks(diff)
+    shift = 0
+    for old_start, old_lines, new_lines, ends_with_newline in hunks:
+        pos = _locate(lines, old_lines, old_start - 1 + shift)
+        if pos is None:
+            raise ValueError(f"Hunk at line {old_start} does not apply")
+        replacement = [line + newline for line in new_lines]
+        if replacement and not ends_with_newline:
+            replacement[-1] = new_lines[-1]
+        if not old_lines and pos == len(lines) and lines and not lines[-1].endswith("\n"):
+            lines[-1] += newline
+        lines[pos : pos + len(old_lines)] = replacement
+        shift += len(new_lines) - len(old_lines)
+    return "".join(lines), len(hunks)
+
+
 @tool
-def file_write(path: str, content: str) -> str:
+def file_write(path: str, content: str, atomic: bool = True, fsync: bool = False) -> str:
     """
     Write content to a file, creating directories if needed.
 
+    Replaces the whole file. To change part of an existing file use file_edit,
+    and to add to the end use file_append.
+
     Args:
         path: The file path to write to
         content: The content to write
+        atomic: Write to a temporary file and rename it into place
+        fsync: Flush the data to disk before returning
+
+    Returns:
+        Success message or error
+    """
+    try:
+        data = content.encode("utf-8")
+        _write_bytes(path, data, atomic=atomic, fsync=fsync)
+        return f"Successfully wrote {len(data)} bytes to {path}"
+    except PermissionError:
+        return f"Error: Permission denied: {path}"
+    except Exception as e:
+        return f"Error: {e}"
+
+
+@tool
+def file_edit(
+    path: str,
+    old_text: str = "",
+    new_text: str = "",
+    diff: str = "",
+    replace_all: bool = False,
+    fsync: bool = False,
+) -> str:
+    """
+    Edit a file in place without rewriting all of it.
+
+    Either replace old_text with new_text (old_text must match exactly once
+    unless replace_all is set), or apply a unified diff. The file is updated
+    atomically.
+
+    Args:
+        path: The file path to edit
+        old_text: Exact text to find
+        new_text: Text to replace it with
+        diff: A unified diff to apply instead of old_text/new_text
+        replace_all: Replace every occurrence of old_text
+        fsync: Flush the data to disk before returning
+
+    Returns:
+        Success message or error
+    """
+    try:
+        text = _read_text(path)
+        if diff:
+            updated, hunks = _apply_unified_diff(text, diff)
+            summary = f"applied {hunks} hunk{'s' if hunks != 1 else ''}"
+        elif old_text:
+            count = text.count(old_text)
+            if count == 0:
+                return f"Error: old_text not found in {path}"
+            if count > 1 and not replace_all:
+                return (
+                    f"Error: old_text matches {count} times in {path}; "
+                    "add surrounding context or set replace_all"
+                )
+            updated = text.replace(old_text, new_text)
+            summary = f"{count} replacement{'s' if count != 1 else ''}"
+        else:
+            return "Error: Provide either old_text or diff"
+
+        _write_bytes(path, updated.encode("utf-8", errors="surrogateescape"), fsync=fsync)
+        return f"Successfully edited {path} ({summary})"
+    except FileNotFoundError:
+        return f"Error: File not found: {path}"
+    except PermissionError:
+        return f"Error: Permission denied: {path}"
+    except ValueError as e:
+        return f"Error: {e}"
+    except Exception as e:
+        return f"Error: {e}"
+
+
+@tool
+def file_append(path: str, content: str, fsync: bool = False) -> str:
+    """
+    Append content to the end of a file, creating it if needed.
+
+    Args:
+        path: The file path to append to
+        content: The content to append
+        fsync: Flush the data to disk before returning
 
     Returns:
         Success message or error
@@ -51,9 +652,14 @@ def file_write(path: str, content: str) -> str:
         parent = os.path.dirname(path)
         if parent:
             os.makedirs(parent, exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
-        return f"Successfully wrote {len(content)} bytes to {path}"
+        data = content.encode("utf-8")
+        _invalidate_cached(path)
+        with open(path, "ab") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        return f"Successfully appended {len(data)} bytes to {path}"
     except PermissionError:
         return f"Error: Permission denied: {path}"
     except Exception as e:
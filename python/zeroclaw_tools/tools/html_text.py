@@ -0,0 +1,291 @@
+"""
+Readable text extraction from HTML for the web tools.
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import Optional
+from urllib.parse import urljoin
+
+
+FORMATS = ("raw", "text", "markdown")
+
+# Never contain readable content.
+SKIP_TAGS = frozenset(
+    {"script", "style", "noscript", "template", "svg", "canvas", "iframe", "object", "select"}
+)
+# Page chrome; <header> and <footer> are only dropped outside the main content.
+BOILERPLATE_TAGS = frozenset({"nav", "aside", "dialog", "button"})
+# Wrap the whole page, so they are never chrome whatever their class or role.
+ROOT_TAGS = frozenset({"html", "body"})
+CHROME_TAGS = frozenset({"header", "footer"})
+MAIN_TAGS = frozenset({"main", "article"})
+VOID_TAGS = frozenset(
+    {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "wbr"}
+)
+BLOCK_TAGS = frozenset(
+    {
+        "p", "div", "section", "article", "main", "header", "footer", "ul", "ol", "dl",
+        "table", "blockquote", "figure", "figcaption", "details", "summary", "address",
+    }
+)  # fmt: skip
+LINE_TAGS = frozenset({"li", "tr", "dt", "dd", "br", "caption"})
+HEADINGS = {f"h{n}": n for n in range(1, 7)}
+_BOILERPLATE_ATTR = re.compile(
+    r"(?:^|[\s_-])(?:nav|navbar|menu|sidebar|breadcrumbs?|cookies?|consent|banner|ads?|advert"
+    r"|promo|social|share|sharing|related|comments?|popup|modal|newsletter|subscribe|skip-link)"
+    r"(?:$|[\s_-])",
+    re.IGNORECASE,
+)
+_BOILERPLATE_ROLES = frozenset({"navigation", "banner", "contentinfo", "complementary", "search"})
+_SPACE = re.compile(r"\s+")
+
+
+class HtmlExtractor(HTMLParser):
+    """
+    Incremental HTML-to-text converter with boilerplate removal.
+
+    Feed decoded HTML in chunks as it arrives. Scripts, styles, navigation,
+    sidebars, cookie banners and similar chrome are dropped, and when the page
+    marks its content with <main> or <article>, only that content is kept.
+    If chrome removal leaves nothing, the full page text is returned instead.
+    In markdown mode headings, lists, links, emphasis, code and quotes keep
+    their structure; in text mode only the paragraph layout survives.
+    """
+
+    def __init__(self, markdown: bool = False, base_url: str = ""):
+        super().__init__(convert_charrefs=True)
+        self.markdown = markdown
+        self.base_url = base_url
+        self.title = ""
+        self._all: list[str] = []
+        self._main: list[str] = []
+        self._full: list[str] = []
+        self._all_size = 0
+        self._main_size = 0
+        self._main_depth = 0
+        self._skip: Optional[str] = None
+        self._skip_depth = 0
+        self._chrome: Optional[str] = None
+        self._chrome_depth = 0
+        self._in_title = False
+        self._pre = 0
+        self._lists: list[list] = []
+        self._links: list[tuple[str, list[str]]] = []
+        self._row_cells = 0
+        self._last = "\n"
+        self._newlines = 2
+
+    def has_enough(self, budget: int) -> bool:
+        """
+        Whether enough text has been extracted to fill ``budget``.
+
+        Page content counts once a <main>/<article> has started; otherwise
+        extraction runs a little past the budget in case it starts later.
+        """
+        return self._main_size >= budget or self._all_size >= 4 * budget
+
+    def _emit(self, text: str) -> None:
+        if not text:
+            return
+        if self._links:
+            self._links[-1][1].append(text)
+            return
+        self._full.append(text)
+        if self._chrome is None:
+            self._all.append(text)
+            self._all_size += len(text)
+            if self._main_depth:
+                self._main.append(text)
+                self._main_size += len(text)
+        self._last = text[-1]
+        stripped = text.rstrip("\n")
+        trailing = len(text) - len(stripped)
+        self._newlines = self._newlines + trailing if not stripped else trailing
+
+    def _break(self, newlines: int = 2) -> None:
+        """End the current line or paragraph without stacking blank lines."""
+        if not self._links and newlines > self._newlines:
+            self._emit("\n" * (newlines - self._newlines))
+
+    def _is_boilerplate(self, tag: str, attrs: dict[str, Optional[str]]) -> bool:
+        if tag in ROOT_TAGS:
+            return False
+        if tag in BOILERPLATE_TAGS:
+            return True
+        if tag in CHROME_TAGS and not self._main_depth:
+            return True
+        if "hidden" in attrs or attrs.get("aria-hidden") == "true":
+            return True
+        if (attrs.get("role") or "") in _BOILERPLATE_ROLES:
+            return True
+        style = (attrs.get("style") or "").replace(" ", "").lower()
+        if "display:none" in style or "visibility:hidden" in style:
+            return True
+        marker = f"{attrs.get('id') or ''} {attrs.get('class') or ''}"
+        return tag not in MAIN_TAGS and bool(_BOILERPLATE_ATTR.search(marker))
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        if self._skip is not None:
+            if tag == self._skip:
+                self._skip_depth += 1
+            return
+        if tag == "title":
+            self._in_title = True
+            return
+        if tag in SKIP_TAGS:
+            self._skip, self._skip_depth = tag, 1
+            return
+        attributes = dict(attrs)
+        if self._chrome is not None:
+            if tag == self._chrome:
+                self._chrome_depth += 1
+        elif tag not in VOID_TAGS and self._is_boilerplate(tag, attributes):
+            # Chrome is still parsed, but its text only counts as a fallback.
+            self._chrome, self._chrome_depth = tag, 1
+
+        if tag in MAIN_TAGS:
+            self._main_depth += 1
+        if tag in HEADINGS:
+            self._break()
+            if self.markdown:
+                self._emit("#" * HEADINGS[tag] + " ")
+        elif tag == "pre":
+            self._break()
+            self._pre += 1
+            if self.markdown:
+                self._emit("```\n")
+        elif tag in ("ul", "ol"):
+            self._break(1 if self._lists else 2)
+            self._lists.append([tag, 0])
+        elif tag == "li":
+            self._break(1)
+            if self.markdown or self._lists:
+                indent = "  " * max(len(self._lists) - 1, 0)
+                if self._lists and self._lists[-1][0] == "ol":
+                    self._lists[-1][1] += 1
+                    self._emit(f"{indent}{self._lists[-1][1]}. ")
+                else:
+                    self._emit(f"{indent}- ")
+        elif tag == "tr":
+            self._break(1)
+            self._row_cells = 0
+        elif tag in ("td", "th"):
+            if self._row_cells:
+                self._emit(" | ")
+            self._row_cells += 1
+        elif tag == "hr":
+            self._break()
+            if self.markdown:
+                self._emit("---")
+                self._break()
+        elif tag in LINE_TAGS:
+            self._break(1)
+        elif tag in BLOCK_TAGS:
+            self._break()
+            if tag == "blockquote" and self.markdown:
+                self._emit("> ")
+        elif self.markdown:
+            if tag == "a":
+                href = attributes.get("href") or ""
+                if href and not href.startswith(("#", "javascript:")):
+                    self._links.append((urljoin(self.base_url, href), []))
+            elif tag in ("strong", "b"):
+                self._emit("**")
+            elif tag in ("em", "i"):
+                self._emit("_")
+            elif tag == "code" and not self._pre:
+                self._emit("`")
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._skip is not None:
+            if tag == self._skip:
+                self._skip_depth -= 1
+                if self._skip_depth == 0:
+                    self._skip = None
+            return
+        if tag == "title":
+            self._in_title = False
+            return
+
+        if tag in HEADINGS or tag in BLOCK_TAGS:
+            if tag == "blockquote" or tag in HEADINGS or tag == "p":
+                self._break()
+            else:
+                self._break(1)
+        elif tag == "pre":
+            if self.markdown:
+                self._emit("\n```")
+            self._pre = max(self._pre - 1, 0)
+            self._break()
+        elif tag in ("ul", "ol"):
+            if self._lists:
+                self._lists.pop()
+            self._break(1)
+        elif tag in ("li", "tr", "dd", "dt"):
+            self._break(1)
+        elif self.markdown:
+            if tag == "a" and self._links:
+                href, parts = self._links.pop()
+                text = "".join(parts).strip()
+                if text:
+                    self._emit(f"[{text}]({href})")
+            elif tag in ("strong", "b"):
+                self._emit("**")
+            elif tag in ("em", "i"):
+                self._emit("_")
+            elif tag == "code" and not self._pre:
+                self._emit("`")
+        if tag in MAIN_TAGS and self._main_depth:
+            self._main_depth -= 1
+        if tag == self._chrome:
+            self._chrome_depth -= 1
+            if self._chrome_depth == 0:
+                self._chrome = None
+
+    def handle_data(self, data: str) -> None:
+        if self._skip is not None:
+            return
+        if self._in_title:
+            self.title += data
+            return
+        if self._pre:
+            self._emit(data)
+            return
+        text = _SPACE.sub(" ", data)
+        if self._last in " \n" and not self._links:
+            text = text.lstrip(" ")
+        self._emit(text)
+
+    def text(self) -> str:
+        """The extracted text, preferring <main>/<article> content when present."""
+        body = ""
+        for parts in (self._main, self._all, self._full):
+            body = re.sub(r"[ \t]+\n", "\n", "".join(parts))
+            body = re.sub(r"\n{3,}", "\n\n", body).strip()
+            if body:
+                break
+        title = _SPACE.sub(" ", self.title).strip()
+        if title and not body.startswith(("# " + title, title)):
+            body = f"# {title}\n\n{body}" if self.markdown else f"{title}\n\n{body}"
+        return body
+
+
+def html_to_text(html: str, markdown: bool = False, base_url: str = "") -> str:
+    """Convert a complete HTML document to readable text or markdown."""
+    extractor = HtmlExtractor(markdown=markdown, base_url=base_url)
+    extractor.feed(html)
+    extractor.close()
+    return extractor.text()
+
+
+def is_html(content_type: str, head: str) -> bool:
+    """Whether a response looks like HTML, from its Content-Type or its first bytes."""
+    if content_type:
+        return "html" in content_type.lower()
+    return head.lstrip()[:15].lower().startswith(("<!doctype html", "<html"))
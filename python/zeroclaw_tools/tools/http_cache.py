@@ -0,0 +1,332 @@
+"""
+Disk-backed HTTP cache for GET requests made by the web tools.
+"""
+
+import email.utils
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+
+DEFAULT_MAX_BYTES = 100_000_000
+MAX_ENTRY_BYTES = 2_000_000
+CACHEABLE_STATUS = frozenset({200, 203, 300, 301, 308, 404, 410})
+# Request headers that do not identify the caller; any other header (Authorization,
+# Cookie, X-API-Key, ...) may select a caller-specific response.
+NEUTRAL_HEADERS = frozenset(
+    {"accept", "accept-encoding", "accept-language", "cache-control", "pragma", "user-agent"}
+)
+_HEURISTIC_FRACTION = 0.1
+_HEURISTIC_MAX = 86_400
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    vary TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at);
+"""
+
+
+def _get_cache_path() -> Path:
+    """Get the path to the HTTP cache database."""
+    return Path.home() / ".zeroclaw" / "http_cache.db"
+
+
+class CachedResponse(NamedTuple):
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    stored_at: float
+
+
+def cache_directives(value: str) -> dict[str, Optional[str]]:
+    """Parse a Cache-Control header into a {directive: argument} dict."""
+    directives: dict[str, Optional[str]] = {}
+    for part in value.split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip().strip('"') or None
+    return directives
+
+
+def _seconds(value: Optional[str]) -> Optional[int]:
+    try:
+        return max(int(value), 0) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: Mapping[str, str]) -> float:
+    """
+    How long a response stays fresh, per RFC 9111 for a private cache.
+
+    Uses max-age, then Expires relative to Date, then 10% of the time since
+    Last-Modified (capped at a day); no-cache makes every reuse revalidate.
+    """
+    directives = cache_directives(headers.get("cache-control", ""))
+    if "no-cache" in directives:
+        return 0
+    max_age = _seconds(directives.get("max-age"))
+    if max_age is not None:
+        return max_age
+    date = _http_date(headers.get("date"))
+    expires = headers.get("expires")
+    if expires is not None:
+        expires_at = _http_date(expires)
+        return max(expires_at - (date or time.time()), 0) if expires_at else 0
+    last_modified = _http_date(headers.get("last-modified"))
+    if last_modified is not None:
+        since = (date or time.time()) - last_modified
+        return min(max(since * _HEURISTIC_FRACTION, 0), _HEURISTIC_MAX)
+    return 0
+
+
+def is_cacheable(status: int, headers: Mapping[str, str]) -> bool:
+    """Whether a GET response may be stored."""
+    directives = cache_directives(headers.get("cache-control", ""))
+    return (
+        status in CACHEABLE_STATUS
+        and "no-store" not in directives
+        and headers.get("vary", "").strip() != "*"
+    )
+
+
+def is_shareable(request_headers: Mapping[str, str], headers: Mapping[str, str]) -> bool:
+    """
+    Whether a response may be shared between callers who send different headers.
+
+    Responses marked ``public`` always may. Otherwise every request header
+    beyond ``NEUTRAL_HEADERS`` must be listed in the response's Vary, so the
+    entry only matches requests that send the same value.
+    """
+    if "public" in cache_directives(headers.get("cache-control", "")):
+        return True
+    vary = {n.strip().lower() for n in headers.get("vary", "").split(",")}
+    return all(name.lower() in NEUTRAL_HEADERS or name.lower() in vary for name in request_headers)
+
+
+class HttpCache:
+    """
+    SQLite-backed HTTP cache keyed by URL.
+
+    Entries keep the decoded body and the response headers. Fresh entries are
+    served without touching the network; stale ones carry their validators
+    (ETag, Last-Modified) so the caller can revalidate them with a conditional
+    request. Total body size is kept under ``max_bytes`` by evicting the least
+    recently used entries. Hits, revalidations and misses are counted so the
+    hit ratio can be monitored.
+
+    The cache is shared by every caller, so a request with headers that may
+    identify the caller (credentials, API keys) is only stored and served
+    when the response is ``public`` or varies on those headers (see
+    ``is_shareable``).
+    """
+
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _vary_key(headers: Mapping[str, str], request_headers: Mapping[str, str]) -> str:
+        """Serialize the request header values the response varies on."""
+        lower = {k.lower(): v for k, v in request_headers.items()}
+        names = sorted(n.strip().lower() for n in headers.get("vary", "").split(",") if n.strip())
+        return json.dumps({name: lower.get(name, "") for name in names})
+
+    def lookup(self, url: str, request_headers: Mapping[str, str]) -> Optional[CachedResponse]:
+        """Return the stored response for ``url`` if it matches the request's Vary headers."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vary, status, headers, body, stored_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            vary, status, headers, body, stored_at = row
+            headers = json.loads(headers)
+            if self._vary_key(headers, request_headers) != vary:
+                return None
+            if not is_shareable(request_headers, headers):
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url)
+                )
+        return CachedResponse(status, headers, body, stored_at)
+
+    @staticmethod
+    def is_fresh(entry: CachedResponse, now: Optional[float] = None) -> bool:
+        """Whether ``entry`` can be served without revalidation."""
+        age = _seconds(entry.headers.get("age")) or 0
+        age += (now or time.time()) - entry.stored_at
+        return age < freshness_lifetime(entry.headers)
+
+    @staticmethod
+    def validators(entry: CachedResponse) -> dict[str, str]:
+        """Conditional request headers that revalidate ``entry``."""
+        conditional = {}
+        if "etag" in entry.headers:
+            conditional["If-None-Match"] = entry.headers["etag"]
+        if "last-modified" in entry.headers:
+            conditional["If-Modified-Since"] = entry.headers["last-modified"]
+        return conditional
+
+    def store(
+        self,
+        url: str,
+        request_headers: Mapping[str, str],
+        status: int,
+        headers: Mapping[str, str],
+        body: bytes,
+    ) -> bool:
+        """Store a complete response if it is cacheable; returns whether it was stored."""
+        headers = {k.lower(): v for k, v in headers.items()}
+        if not is_shareable(request_headers, headers):
+            return False
+        if not is_cacheable(status, headers) or len(body) > min(self.max_bytes, MAX_ENTRY_BYTES):
+            self.invalidate(url)
+            return False
+        now = time.time()
+        vary = self._vary_key(headers, request_headers)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, vary, status, json.dumps(headers), body, len(body), now, now),
+            )
+            self._evict()
+        return True
+
+    def refresh(self, url: str, headers: Mapping[str, str]) -> Optional[CachedResponse]:
+        """
+        Apply a 304 Not Modified response to the stored entry.
+
+        The new headers replace the stored ones (except the body framing) and
+        the entry's age restarts.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            status, stored, body = row
+            merged = json.loads(stored)
+            for name, value in headers.items():
+                if name.lower() not in ("content-length", "content-encoding", "transfer-encoding"):
+                    merged[name.lower()] = value
+            now = time.time()
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE responses SET headers = ?, stored_at = ?, accessed_at = ? "
+                    "WHERE url = ?",
+                    (json.dumps(merged), now, now, url),
+                )
+        return CachedResponse(status, merged, body, now)
+
+    def invalidate(self, url: str) -> None:
+        """Drop the stored response for ``url``."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits in ``max_bytes``."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        doomed = []
+        for url, size in self._conn.execute("SELECT url, size FROM responses ORDER BY accessed_at"):
+            doomed.append((url,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE url = ?", doomed)
+
+    def size(self) -> int:
+        """Total bytes of stored bodies."""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def stats(self) -> dict[str, float]:
+        """Lookup counters and the hit ratio (fresh hits plus revalidations over lookups)."""
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.revalidated) / lookups if lookups else 0.0,
+        }
+
+    def record(self, outcome: str) -> None:
+        """Count one lookup outcome: "hit", "revalidated" or "miss"."""
+        with self._lock:
+            if outcome == "hit":
+                self.hits += 1
+            elif outcome == "revalidated":
+                self.revalidated += 1
+            else:
+                self.misses += 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+        self.hits = self.revalidated = self.misses = 0
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_caches: dict[Path, HttpCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """
+    Return the shared HTTP cache, or None when caching is off.
+
+    Caching is opt-in: set ZEROCLAW_HTTP_CACHE=1. ZEROCLAW_HTTP_CACHE_MAX_BYTES
+    bounds the total size of stored bodies.
+    """
+    if os.environ.get("ZEROCLAW_HTTP_CACHE", "").strip().lower() not in ("1", "true", "yes"):
+        return None
+    path = _get_cache_path()
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            max_bytes = os.environ.get("ZEROCLAW_HTTP_CACHE_MAX_BYTES", "").strip()
+            cache = HttpCache(path, int(max_bytes) if max_bytes else DEFAULT_MAX_BYTES)
+            _caches[path] = cache
+        return cache
@@ -0,0 +1,140 @@
+"""
+Shared, pooled HTTP client for the web tools.
+"""
+
+import asyncio
+import contextlib
+import os
+import weakref
+from collections.abc import AsyncIterator
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+USER_AGENT = "ZeroClaw/1.0"
+
+
+class HttpSettings:
+    """
+    Connection pool settings for the shared client.
+
+    Defaults can be overridden with ZEROCLAW_HTTP_TIMEOUT,
+    ZEROCLAW_HTTP_CONNECT_TIMEOUT, ZEROCLAW_HTTP_MAX_CONNECTIONS,
+    ZEROCLAW_HTTP_MAX_PER_HOST and ZEROCLAW_HTTP_MAX_REDIRECTS, or
+    programmatically with ``configure_http``.
+    """
+
+    def __init__(self):
+        self.timeout = float(os.environ.get("ZEROCLAW_HTTP_TIMEOUT", 30.0))
+        self.connect_timeout = float(os.environ.get("ZEROCLAW_HTTP_CONNECT_TIMEOUT", 10.0))
+        self.max_connections = int(os.environ.get("ZEROCLAW_HTTP_MAX_CONNECTIONS", 100))
+        self.max_keepalive = 20
+        self.keepalive_expiry = 30.0
+        self.max_per_host = int(os.environ.get("ZEROCLAW_HTTP_MAX_PER_HOST", 6))
+        self.max_redirects = int(os.environ.get("ZEROCLAW_HTTP_MAX_REDIRECTS", 10))
+        self.http2 = HTTP2_AVAILABLE
+
+
+settings = HttpSettings()
+
+
+class _LoopState:
+    """The client and per-host limits bound to one event loop."""
+
+    def __init__(self):
+        self.client = httpx.AsyncClient(
+            http2=settings.http2,
+            timeout=httpx.Timeout(settings.timeout, connect=settings.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=settings.max_connections,
+                max_keepalive_connections=settings.max_keepalive,
+                keepalive_expiry=settings.keepalive_expiry,
+            ),
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+            max_redirects=settings.max_redirects,
+        )
+        self.hosts: dict[str, asyncio.Semaphore] = {}
+
+
+# httpx connections belong to the event loop that opened them, and the CLI runs
+# each interactive turn under a fresh asyncio.run(), so keep one client per loop.
+_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _state() -> _LoopState:
+    loop = asyncio.get_running_loop()
+    state = _states.get(loop)
+    if state is None or state.client.is_closed:
+        state = _states[loop] = _LoopState()
+    return state
+
+
+def configure_http(
+    timeout: Optional[float] = None,
+    connect_timeout: Optional[float] = None,
+    max_connections: Optional[int] = None,
+    max_per_host: Optional[int] = None,
+    http2: Optional[bool] = None,
+    max_redirects: Optional[int] = None,
+) -> None:
+    """
+    Change the shared client settings.
+
+    Clients that already exist keep their settings; the change applies to
+    clients created afterwards (call ``aclose_http_client`` to recreate the
+    current loop's client).
+    """
+    if timeout is not None:
+        settings.timeout = timeout
+    if connect_timeout is not None:
+        settings.connect_timeout = connect_timeout
+    if max_connections is not None:
+        settings.max_connections = max_connections
+    if max_per_host is not None:
+        settings.max_per_host = max_per_host
+    if http2 is not None:
+        settings.http2 = http2 and HTTP2_AVAILABLE
+    if max_redirects is not None:
+        settings.max_redirects = max_redirects
+
+
+def request_timeout(timeout: Optional[float]) -> Any:
+    """The ``timeout`` argument for one request: None keeps the client's configured timeouts."""
+    return httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the pooled client for the running event loop."""
+    return _state().client
+
+
+@contextlib.asynccontextmanager
+async def host_slot(url: str) -> AsyncIterator[httpx.AsyncClient]:
+    """Hold one of the per-host connection slots for ``url`` while using the client."""
+    state = _state()
+    host = urlsplit(url).netloc.lower()
+    semaphore = state.hosts.get(host)
+    if semaphore is None:
+        semaphore = state.hosts[host] = asyncio.Semaphore(settings.max_per_host)
+    async with semaphore:
+        yield state.client
+
+
+async def aclose_http_client() -> None:
+    """Close the running loop's client, if one was created."""
+    with contextlib.suppress(RuntimeError):
+        state = _states.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state.client.aclose()
@@ -2,84 +2,810 @@
 Memory storage tools for persisting data between conversations.
 """
 
+import contextlib
 import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextvars import ContextVar
 from pathlib import Path
+from typing import NamedTuple, Optional, TextIO, Union
 
 from langchain_core.tools import tool
 
+from .semantic import Embedder, HashingEmbedder, VectorIndex, np, require_numpy
+
+
+SCHEMA_VERSION = 5
+DEFAULT_NAMESPACE = ""
+COMPACTION_INTERVAL = 600.0
+SNIPPET_TOKENS = 24
+MAX_RECALL = 50
+RECALL_MODES = ("keyword", "semantic", "hybrid")
+MIN_SIMILARITY = 0.1
+_RRF_K = 60
+_EMBED_BATCH = 512
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Only key and value are indexed; recall's accessed_at updates must not
+# rewrite the index.
+_FTS_UPDATE_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS memories_au AFTER UPDATE OF key, value ON memories BEGIN "
+    "INSERT INTO memories_fts(memories_fts, rowid, key, value) "
+    "VALUES ('delete', old.rowid, old.key, old.value); "
+    "INSERT INTO memories_fts(rowid, key, value) VALUES (new.rowid, new.key, new.value); END"
+)
+
+_FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5("
+    "key, value, content='memories', content_rowid='rowid', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS memories_ai AFTER INSERT ON memories BEGIN "
+    "INSERT INTO memories_fts(rowid, key, value) VALUES (new.rowid, new.key, new.value); END",
+    "CREATE TRIGGER IF NOT EXISTS memories_ad AFTER DELETE ON memories BEGIN "
+    "INSERT INTO memories_fts(memories_fts, rowid, key, value) "
+    "VALUES ('delete', old.rowid, old.key, old.value); END",
+    _FTS_UPDATE_TRIGGER,
+    "INSERT INTO memories_fts(memories_fts) VALUES ('rebuild')",
+)
+
+
+_VECTOR_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS memory_vectors ("
+    "key TEXT PRIMARY KEY, embedder TEXT NOT NULL, updated_at REAL NOT NULL, "
+    "vector BLOB NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS memories_updated_at ON memories (updated_at)",
+)
+
+
+_NAMESPACE_SCHEMA = (
+    "CREATE TABLE memories_v4 ("
+    "namespace TEXT NOT NULL DEFAULT '', key TEXT NOT NULL, value TEXT NOT NULL, "
+    "updated_at REAL NOT NULL, accessed_at REAL NOT NULL, expires_at REAL, "
+    "PRIMARY KEY (namespace, key))",
+    "INSERT INTO memories_v4 (namespace, key, value, updated_at, accessed_at) "
+    "SELECT '', key, value, updated_at, updated_at FROM memories",
+    "DROP TABLE memories",
+    "ALTER TABLE memories_v4 RENAME TO memories",
+    "CREATE INDEX memories_updated_at ON memories (namespace, updated_at)",
+    "CREATE INDEX memories_accessed_at ON memories (namespace, accessed_at)",
+    "CREATE INDEX memories_expires_at ON memories (expires_at) WHERE expires_at IS NOT NULL",
+    "DROP TABLE IF EXISTS memory_vectors",
+    "CREATE TABLE memory_vectors ("
+    "namespace TEXT NOT NULL, key TEXT NOT NULL, embedder TEXT NOT NULL, "
+    "updated_at REAL NOT NULL, vector BLOB NOT NULL, PRIMARY KEY (namespace, key))",
+    "CREATE TABLE memory_namespaces ("
+    "namespace TEXT PRIMARY KEY, entries INTEGER NOT NULL, bytes INTEGER NOT NULL)",
+    "INSERT INTO memory_namespaces SELECT namespace, COUNT(*), "
+    "SUM(length(CAST(key AS BLOB)) + length(CAST(value AS BLOB))) FROM memories GROUP BY namespace",
+    "CREATE TRIGGER memories_count_ai AFTER INSERT ON memories BEGIN "
+    "INSERT INTO memory_namespaces VALUES (new.namespace, 0, 0) ON CONFLICT DO NOTHING; "
+    "UPDATE memory_namespaces SET entries = entries + 1, "
+    "bytes = bytes + length(CAST(new.key AS BLOB)) + length(CAST(new.value AS BLOB)) "
+    "WHERE namespace = new.namespace; END",
+    "CREATE TRIGGER memories_count_ad AFTER DELETE ON memories BEGIN "
+    "UPDATE memory_namespaces SET entries = entries - 1, "
+    "bytes = bytes - length(CAST(old.key AS BLOB)) - length(CAST(old.value AS BLOB)) "
+    "WHERE namespace = old.namespace; END",
+    "CREATE TRIGGER memories_count_au AFTER UPDATE OF value ON memories BEGIN "
+    "UPDATE memory_namespaces SET "
+    "bytes = bytes - length(CAST(old.value AS BLOB)) + length(CAST(new.value AS BLOB)) "
+    "WHERE namespace = new.namespace; END",
+)
+
+_LIVE = "(expires_at IS NULL OR expires_at > ?)"
+_UPSERT = (
+    "INSERT INTO memories (namespace, key, value, updated_at, accessed_at, expires_at) "
+    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(namespace, key) DO UPDATE SET "
+    "value = excluded.value, updated_at = excluded.updated_at, "
+    "accessed_at = excluded.accessed_at, expires_at = excluded.expires_at"
+)
+_EXPORT_BATCH = 1000
+
+
+class MemoryMatch(NamedTuple):
+    """A single recall result."""
+
+    key: str
+    snippet: str
+
 
 def _get_memory_path() -> Path:
-    """Get the path to the memory storage file."""
+    """Get the path to the legacy JSON memory file."""
     return Path.home() / ".zeroclaw" / "memory_store.json"
 
 
-def _load_memory() -> dict:
-    """Load memory from disk."""
-    path = _get_memory_path()
-    if not path.exists():
-        return {}
+def _get_db_path() -> Path:
+    """Get the path to the memory database."""
+    return Path.home() / ".zeroclaw" / "memory.db"
+
+
+_active_namespace: ContextVar[str] = ContextVar("zeroclaw_memory_namespace", default="")
+
+
+@contextlib.contextmanager
+def memory_namespace(namespace: str) -> Iterator[str]:
+    """
+    Scope memory_store and memory_recall calls in the block to ``namespace``.
+
+    Example:
+        ```python
+        with memory_namespace(f"discord:{user_id}"):
+            await agent.ainvoke({"messages": messages})
+        ```
+    """
+    token = _active_namespace.set(namespace)
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+        yield namespace
+    finally:
+        _active_namespace.reset(token)
+
+
+class _NamespaceVectors:
+    """Vector index for one namespace plus what it was last synced against."""
+
+    def __init__(self, embedder: Embedder):
+        self.embedder = embedder.name
+        self.index = VectorIndex(embedder.dim)
+        self.times: dict[str, float] = {}
+        self.synced_at = 0.0
+
+
+class MemoryStore:
+    """
+    SQLite-backed key-value memory.
+
+    The database runs in WAL mode so the CLI and long-running integrations can
+    read and write the same store concurrently. On first open, entries from the
+    legacy ``memory_store.json`` file are imported once and the file is renamed.
+
+    Entries live in namespaces (one per user, channel, or agent) that are looked
+    up independently. Entries may carry a TTL, and each namespace can be capped
+    by entry count and by bytes, evicting the least recently used entries. A
+    background thread started with ``start_compaction`` purges expired entries,
+    re-applies the caps, and compacts the index and WAL.
+
+    Semantic recall embeds entries lazily on the first semantic query, caches the
+    vectors in the ``memory_vectors`` table, and keeps them in a contiguous
+    in-memory matrix per namespace that is refreshed incrementally.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        legacy_path: Optional[Path] = None,
+        embedder: Optional[Embedder] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self.path = path
+        self.embedder = embedder
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._vectors: dict[str, _NamespaceVectors] = {}
+        self._compactor: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate(legacy_path)
+        self.has_fts = (
+            self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memories_fts'"
+            ).fetchone()
+            is not None
+        )
+
+    def _migrate(self, legacy_path: Optional[Path]) -> None:
+        """Create or upgrade the schema, importing the legacy JSON file if present."""
+        imported = False
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+                if version < 1:
+                    self._conn.execute(
+                        "CREATE TABLE IF NOT EXISTS memories ("
+                        "key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)"
+                    )
+                    imported = self._import_legacy(legacy_path)
+                fts = self._fts5_available()
+                if version < 2 and fts:
+                    for statement in _FTS_SCHEMA:
+                        self._conn.execute(statement)
+                if version < 3:
+                    for statement in _VECTOR_SCHEMA:
+                        self._conn.execute(statement)
+                if version < 4:
+                    for statement in _NAMESPACE_SCHEMA:
+                        self._conn.execute(statement)
+                    if fts:
+                        for statement in _FTS_SCHEMA:
+                            self._conn.execute(statement)
+                if version < 5 and fts:
+                    # v4 re-indexed rows on every update, including recall's accessed_at.
+                    self._conn.execute("DROP TRIGGER IF EXISTS memories_au")
+                    self._conn.execute(_FTS_UPDATE_TRIGGER)
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        if imported:
+            with contextlib.suppress(OSError):
+                legacy_path.rename(legacy_path.with_suffix(".json.migrated"))
+
+    def _fts5_available(self) -> bool:
+        """Return True if this SQLite build has the FTS5 extension."""
+        try:
+            self._conn.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+            self._conn.execute("DROP TABLE temp._fts5_probe")
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    def _import_legacy(self, legacy_path: Optional[Path]) -> bool:
+        """Copy entries from the legacy JSON file into the open transaction."""
+        if legacy_path is None or not legacy_path.exists():
+            return False
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except (OSError, ValueError):
+            return False
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO memories (key, value, updated_at) VALUES (?, ?, ?)",
+            [(str(k), str(v), now) for k, v in legacy.items()],
+        )
+        return True
+
+    def store(
+        self,
+        key: str,
+        value: str,
+        namespace: str = DEFAULT_NAMESPACE,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """Insert or update a single entry, expiring after ``ttl`` seconds if given."""
+        self._check_size(key, value)
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._lock, self._conn:
+            self._conn.execute(_UPSERT, (namespace, key, value, now, now, expires_at))
+            self._evict(namespace)
+
+    def store_many(
+        self,
+        entries: Iterable[Union[tuple[str, str], dict]],
+        namespace: str = DEFAULT_NAMESPACE,
+        ttl: Optional[float] = None,
+    ) -> int:
+        """
+        Insert or update many entries in a single transaction.
+
+        ``entries`` may be (key, value) pairs or dicts with "key", "value", and an
+        optional per-entry "ttl" in seconds. It is consumed lazily, so a generator
+        over a large file is never held in memory. Nothing is written if any
+        entry is invalid.
+
+        Returns:
+            The number of entries written
+        """
+        now = time.time()
+        written = 0
+
+        def rows() -> Iterator[tuple]:
+            nonlocal written
+            for entry in entries:
+                key, value, entry_ttl = _coerce_entry(entry, ttl)
+                self._check_size(key, value)
+                written += 1
+                expires_at = now + entry_ttl if entry_ttl else None
+                yield (namespace, key, value, now, now, expires_at)
+
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT, rows())
+            self._evict(namespace)
+        return written
+
+    def import_jsonl(
+        self,
+        path: Union[str, Path],
+        namespace: str = DEFAULT_NAMESPACE,
+        ttl: Optional[float] = None,
+    ) -> int:
+        """Stream entries from a JSONL file (one entry object per line) into ``namespace``."""
+
+        def entries() -> Iterator[dict]:
+            with open(path, "r", encoding="utf-8") as f:
+                for line_no, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except ValueError as e:
+                        raise ValueError(f"{path}:{line_no}: invalid JSON: {e}") from e
+
+        return self.store_many(entries(), namespace=namespace, ttl=ttl)
+
+    def export_jsonl(
+        self, destination: Union[str, Path, TextIO], namespace: str = DEFAULT_NAMESPACE
+    ) -> int:
+        """
+        Stream the live entries of ``namespace`` to JSONL, in key order.
+
+        The export reads from its own snapshot connection, so it neither holds
+        the store lock nor blocks concurrent writers.
+
+        Returns:
+            The number of entries written
+        """
+        now = time.time()
+        reader = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True, timeout=30)
+        try:
+            cursor = reader.execute(
+                f"SELECT key, value, expires_at FROM memories WHERE namespace = ? AND {_LIVE} "
+                "ORDER BY key",
+                (namespace, now),
+            )
+            with contextlib.ExitStack() as stack:
+                if isinstance(destination, (str, Path)):
+                    out = stack.enter_context(open(destination, "w", encoding="utf-8"))
+                else:
+                    out = destination
+                written = 0
+                while rows := cursor.fetchmany(_EXPORT_BATCH):
+                    for key, value, expires_at in rows:
+                        record = {"key": key, "value": value}
+                        if expires_at is not None:
+                            record["ttl"] = round(expires_at - now, 3)
+                        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    written += len(rows)
+        finally:
+            reader.close()
+        return written
 
+    def _check_size(self, key: str, value: str) -> None:
+        """Reject entries that could never fit under the namespace byte cap."""
+        if self.max_bytes and len(key.encode()) + len(value.encode()) > self.max_bytes:
+            raise ValueError(f"Entry is larger than the {self.max_bytes}-byte namespace cap")
 
-def _save_memory(data: dict) -> None:
-    """Save memory to disk."""
-    path = _get_memory_path()
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    def get(self, key: str, namespace: str = DEFAULT_NAMESPACE) -> Optional[str]:
+        """Return the live value stored under ``key``, if any."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value FROM memories WHERE namespace = ? AND key = ? AND {_LIVE}",
+                (namespace, key, now),
+            ).fetchone()
+            if row:
+                self._touch(namespace, [key], now)
+        return row[0] if row else None
+
+    def _touch(self, namespace: str, keys: list[str], now: float) -> None:
+        """Record an access to ``keys`` for LRU eviction."""
+        if not keys:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE memories SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                [(now, namespace, key) for key in keys],
+            )
+
+    def _evict(self, namespace: str) -> int:
+        """Delete least recently used entries until ``namespace`` is within its caps."""
+        row = self._conn.execute(
+            "SELECT entries, bytes FROM memory_namespaces WHERE namespace = ?", (namespace,)
+        ).fetchone()
+        if row is None:
+            return 0
+        entries, size = row
+        excess_entries = entries - self.max_entries if self.max_entries else 0
+        excess_bytes = size - self.max_bytes if self.max_bytes else 0
+        if excess_entries <= 0 and excess_bytes <= 0:
+            return 0
+
+        victims = []
+        freed = 0
+        cursor = self._conn.execute(
+            "SELECT rowid, length(CAST(key AS BLOB)) + length(CAST(value AS BLOB)) "
+            "FROM memories WHERE namespace = ? ORDER BY accessed_at",
+            (namespace,),
+        )
+        for rowid, entry_bytes in cursor:
+            if len(victims) >= excess_entries and freed >= excess_bytes:
+                break
+            victims.append((rowid,))
+            freed += entry_bytes
+        cursor.close()
+        self._conn.executemany("DELETE FROM memories WHERE rowid = ?", victims)
+        return len(victims)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        offset: int = 0,
+        mode: str = "keyword",
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> tuple[int, list[MemoryMatch]]:
+        """
+        Return (total matches, one page of matches) for ``query``, best first.
+
+        ``mode`` is one of "keyword", "semantic", or "hybrid". Hybrid combines
+        the keyword and semantic rankings with reciprocal rank fusion.
+        """
+        if mode not in RECALL_MODES:
+            raise ValueError(f"Unknown recall mode: {mode}")
+        if mode == "keyword":
+            total, matches = self._keyword_search(query, limit, offset, namespace)
+            with self._lock:
+                self._touch(namespace, [m.key for m in matches], time.time())
+            return total, matches
+
+        pool = max(MAX_RECALL, 2 * (offset + limit))
+        semantic = [
+            key
+            for key, score in self.semantic_search(query, pool, namespace)
+            if score >= MIN_SIMILARITY
+        ]
+        snippets: dict[str, str] = {}
+        if mode == "semantic":
+            ranked = semantic
+        else:
+            _, keyword = self._keyword_search(query, pool, 0, namespace)
+            snippets = {m.key: m.snippet for m in keyword}
+            fused: dict[str, float] = {}
+            for ranking in ([m.key for m in keyword], semantic):
+                for rank, key in enumerate(ranking):
+                    fused[key] = fused.get(key, 0.0) + 1.0 / (_RRF_K + rank + 1)
+            ranked = sorted(fused, key=fused.__getitem__, reverse=True)
+
+        page = ranked[offset : offset + limit]
+        missing = [key for key in page if key not in snippets]
+        with self._lock:
+            if missing:
+                rows = self._conn.execute(
+                    "SELECT key, substr(value, 1, 200) FROM memories WHERE namespace = ? "
+                    f"AND key IN ({', '.join('?' * len(missing))})",
+                    [namespace, *missing],
+                ).fetchall()
+                snippets.update(rows)
+            self._touch(namespace, page, time.time())
+        return len(ranked), [MemoryMatch(key, snippets.get(key, "")) for key in page]
+
+    def semantic_search(
+        self, query: str, k: int, namespace: str = DEFAULT_NAMESPACE
+    ) -> list[tuple[str, float]]:
+        """Return the ``k`` live entries closest in meaning to ``query`` as (key, cosine) pairs."""
+        require_numpy()
+        with self._lock:
+            if self.embedder is None:
+                self.embedder = HashingEmbedder()
+            vectors = self._sync_vectors(namespace)
+            expired = {
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT key FROM memories WHERE namespace = ? AND expires_at <= ?",
+                    (namespace, time.time()),
+                )
+            }
+            hits = vectors.index.search(self.embedder([query])[0], k + len(expired))
+        return [hit for hit in hits if hit[0] not in expired][:k]
+
+    def _sync_vectors(self, namespace: str) -> _NamespaceVectors:
+        """Bring the vector index for ``namespace`` up to date with the memories table."""
+        name = self.embedder.name
+        vectors = self._vectors.get(namespace)
+        if vectors is None or vectors.embedder != name:
+            vectors = self._vectors[namespace] = _NamespaceVectors(self.embedder)
+            rows = self._conn.execute(
+                "SELECT m.key, m.updated_at, v.vector FROM memories m "
+                "JOIN memory_vectors v ON v.namespace = m.namespace AND v.key = m.key "
+                "WHERE m.namespace = ? AND v.embedder = ? AND v.updated_at = m.updated_at",
+                (namespace, name),
+            ).fetchall()
+            if rows:
+                matrix = np.frombuffer(b"".join(r[2] for r in rows), dtype=np.float32)
+                vectors.index.upsert([r[0] for r in rows], matrix.reshape(len(rows), -1))
+                vectors.times = {r[0]: r[1] for r in rows}
+            vectors.synced_at = max(vectors.times.values(), default=0.0)
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM memory_vectors WHERE namespace = ? AND key NOT IN "
+                    "(SELECT key FROM memories WHERE namespace = ?)",
+                    (namespace, namespace),
+                )
+            stale = self._conn.execute(
+                "SELECT m.key, m.value, m.updated_at FROM memories m "
+                "LEFT JOIN memory_vectors v ON v.namespace = m.namespace AND v.key = m.key "
+                "AND v.embedder = ? AND v.updated_at = m.updated_at "
+                "WHERE m.namespace = ? AND v.key IS NULL",
+                (name, namespace),
+            ).fetchall()
+        else:
+            stale = self._conn.execute(
+                "SELECT key, value, updated_at FROM memories "
+                "WHERE namespace = ? AND updated_at >= ?",
+                (namespace, vectors.synced_at),
+            ).fetchall()
+
+        stale = [row for row in stale if vectors.times.get(row[0]) != row[2]]
+        for start in range(0, len(stale), _EMBED_BATCH):
+            batch = stale[start : start + _EMBED_BATCH]
+            embedded = self.embedder([f"{key}: {value}" for key, value, _ in batch])
+            vectors.index.upsert([row[0] for row in batch], embedded)
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO memory_vectors "
+                    "(namespace, key, embedder, updated_at, vector) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (namespace, key, name, updated_at, np.asarray(v, np.float32).tobytes())
+                        for (key, _, updated_at), v in zip(batch, embedded)
+                    ],
+                )
+            vectors.times.update((row[0], row[2]) for row in batch)
+            vectors.synced_at = max(vectors.synced_at, max(row[2] for row in batch))
+
+        if self._count(namespace) != len(vectors.index):
+            del self._vectors[namespace]
+            return self._sync_vectors(namespace)
+        return vectors
+
+    def _keyword_search(
+        self, query: str, limit: int, offset: int, namespace: str
+    ) -> tuple[int, list[MemoryMatch]]:
+        """
+        Keyword search over keys and values.
+
+        With FTS5, entries are ranked by BM25 with keys weighted above values and
+        every query word matched as a prefix. Without it, or for queries with no
+        word characters, this falls back to a case-insensitive substring scan.
+        """
+        now = time.time()
+        terms = _TOKEN.findall(query.lower())
+        if self.has_fts and terms:
+            match = " OR ".join(f'"{term}"*' for term in terms)
+            where = (
+                "FROM memories_fts JOIN memories m ON m.rowid = memories_fts.rowid "
+                "WHERE memories_fts MATCH ? AND m.namespace = ? "
+                "AND (m.expires_at IS NULL OR m.expires_at > ?)"
+            )
+            with self._lock:
+                total = self._conn.execute(
+                    f"SELECT COUNT(*) {where}", (match, namespace, now)
+                ).fetchone()[0]
+                rows = self._conn.execute(
+                    f"SELECT m.key, snippet(memories_fts, 1, '[', ']', '...', ?) {where} "
+                    "ORDER BY bm25(memories_fts, 4.0, 1.0) LIMIT ? OFFSET ?",
+                    (SNIPPET_TOKENS, match, namespace, now, limit, offset),
+                ).fetchall()
+            return total, [MemoryMatch(*row) for row in rows]
+
+        needle = query.lower()
+        where = (
+            f"WHERE namespace = ? AND {_LIVE} "
+            "AND (instr(lower(key), ?) > 0 OR instr(lower(value), ?) > 0)"
+        )
+        params = (namespace, now, needle, needle)
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM memories {where}", params).fetchone()[
+                0
+            ]
+            rows = self._conn.execute(
+                f"SELECT key, substr(value, 1, 200) FROM memories {where} "
+                "ORDER BY key LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+        return total, [MemoryMatch(*row) for row in rows]
+
+    def _count(self, namespace: str) -> int:
+        row = self._conn.execute(
+            "SELECT entries FROM memory_namespaces WHERE namespace = ?", (namespace,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def count(self, namespace: str = DEFAULT_NAMESPACE) -> int:
+        """Return the number of entries in ``namespace``, including unpurged expired ones."""
+        with self._lock:
+            return self._count(namespace)
+
+    def compact(self) -> int:
+        """
+        Purge expired entries, enforce the caps in every namespace, and compact storage.
+
+        Returns:
+            The number of entries removed
+        """
+        with self._lock:
+            with self._conn:
+                removed = self._conn.execute(
+                    "DELETE FROM memories WHERE expires_at <= ?", (time.time(),)
+                ).rowcount
+                namespaces = [
+                    row[0] for row in self._conn.execute("SELECT namespace FROM memory_namespaces")
+                ]
+                for namespace in namespaces:
+                    removed += self._evict(namespace)
+                self._conn.execute("DELETE FROM memory_namespaces WHERE entries <= 0")
+                if self.has_fts and removed:
+                    self._conn.execute("INSERT INTO memories_fts(memories_fts) VALUES ('optimize')")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("PRAGMA optimize")
+        return removed
+
+    def start_compaction(self, interval: float = COMPACTION_INTERVAL) -> None:
+        """Run ``compact`` every ``interval`` seconds on a daemon thread."""
+        if self._compactor is not None:
+            return
+
+        def run() -> None:
+            while not self._stop.wait(interval):
+                with contextlib.suppress(sqlite3.Error):
+                    self.compact()
+
+        self._compactor = threading.Thread(
+            target=run, name="zeroclaw-memory-compaction", daemon=True
+        )
+        self._compactor.start()
+
+    def close(self) -> None:
+        """Stop background compaction and close the underlying connection."""
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+        with self._lock:
+            self._conn.close()
+
+
+def _coerce_entry(
+    entry: Union[tuple[str, str], dict], ttl: Optional[float]
+) -> tuple[str, str, Optional[float]]:
+    """Normalize one bulk entry to (key, value, ttl)."""
+    if isinstance(entry, dict):
+        key, value, ttl = entry.get("key"), entry.get("value"), entry.get("ttl", ttl)
+    else:
+        key, value = entry
+    if not isinstance(key, str) or not key or value is None:
+        raise ValueError(f"Invalid memory entry: {entry!r}")
+    return key, value if isinstance(value, str) else str(value), ttl
+
+
+_stores: dict[Path, MemoryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.environ.get(name, "")
+    return int(value) if value.strip() else None
+
+
+def get_memory_store() -> MemoryStore:
+    """
+    Return the shared store for the current memory database path.
+
+    Per-namespace caps come from ZEROCLAW_MEMORY_MAX_ENTRIES and
+    ZEROCLAW_MEMORY_MAX_BYTES; background compaction runs every
+    ZEROCLAW_MEMORY_COMPACTION_INTERVAL seconds (0 disables it).
+    """
+    path = _get_db_path()
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = MemoryStore(
+                path,
+                legacy_path=_get_memory_path(),
+                max_entries=_env_int("ZEROCLAW_MEMORY_MAX_ENTRIES"),
+                max_bytes=_env_int("ZEROCLAW_MEMORY_MAX_BYTES"),
+            )
+            interval = float(
+                os.environ.get("ZEROCLAW_MEMORY_COMPACTION_INTERVAL", COMPACTION_INTERVAL)
+            )
+            if interval > 0:
+                store.start_compaction(interval)
+            _stores[path] = store
+        return store
 
 
 @tool
-def memory_store(key: str, value: str) -> str:
+def memory_store(key: str, value: str, ttl_seconds: int = 0) -> str:
     """
     Store a key-value pair in persistent memory.
 
     Args:
         key: The key to store under
         value: The value to store
+        ttl_seconds: Forget the entry after this many seconds (0 keeps it)
 
     Returns:
         Confirmation message
     """
     try:
-        data = _load_memory()
-        data[key] = value
-        _save_memory(data)
+        get_memory_store().store(
+            key, value, namespace=_active_namespace.get(), ttl=ttl_seconds or None
+        )
         return f"Stored: {key}"
     except Exception as e:
         return f"Error: {e}"
 
 
 @tool
-def memory_recall(query: str) -> str:
+def memory_store_many(
+    entries: Optional[list[dict]] = None, jsonl_path: str = "", ttl_seconds: int = 0
+) -> str:
     """
-    Search memory for entries matching the query.
+    Store many key-value pairs in persistent memory in one call.
+
+    Args:
+        entries: List of {"key": ..., "value": ...} objects (each may also set "ttl")
+        jsonl_path: Path to a JSONL file with one such object per line
+        ttl_seconds: Default time-to-live for entries without their own "ttl" (0 keeps them)
+
+    Returns:
+        Confirmation message with the number of entries stored
+    """
+    if not entries and not jsonl_path:
+        return "Error: Provide entries or jsonl_path"
+    try:
+        store = get_memory_store()
+        namespace = _active_namespace.get()
+        ttl = ttl_seconds or None
+        stored = 0
+        if entries:
+            stored += store.store_many(entries, namespace=namespace, ttl=ttl)
+        if jsonl_path:
+            stored += store.import_jsonl(jsonl_path, namespace=namespace, ttl=ttl)
+        return f"Stored {stored} entries"
+    except FileNotFoundError:
+        return f"Error: File not found: {jsonl_path}"
+    except Exception as e:
+        return f"Error: {e}"
+
+
+@tool
+def memory_recall(query: str, limit: int = 5, offset: int = 0, mode: str = "keyword") -> str:
+    """
+    Search memory for entries matching the query, most relevant first.
 
     Args:
         query: The search query
+        limit: Maximum number of entries to return (max 50)
+        offset: Number of entries to skip, for paging through results
+        mode: "keyword" for word matches, "semantic" for entries similar in
+            meaning, or "hybrid" to combine both
 
     Returns:
-        Matching entries or "no matches" message
+        Matching entries with snippets, or "no matches" message
     """
     try:
-        data = _load_memory()
-        if not data:
+        store = get_memory_store()
+        namespace = _active_namespace.get()
+        if store.count(namespace) == 0:
             return "No memories stored yet"
 
-        query_lower = query.lower()
-        matches = {
-            k: v
-            for k, v in data.items()
-            if query_lower in k.lower() or query_lower in str(v).lower()
-        }
-
+        limit = min(max(limit, 1), MAX_RECALL)
+        offset = max(offset, 0)
+        if mode not in RECALL_MODES:
+            return f"Error: mode must be one of {', '.join(RECALL_MODES)}"
+        total, matches = store.search(
+            query, limit=limit, offset=offset, mode=mode, namespace=namespace
+        )
         if not matches:
+            if total:
+                return f"No more matches for: {query} ({total} total)"
             return f"No matches for: {query}"
 
-        return json.dumps(matches, indent=2)
+        lines = [f"{offset + 1}-{offset + len(matches)} of {total} matches:"]
+        lines.extend(f"- {m.key}: {m.snippet}" for m in matches)
+        if offset + len(matches) < total:
+            lines.append(f"(use offset={offset + len(matches)} for more)")
+        return "\n".join(lines)
     except Exception as e:
         return f"Error: {e}"
@@ -0,0 +1,181 @@
+"""
+Lazy tool registry with entry-point plugin discovery.
+"""
+
+import fnmatch
+import importlib
+import os
+import threading
+from collections.abc import Iterable
+from importlib.metadata import entry_points
+from typing import Optional, Union
+
+from langchain_core.tools import BaseTool
+
+
+ENTRY_POINT_GROUP = "zeroclaw_tools.tools"
+
+# Built-in tools by name, as "module:attribute". Nothing is imported until a
+# tool is selected, so heavy dependencies only load for the tools in use.
+BUILTIN_TOOLS = {
+    "shell": "zeroclaw_tools.tools.shell:shell",
+    "file_read": "zeroclaw_tools.tools.file:file_read",
+    "file_read_many": "zeroclaw_tools.tools.file:file_read_many",
+    "file_write": "zeroclaw_tools.tools.file:file_write",
+    "file_edit": "zeroclaw_tools.tools.file:file_edit",
+    "file_append": "zeroclaw_tools.tools.file:file_append",
+    "file_search": "zeroclaw_tools.tools.search:file_search",
+    "web_search": "zeroclaw_tools.tools.web:web_search",
+    "http_request": "zeroclaw_tools.tools.web:http_request",
+    "http_fetch_many": "zeroclaw_tools.tools.web:http_fetch_many",
+    "memory_store": "zeroclaw_tools.tools.memory:memory_store",
+    "memory_store_many": "zeroclaw_tools.tools.memory:memory_store_many",
+    "memory_recall": "zeroclaw_tools.tools.memory:memory_recall",
+}
+
+ToolSpec = Union[str, Iterable[str], None]
+
+
+def _import_target(target: str) -> BaseTool:
+    """Import a "module:attribute" reference."""
+    module_name, _, attr = target.partition(":")
+    obj = importlib.import_module(module_name)
+    for part in attr.split(".") if attr else ():
+        obj = getattr(obj, part)
+    return obj
+
+
+def parse_tool_spec(spec: ToolSpec) -> list[str]:
+    """Split a selection such as "shell,file_*" into its patterns."""
+    if spec is None:
+        return ["*"]
+    if isinstance(spec, str):
+        spec = spec.split(",")
+    return [pattern.strip() for pattern in spec if pattern.strip()]
+
+
+class ToolRegistry:
+    """
+    Tools known by name, imported on first use.
+
+    Built-in tools are always registered. Third-party packages add tools
+    through the "zeroclaw_tools.tools" entry point group, e.g.
+
+        [project.entry-points."zeroclaw_tools.tools"]
+        weather = "my_package.weather:get_weather"
+
+    and ZEROCLAW_TOOL_PLUGINS adds "name=module:attribute" pairs (comma
+    separated) without packaging. Later sources override earlier ones.
+    """
+
+    def __init__(self, discover: bool = True):
+        self._targets: dict[str, object] = dict(BUILTIN_TOOLS)
+        self._loaded: dict[str, BaseTool] = {}
+        self._lock = threading.Lock()
+        if discover:
+            self.discover()
+
+    def discover(self) -> None:
+        """Register tools from installed entry points and ZEROCLAW_TOOL_PLUGINS."""
+        for ep in entry_points(group=ENTRY_POINT_GROUP):
+            self.register(ep.name, ep)
+        for item in os.environ.get("ZEROCLAW_TOOL_PLUGINS", "").split(","):
+            name, sep, target = item.partition("=")
+            if sep and name.strip() and target.strip():
+                self.register(name.strip(), target.strip())
+
+    def register(self, name: str, target: object) -> None:
+        """
+        Register a tool under ``name``.
+
+        Args:
+            name: Name used to select the tool
+            target: A tool instance, a "module:attribute" string, or an entry point
+        """
+        with self._lock:
+            self._targets[name] = target
+            self._loaded.pop(name, None)
+
+    def names(self) -> list[str]:
+        """Every registered tool name, built-ins first."""
+        return list(self._targets)
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether the tool's module has been imported by this registry."""
+        return name in self._loaded
+
+    def select(self, spec: ToolSpec = None) -> list[str]:
+        """
+        Resolve a selection to tool names.
+
+        Patterns are names or shell-style globs ("file_*"); a pattern starting
+        with "-" removes matching tools again ("*,-shell"). Names keep the order
+        of the patterns and then of the registry, without duplicates.
+
+        Raises:
+            ValueError: If a pattern matches no registered tool
+        """
+        selected: list[str] = []
+        for pattern in parse_tool_spec(spec):
+            exclude = pattern.startswith("-")
+            pattern = pattern.lstrip("-").strip()
+            matches = fnmatch.filter(self._targets, pattern)
+            if not matches:
+                raise ValueError(f"Unknown tool '{pattern}'. Available: {', '.join(self.names())}")
+            if exclude:
+                selected = [name for name in selected if name not in matches]
+            else:
+                selected.extend(name for name in matches if name not in selected)
+        return selected
+
+    def get(self, name: str) -> BaseTool:
+        """Return the tool registered as ``name``, importing it if needed."""
+        with self._lock:
+            tool = self._loaded.get(name)
+            if tool is not None:
+                return tool
+            if name not in self._targets:
+                raise ValueError(f"Unknown tool '{name}'. Available: {', '.join(self.names())}")
+            target = self._targets[name]
+        if isinstance(target, BaseTool):
+            tool = target
+        elif isinstance(target, str):
+            tool = _import_target(target)
+        else:
+            tool = target.load()
+        if not isinstance(tool, BaseTool):
+            raise TypeError(f"Tool '{name}' resolved to {type(tool).__name__}, not a tool")
+        with self._lock:
+            self._loaded[name] = tool
+        return tool
+
+    def load(self, spec: ToolSpec = None) -> list[BaseTool]:
+        """Import and return the tools matching ``spec`` (every tool by default)."""
+        return [self.get(name) for name in self.select(spec)]
+
+
+_registry: Optional[ToolRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_tool_registry() -> ToolRegistry:
+    """Return the shared registry, discovering plugins on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ToolRegistry()
+        return _registry
+
+
+def load_tools(spec: ToolSpec = None) -> list[BaseTool]:
+    """
+    Load tools by name or glob from the shared registry.
+
+    Args:
+        spec: Comma-separated names/globs such as "shell,file_*", a list of
+            them, or None for every registered tool
+
+    Returns:
+        The selected tools, ready to pass to ``create_agent``
+    """
+    return get_tool_registry().load(spec)
@@ -0,0 +1,254 @@
+"""
+Content search tool.
+"""
+
+import fnmatch
+import mmap
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from langchain_core.tools import tool
+
+
+MAX_RESULTS = 200
+MAX_LINE_LENGTH = 300
+IGNORE_FILES = (".gitignore", ".ignore")
+ALWAYS_SKIP = frozenset({".git", ".hg", ".svn"})
+_BINARY_SNIFF = 8192
+_SEARCH_WORKERS = 8
+
+
+class _IgnoreRule(NamedTuple):
+    base: str
+    pattern: str
+    negate: bool
+    dir_only: bool
+    anchored: bool
+
+
+def _parse_ignore_file(directory: str) -> list[_IgnoreRule]:
+    """Parse the ignore files in ``directory`` into rules relative to it."""
+    rules = []
+    for name in IGNORE_FILES:
+        try:
+            with open(os.path.join(directory, name), encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if line.startswith("**/"):
+                line, anchored = line[3:], "/" in line[3:]
+            if line:
+                rules.append(_IgnoreRule(directory, line, negate, dir_only, anchored))
+    return rules
+
+
+def _is_ignored(path: str, is_dir: bool, rules: list[_IgnoreRule]) -> bool:
+    """Apply gitignore-style rules in order; the last matching rule wins."""
+    ignored = False
+    name = os.path.basename(path)
+    for rule in rules:
+        if rule.dir_only and not is_dir:
+            continue
+        target = os.path.relpath(path, rule.base).replace(os.sep, "/") if rule.anchored else name
+        if fnmatch.fnmatchcase(target, rule.pattern):
+            ignored = not rule.negate
+    return ignored
+
+
+def _scan_dir(directory: str, rules: list[_IgnoreRule]) -> tuple[list, list[str]]:
+    """List one directory, returning (subdirectories with their rules, files)."""
+    rules = rules + _parse_ignore_file(directory)
+    subdirs, files = [], []
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return subdirs, files
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if not is_dir and not entry.is_file(follow_symlinks=False):
+                continue
+        except OSError:
+            continue
+        if is_dir and entry.name in ALWAYS_SKIP:
+            continue
+        if _is_ignored(entry.path, is_dir, rules):
+            continue
+        if is_dir:
+            subdirs.append((entry.path, rules))
+        else:
+            files.append(entry.path)
+    return subdirs, files
+
+
+def _walk(root: str, pool: ThreadPoolExecutor) -> list[str]:
+    """Walk ``root`` breadth-first, listing each level's directories in parallel."""
+    files: list[str] = []
+    level = [(root, [])]
+    while level:
+        next_level = []
+        for subdirs, found in pool.map(lambda item: _scan_dir(*item), level):
+            next_level.extend(subdirs)
+            files.extend(found)
+        level = next_level
+    files.sort()
+    return files
+
+
+def _clip(line: bytes) -> str:
+    """Decode one line for display, truncating very long lines."""
+    text = line.decode("utf-8", errors="replace").rstrip("\r")
+    if len(text) > MAX_LINE_LENGTH:
+        return text[:MAX_LINE_LENGTH] + "..."
+    return text
+
+
+def _scan_file(
+    path: str, regex: re.Pattern, context: int, limit: int, stop: threading.Event
+) -> list[tuple[int, str, list[tuple[int, str]]]]:
+    """Return up to ``limit`` (line number, line, context lines) matches in ``path``."""
+    if stop.is_set():
+        return []
+    matches = []
+    try:
+        with open(path, "rb") as f:
+            if b"\0" in f.read(_BINARY_SNIFF) or os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                line_no, counted_to, pos = 1, 0, 0
+                while pos <= len(mm):
+                    match = regex.search(mm, pos)
+                    if match is None:
+                        break
+                    start = mm.rfind(b"\n", 0, match.start()) + 1
+                    end = mm.find(b"\n", start)
+                    end = len(mm) if end == -1 else end
+                    pos = end + 1
+                    # Matches are per line, as with grep: one that runs into the
+                    # next line counts only if the pattern also matches this line alone.
+                    if match.end() > end and regex.search(mm, start, end) is None:
+                        continue
+                    line_no += mm[counted_to:start].count(b"\n")
+                    counted_to = start
+
+                    around = []
+                    if context:
+                        before = start
+                        for i in range(context):
+                            if before == 0:
+                                break
+                            prev = mm.rfind(b"\n", 0, before - 1) + 1
+                            around.insert(0, (line_no - i - 1, _clip(mm[prev : before - 1])))
+                            before = prev
+                        after = end
+                        for i in range(context):
+                            if after >= len(mm) - 1:
+                                break
+                            nxt = mm.find(b"\n", after + 1)
+                            nxt = len(mm) if nxt == -1 else nxt
+                            around.append((line_no + i + 1, _clip(mm[after + 1 : nxt])))
+                            after = nxt
+
+                    matches.append((line_no, _clip(mm[start:end]), around))
+                    if len(matches) >= limit:
+                        break
+    except (OSError, ValueError):
+        return []
+    return matches
+
+
+def _glob_match(file_path: str, root: str, pattern: str) -> bool:
+    """Match ``pattern`` against the root-relative path, or the basename if it has no slash."""
+    if "/" not in pattern:
+        return fnmatch.fnmatchcase(os.path.basename(file_path), pattern)
+    rel = os.path.relpath(file_path, root).replace(os.sep, "/")
+    return fnmatch.fnmatchcase(rel, pattern) or fnmatch.fnmatchcase(rel, pattern.replace("**/", ""))
+
+
+@tool
+def file_search(
+    pattern: str,
+    path: str = ".",
+    glob: str = "",
+    max_results: int = 50,
+    context: int = 0,
+    ignore_case: bool = False,
+) -> str:
+    """
+    Search file contents under a directory for a regular expression.
+
+    Honors .gitignore/.ignore files and skips binary files. Prefer this over
+    running grep through the shell.
+
+    Args:
+        pattern: Regular expression to search for
+        path: Directory (or single file) to search
+        glob: Optional filename filter, e.g. "*.py" or "src/**/*.ts"
+        max_results: Maximum number of matching lines to return (capped at 200)
+        context: Number of lines of context to show around each match (max 5)
+        ignore_case: Match case-insensitively
+
+    Returns:
+        Matches as "path:line: text" lines (context lines use "path-line- text"),
+        or an error message
+    """
+    try:
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        regex = re.compile(pattern.encode("utf-8"), flags)
+    except re.error as e:
+        return f"Error: Invalid pattern: {e}"
+    if not os.path.exists(path):
+        return f"Error: Path not found: {path}"
+
+    limit = min(max(max_results, 1), MAX_RESULTS)
+    context = min(max(context, 0), 5)
+    stop = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=_SEARCH_WORKERS) as pool:
+        files = [path] if os.path.isfile(path) else _walk(path, pool)
+        if glob:
+            files = [f for f in files if _glob_match(f, path, glob)]
+
+        lines: list[str] = []
+        total = 0
+        matched_files = 0
+        results = pool.map(lambda f: _scan_file(f, regex, context, limit, stop), files)
+        for file_path, matches in zip(files, results):
+            if not matches:
+                continue
+            matched_files += 1
+            for line_no, text, around in matches[: limit - total]:
+                if context and lines:
+                    lines.append("--")
+                for ctx_no, ctx_text in around:
+                    if ctx_no < line_no:
+                        lines.append(f"{file_path}-{ctx_no}- {ctx_text}")
+                lines.append(f"{file_path}:{line_no}: {text}")
+                for ctx_no, ctx_text in around:
+                    if ctx_no > line_no:
+                        lines.append(f"{file_path}-{ctx_no}- {ctx_text}")
+                total += 1
+            if total >= limit:
+                stop.set()
+                break
+
+    if not lines:
+        return f"No matches for: {pattern}"
+    summary = f"({total} matches in {matched_files} files"
+    if stop.is_set():
+        summary += f", stopped at max_results={limit}"
+    return "\n".join(lines) + f"\n{summary})"
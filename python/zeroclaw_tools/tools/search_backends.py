@@ -0,0 +1,265 @@
+"""
+Pluggable web search backends with concurrent or hedged querying.
+"""
+
+import asyncio
+import os
+from collections.abc import Sequence
+from typing import NamedTuple, Optional, Protocol
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .http_client import host_slot, request_timeout
+
+
+BRAVE_SEARCH_URL = "https://api.search.brave.com/res/v1/web/search"
+DEFAULT_DEADLINE = 5.0
+_RRF_K = 60
+_TRACKING_PARAMS = frozenset({"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src"})
+
+
+class SearchResult(NamedTuple):
+    title: str
+    url: str
+    description: str
+
+
+class SearchBackend(Protocol):
+    """A search engine that returns ranked results for a query."""
+
+    name: str
+
+    async def search(self, query: str, count: int) -> list[SearchResult]: ...
+
+
+class BraveBackend:
+    """Brave Search API (https://brave.com/search/api/)."""
+
+    name = "brave"
+
+    def __init__(self, api_key: str, timeout: Optional[float] = None):
+        self.api_key = api_key
+        self.timeout = timeout
+
+    async def search(self, query: str, count: int) -> list[SearchResult]:
+        async with host_slot(BRAVE_SEARCH_URL) as client:
+            resp = await client.get(
+                BRAVE_SEARCH_URL,
+                params={"q": query, "count": count},
+                headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
+                timeout=request_timeout(self.timeout),
+            )
+        resp.raise_for_status()
+        return [
+            SearchResult(
+                item.get("title", "No title"), item.get("url", ""), item.get("description", "")
+            )
+            for item in resp.json().get("web", {}).get("results", [])[:count]
+        ]
+
+
+class SearxngBackend:
+    """A self-hosted SearXNG (or compatible) instance with the JSON format enabled."""
+
+    name = "searxng"
+
+    def __init__(self, base_url: str, timeout: Optional[float] = None):
+        self.url = base_url.rstrip("/") + "/search"
+        self.timeout = timeout
+
+    async def search(self, query: str, count: int) -> list[SearchResult]:
+        async with host_slot(self.url) as client:
+            resp = await client.get(
+                self.url,
+                params={"q": query, "format": "json"},
+                headers={"Accept": "application/json"},
+                timeout=request_timeout(self.timeout),
+            )
+        resp.raise_for_status()
+        return [
+            SearchResult(
+                item.get("title", "No title"), item.get("url", ""), item.get("content", "")
+            )
+            for item in resp.json().get("results", [])[:count]
+        ]
+
+
+class StubBackend:
+    """
+    Offline backend for tests and local development.
+
+    Returns canned results for known queries (all of them for the key "*"),
+    optionally after a delay or by raising ``error``.
+    """
+
+    def __init__(
+        self,
+        results: dict[str, list[SearchResult]],
+        name: str = "stub",
+        delay: float = 0,
+        error: Optional[Exception] = None,
+    ):
+        self.results = results
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def search(self, query: str, count: int) -> list[SearchResult]:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return list(self.results.get(query, self.results.get("*", [])))[:count]
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Reduce a result URL to a key that identifies the page.
+
+    Scheme, a leading "www.", default ports, fragments, trailing slashes,
+    tracking parameters and query parameter order are ignored.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower().removeprefix("www.")
+    if parts.port and parts.port not in (80, 443):
+        host += f":{parts.port}"
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or ""
+    return urlunsplit(("", host, path, urlencode(query), ""))
+
+
+def merge_results(ranked: Sequence[list[SearchResult]], limit: int) -> list[SearchResult]:
+    """
+    Fuse several ranked result lists, dropping duplicate pages.
+
+    Scores use reciprocal rank fusion, so a page that several backends rank
+    highly comes first. The best-ranked copy of each page is kept, with the
+    longest description any backend gave for it.
+    """
+    scores: dict[str, float] = {}
+    best: dict[str, tuple[int, SearchResult]] = {}
+    for results in ranked:
+        for rank, result in enumerate(results):
+            if not result.url:
+                continue
+            key = canonicalize_url(result.url)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (_RRF_K + rank + 1)
+            kept = best.get(key)
+            if kept is None or rank < kept[0]:
+                description = result.description
+                if kept is not None and len(kept[1].description) > len(description):
+                    description = kept[1].description
+                best[key] = (rank, result._replace(description=description))
+            elif len(result.description) > len(kept[1].description):
+                best[key] = (kept[0], kept[1]._replace(description=result.description))
+    order = sorted(scores, key=lambda key: (-scores[key], best[key][0]))
+    return [best[key][1] for key in order[:limit]]
+
+
+async def search_backends(
+    backends: Sequence[SearchBackend],
+    query: str,
+    count: int = 5,
+    deadline: float = DEFAULT_DEADLINE,
+    hedge_after: Optional[float] = None,
+) -> tuple[list[SearchResult], list[str]]:
+    """
+    Query ``backends`` and merge what they return by ``deadline`` seconds.
+
+    With ``hedge_after`` unset, every backend is queried at once and the
+    results of all that answer in time are merged. Otherwise backends are
+    tried in order, starting the next one whenever the previous has not
+    answered within ``hedge_after`` seconds (or has failed), and the first
+    non-empty answer wins. Backends still running are cancelled.
+
+    Returns:
+        The merged results and a list of "name: problem" notes for backends
+        that failed or missed the deadline
+
+    Raises:
+        The first backend error, if every backend failed
+    """
+    loop = asyncio.get_running_loop()
+    end = loop.time() + deadline
+    waiting = list(backends)
+    tasks: dict[asyncio.Task, SearchBackend] = {}
+    running: set[asyncio.Task] = set()
+    answers: list[list[SearchResult]] = []
+    problems: list[str] = []
+    errors: list[Exception] = []
+
+    def launch() -> None:
+        backend = waiting.pop(0)
+        task = asyncio.ensure_future(backend.search(query, count))
+        tasks[task] = backend
+        running.add(task)
+
+    while waiting and (hedge_after is None or not running):
+        launch()
+    try:
+        while running:
+            timeout = end - loop.time()
+            if timeout <= 0:
+                break
+            if hedge_after is not None and waiting:
+                timeout = min(timeout, hedge_after)
+            done, _ = await asyncio.wait(
+                running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                running.discard(task)
+                error = task.exception()
+                if error is not None:
+                    errors.append(error)
+                    problems.append(f"{tasks[task].name}: {error or type(error).__name__}")
+                else:
+                    answers.append(task.result())
+            if hedge_after is not None:
+                if any(answers):
+                    break
+                if waiting:
+                    # The hedge timer fired, or an answer came back empty: try the next backend.
+                    launch()
+    finally:
+        for task in running:
+            task.cancel()
+            if not any(answers) or hedge_after is None:
+                problems.append(f"{tasks[task].name}: no answer within {deadline:g}s")
+
+    if not answers and errors:
+        raise errors[0]
+    return merge_results(answers, count), problems
+
+
+def get_search_backends() -> list[SearchBackend]:
+    """
+    Build the configured backends.
+
+    ZEROCLAW_SEARCH_BACKENDS lists them by name ("brave", "searxng") in
+    preference order; by default every backend with credentials is used.
+    Brave needs BRAVE_API_KEY and SearXNG needs SEARXNG_URL.
+    """
+    if _override is not None:
+        return list(_override)
+    available = {}
+    if os.environ.get("BRAVE_API_KEY"):
+        available["brave"] = lambda: BraveBackend(os.environ["BRAVE_API_KEY"])
+    if os.environ.get("SEARXNG_URL"):
+        available["searxng"] = lambda: SearxngBackend(os.environ["SEARXNG_URL"])
+    names = [n.strip() for n in os.environ.get("ZEROCLAW_SEARCH_BACKENDS", "").split(",")]
+    names = [n for n in names if n] or list(available)
+    return [available[name]() for name in names if name in available]
+
+
+_override: Optional[list[SearchBackend]] = None
+
+
+def set_search_backends(backends: Optional[Sequence[SearchBackend]]) -> None:
+    """Use ``backends`` instead of the environment configuration (None restores it)."""
+    global _override
+    _override = list(backends) if backends is not None else None
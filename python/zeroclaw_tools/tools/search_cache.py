@@ -0,0 +1,246 @@
+"""
+TTL cache with in-flight deduplication for web search results.
+"""
+
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Optional
+
+
+# "partial" applies to results some backends did not contribute to (see PartialResult).
+DEFAULT_TTLS = {"news": 300.0, "default": 3600.0, "reference": 86_400.0, "partial": 60.0}
+MAX_ENTRIES = 1024
+
+_NEWS = re.compile(
+    r"\b(news|latest|today|tonight|yesterday|now|current(ly)?|live|breaking|this (week|month)"
+    r"|price|prices|stock|weather|score|scores|forecast|election|trending)\b"
+)
+_REFERENCE = re.compile(
+    r"^(what is|what are|who (was|is)|define|definition of|how to|how do|meaning of)\b"
+    r"|\b(docs|documentation|tutorial|reference|manual|syntax|wikipedia|rfc)\b"
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_results (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+
+def _get_cache_path() -> Path:
+    """Get the path to the persistent search cache."""
+    return Path.home() / ".zeroclaw" / "search_cache.db"
+
+
+class PartialResult(str):
+    """A result assembled while some sources failed; cached only for the "partial" TTL."""
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold and collapse whitespace so trivially different queries share an entry."""
+    return " ".join(query.casefold().split())
+
+
+def classify_query(query: str) -> str:
+    """
+    Assign a normalized query to a freshness class.
+
+    Time-sensitive queries are "news", definitions and documentation lookups
+    are "reference", and everything else is "default".
+    """
+    if _NEWS.search(query):
+        return "news"
+    if _REFERENCE.search(query):
+        return "reference"
+    return "default"
+
+
+class SearchCache:
+    """
+    Cache of formatted search results keyed by normalized query and parameters.
+
+    Each entry lives for the TTL of its query class (see ``classify_query``),
+    and concurrent lookups of the same key share one upstream request
+    (singleflight). Only successful results are cached, and a ``PartialResult``
+    only for the shorter "partial" TTL, so a backend that was briefly down does
+    not leave degraded results behind. When ``path`` is given, entries are also
+    written to SQLite so they survive restarts.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[dict[str, float]] = None,
+        classifier: Callable[[str], str] = classify_query,
+        max_entries: int = MAX_ENTRIES,
+        path: Optional[Path] = None,
+    ):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.classifier = classifier
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(_SCHEMA)
+
+    @staticmethod
+    def make_key(query: str, **params) -> str:
+        """Build the cache key for ``query`` and the search parameters."""
+        return json.dumps([normalize_query(query), sorted(params.items())])
+
+    def ttl_for(self, query: str) -> float:
+        """Freshness lifetime for ``query`` according to its class."""
+        return self.ttls.get(self.classifier(normalize_query(query)), self.ttls["default"])
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the unexpired result for ``key``, checking the disk store on a memory miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT expires_at, result FROM search_results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = self._entries[key] = (row[0], row[1])
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, result: str, ttl: float) -> None:
+        """Cache ``result`` for ``ttl`` seconds, evicting the least recently used entries."""
+        if ttl <= 0:
+            return
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._entries[key] = (expires_at, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO search_results VALUES (?, ?, ?)",
+                        (key, result, expires_at),
+                    )
+                    self._conn.execute(
+                        "DELETE FROM search_results WHERE expires_at <= ?", (time.time(),)
+                    )
+
+    async def get_or_fetch(self, query: str, fetch: Callable[[], Awaitable[str]], **params) -> str:
+        """
+        Return the cached result for ``query`` or run ``fetch`` to produce it.
+
+        Callers that arrive while a fetch for the same key is in flight wait
+        for that fetch instead of starting their own. Exceptions propagate to
+        every waiter and nothing is cached.
+        """
+        key = self.make_key(query, **params)
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.shared += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._fill(key, query, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._settle(key, done))
+        return await asyncio.shield(task)
+
+    def _settle(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished in-flight fetch, marking its exception as retrieved."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def _fill(self, key: str, query: str, fetch: Callable[[], Awaitable[str]]) -> str:
+        result = await fetch()
+        ttl = self.ttl_for(query)
+        if isinstance(result, PartialResult):
+            ttl = min(ttl, self.ttls["partial"])
+        self.put(key, result, ttl)
+        return result
+
+    def stats(self) -> dict[str, float]:
+        """Lookup counters; ``shared`` counts callers served by another caller's request."""
+        lookups = self.hits + self.misses + self.shared
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "hit_ratio": (self.hits + self.shared) / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        """Drop every entry, in memory and on disk."""
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM search_results")
+
+
+_cache: Optional[SearchCache] = None
+_cache_lock = threading.Lock()
+
+
+def _env_ttls() -> dict[str, float]:
+    """Read per-class TTL overrides such as ZEROCLAW_SEARCH_TTL_NEWS=120."""
+    ttls = {}
+    for name in DEFAULT_TTLS:
+        value = os.environ.get(f"ZEROCLAW_SEARCH_TTL_{name.upper()}", "").strip()
+        if value:
+            ttls[name] = float(value)
+    return ttls
+
+
+def get_search_cache() -> SearchCache:
+    """
+    Return the shared search cache.
+
+    Per-class TTLs can be overridden with ZEROCLAW_SEARCH_TTL_NEWS,
+    ZEROCLAW_SEARCH_TTL_DEFAULT and ZEROCLAW_SEARCH_TTL_REFERENCE (0 disables
+    caching for that class); ZEROCLAW_SEARCH_TTL_PARTIAL caps how long results
+    missing a backend are kept. Set ZEROCLAW_SEARCH_CACHE_PERSIST=1 to keep
+    results in ~/.zeroclaw/search_cache.db across restarts.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            persist = os.environ.get("ZEROCLAW_SEARCH_CACHE_PERSIST", "").strip().lower()
+            path = _get_cache_path() if persist in ("1", "true", "yes") else None
+            _cache = SearchCache(ttls=_env_ttls(), path=path)
+        return _cache
+
+
+def set_search_cache(cache: Optional[SearchCache]) -> None:
+    """Replace the shared search cache (None recreates it from the environment on next use)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
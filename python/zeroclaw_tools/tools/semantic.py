@@ -0,0 +1,136 @@
+"""
+Embeddings and vector search for semantic memory recall.
+"""
+
+import re
+import zlib
+from typing import Protocol
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def require_numpy() -> None:
+    """Raise a helpful ImportError if NumPy is missing."""
+    if not NUMPY_AVAILABLE:
+        raise ImportError(
+            "numpy is required for semantic memory recall. "
+            "Install with: pip install zeroclaw-tools[semantic]"
+        )
+
+
+class Embedder(Protocol):
+    """
+    Turns a batch of texts into a ``(len(texts), dim)`` float32 matrix.
+
+    ``name`` identifies the model and its settings; stored vectors produced by
+    an embedder with a different name are recomputed.
+    """
+
+    name: str
+    dim: int
+
+    def __call__(self, texts: list[str]) -> "np.ndarray": ...
+
+
+class HashingEmbedder:
+    """
+    Deterministic, dependency-free embedder based on the hashing trick.
+
+    Each text is reduced to its lowercase words plus the character n-grams of
+    every word, hashed with CRC32 into ``dim`` signed buckets, and normalized to
+    unit length. It works offline and catches spelling variants and shared word
+    stems, though not true synonyms.
+    """
+
+    def __init__(self, dim: int = 256, ngram: int = 3):
+        require_numpy()
+        self.dim = dim
+        self.ngram = ngram
+        self.name = f"hashing-{dim}-{ngram}"
+
+    def _features(self, text: str) -> list[int]:
+        """Hash the words and word n-grams of ``text``."""
+        features = []
+        n = self.ngram
+        for word in _WORD.findall(text.lower()):
+            features.append(zlib.crc32(word.encode("utf-8")))
+            padded = f"<{word}>"
+            for i in range(max(len(padded) - n + 1, 1)):
+                features.append(zlib.crc32(padded[i : i + n].encode("utf-8"), 0x9E3779B9))
+        return features
+
+    def __call__(self, texts: list[str]) -> "np.ndarray":
+        rows, buckets, signs = [], [], []
+        for row, text in enumerate(texts):
+            for h in self._features(text):
+                rows.append(row)
+                buckets.append((h >> 1) % self.dim)
+                signs.append(1.0 if h & 1 else -1.0)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(
+            matrix, (np.asarray(rows, dtype=np.intp), np.asarray(buckets, dtype=np.intp)), signs
+        )
+        return normalize(matrix)
+
+
+def normalize(matrix: "np.ndarray") -> "np.ndarray":
+    """L2-normalize the rows of ``matrix`` in place, leaving zero rows as zeros."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+class VectorIndex:
+    """
+    Exact cosine-similarity index over a contiguous float32 matrix.
+
+    Rows are stored unit-normalized, so a query is a single matrix-vector
+    product followed by a partial sort. Capacity grows geometrically, and an
+    upsert of an existing key overwrites its row in place.
+    """
+
+    def __init__(self, dim: int):
+        require_numpy()
+        self.dim = dim
+        self.keys: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def upsert(self, keys: list[str], vectors: "np.ndarray") -> None:
+        """Insert or replace the vectors for ``keys``."""
+        vectors = normalize(np.array(vectors, dtype=np.float32, copy=True))
+        for key, vector in zip(keys, vectors):
+            row = self._rows.get(key)
+            if row is None:
+                row = len(self.keys)
+                if row == len(self._matrix):
+                    grown = np.zeros((max(2 * row, 1024), self.dim), dtype=np.float32)
+                    grown[:row] = self._matrix
+                    self._matrix = grown
+                self.keys.append(key)
+                self._rows[key] = row
+            self._matrix[row] = vector
+
+    def search(self, query: "np.ndarray", k: int) -> list[tuple[str, float]]:
+        """Return the ``k`` keys most similar to ``query`` as (key, cosine) pairs."""
+        n = len(self.keys)
+        if n == 0 or k <= 0:
+            return []
+        query = normalize(np.array(query, dtype=np.float32, copy=True).reshape(1, -1))[0]
+        scores = self._matrix[:n] @ query
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.keys[i], float(scores[i])) for i in top]
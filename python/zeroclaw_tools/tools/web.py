@@ -2,87 +2,464 @@
 Web-related tools: HTTP requests and web search.
 """
 
-import json
+import asyncio
+import codecs
+import hashlib
 import os
-import urllib.error
-import urllib.parse
-import urllib.request
+import re
+from collections.abc import AsyncIterator, Mapping
+from typing import Optional
 
-from langchain_core.tools import tool
+import httpx
+
+from .base import tool
+from .file import ReplacementFile
+from .http_cache import MAX_ENTRY_BYTES, HttpCache, cache_directives, get_http_cache
+from .html_text import FORMATS, HtmlExtractor, html_to_text, is_html
+from .http_client import host_slot, request_timeout
+from .search_backends import (
+    DEFAULT_DEADLINE,
+    SearchBackend,
+    get_search_backends,
+    search_backends,
+)
+from .search_cache import PartialResult, get_search_cache
+
+
+MAX_RESPONSE_CHARS = 100_000
+MAX_HTML_CHARS = 10_000_000
+MAX_FETCH_URLS = 50
+MAX_FETCH_BUDGET = 200_000
+FETCH_CONCURRENCY = 8
+_FILE_CHUNK = 256 * 1024
+_ERROR_BODY_CHARS = 1000
+
+
+def _parse_headers(headers: str) -> dict[str, str]:
+    """Parse a "Name: Value, Name2: Value2" header string."""
+    parsed = {}
+    for h in headers.split(","):
+        if ":" in h:
+            k, v = h.split(":", 1)
+            parsed[k.strip()] = v.strip()
+    return parsed
+
+
+async def _read_text(
+    resp: httpx.Response, max_chars: int, fmt: str = "raw", url: str = ""
+) -> tuple[str, bool]:
+    """
+    Stream and decode at most ``max_chars`` characters of the response body.
+
+    Content-Encoding is undone chunk by chunk as the body arrives, and reading
+    stops as soon as the budget is reached, so a huge body costs no more than
+    the part that is returned. With ``fmt`` "text" or "markdown", HTML is fed
+    through the extractor as it streams and the budget applies to the
+    extracted text. Returns the text and whether it was truncated.
+    """
+    decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+    content_type = resp.headers.get("content-type", "")
+    extractor: Optional[HtmlExtractor] = None
+    parts: list[str] = []
+    size = 0
+    async for chunk in resp.aiter_bytes():
+        text = decoder.decode(chunk)
+        if fmt != "raw" and size == 0 and extractor is None and is_html(content_type, text):
+            extractor = HtmlExtractor(markdown=fmt == "markdown", base_url=url)
+        size += len(text)
+        if extractor is not None:
+            extractor.feed(text)
+            if extractor.has_enough(max_chars) or size > MAX_HTML_CHARS:
+                text = extractor.text()
+                return text[:max_chars], True
+            continue
+        parts.append(text)
+        if size > max_chars:
+            return "".join(parts)[:max_chars], True
+    tail = decoder.decode(b"", final=True)
+    if extractor is not None:
+        extractor.feed(tail)
+        extractor.close()
+        text = extractor.text()
+    else:
+        text = "".join(parts) + tail
+    return text[:max_chars], len(text) > max_chars
+
+
+async def _read_bytes(resp: httpx.Response, max_bytes: int) -> tuple[bytes, bool]:
+    """Stream at most ``max_bytes`` decoded body bytes; returns them and whether the body ended."""
+    chunks: list[bytes] = []
+    size = 0
+    async for chunk in resp.aiter_bytes():
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > max_bytes:
+            return b"".join(chunks), False
+    return b"".join(chunks), True
+
+
+def _decode(
+    body: bytes, headers: Mapping[str, str], max_chars: int, fmt: str = "raw", url: str = ""
+) -> tuple[str, bool]:
+    """Decode a buffered body using the charset from its Content-Type."""
+    content_type = headers.get("content-type", "")
+    match = re.search(r"charset=[\"']?([\w.:-]+)", content_type, re.I)
+    try:
+        text = body.decode(match.group(1) if match else "utf-8", errors="replace")
+    except LookupError:
+        text = body.decode("utf-8", errors="replace")
+    if fmt != "raw" and is_html(content_type, text[:100]):
+        text = html_to_text(text, markdown=fmt == "markdown", base_url=url)
+    return text[:max_chars], len(text) > max_chars
+
+
+def _format_response(
+    status_code: int,
+    headers: Mapping[str, str],
+    text: str,
+    truncated: bool,
+    max_chars: int,
+    downloaded: int,
+    cache_state: str = "",
+) -> str:
+    """Render a response the way http_request reports it."""
+    if status_code >= 400:
+        return f"HTTP Error {status_code}: {text[:_ERROR_BODY_CHARS]}"
+    status = f"Status: {status_code}"
+    length = headers.get("content-length")
+    if length is not None:
+        status += f" (Content-Length: {length})"
+    if cache_state:
+        status += f" [{cache_state}]"
+    if truncated:
+        text += f"\n... (truncated at {max_chars} chars, {downloaded} bytes downloaded)"
+    return f"{status}\n{text}"
+
+
+async def _cached_get(
+    cache: HttpCache,
+    url: str,
+    req_headers: dict[str, str],
+    max_chars: int,
+    fmt: str,
+    timeout: Optional[float],
+) -> str:
+    """
+    Serve a GET from the HTTP cache, revalidating or refetching as needed.
+
+    Cache reads and writes touch SQLite and whole bodies, so they run on a thread.
+    """
+    directives = cache_directives(req_headers.get("Cache-Control", ""))
+    entry = await asyncio.to_thread(cache.lookup, url, req_headers)
+    if entry is not None and "no-cache" not in directives and cache.is_fresh(entry):
+        cache.record("hit")
+        text, truncated = _decode(entry.body, entry.headers, max_chars, fmt, url)
+        return _format_response(
+            entry.status, entry.headers, text, truncated, max_chars, 0, "cached"
+        )
+
+    conditional = dict(req_headers)
+    if entry is not None:
+        conditional.update(cache.validators(entry))
+    async with host_slot(url) as client:
+        async with client.stream(
+            "GET", url, headers=conditional, timeout=request_timeout(timeout)
+        ) as resp:
+            if resp.status_code == 304 and entry is not None:
+                entry = await asyncio.to_thread(cache.refresh, url, resp.headers) or entry
+                cache.record("revalidated")
+                text, truncated = _decode(entry.body, entry.headers, max_chars, fmt, url)
+                return _format_response(
+                    entry.status, entry.headers, text, truncated, max_chars, 0, "revalidated"
+                )
+            cache.record("miss")
+            body, complete = await _read_bytes(resp, MAX_ENTRY_BYTES)
+            downloaded = resp.num_bytes_downloaded
+    if complete:
+        await asyncio.to_thread(cache.store, url, req_headers, resp.status_code, resp.headers, body)
+    else:
+        await asyncio.to_thread(cache.invalidate, url)
+    text, truncated = _decode(body, resp.headers, max_chars, fmt, url)
+    return _format_response(
+        resp.status_code, resp.headers, text, truncated or not complete, max_chars, downloaded
+    )
+
+
+async def _file_chunks(path: str) -> AsyncIterator[bytes]:
+    """Read a file for upload one chunk at a time, off the event loop."""
+    f = await asyncio.to_thread(open, path, "rb")
+    try:
+        while chunk := await asyncio.to_thread(f.read, _FILE_CHUNK):
+            yield chunk
+    finally:
+        f.close()
+
+
+async def _save_body(resp: httpx.Response, path: str) -> tuple[int, str]:
+    """
+    Stream the response body into ``path``; returns its size and SHA-256.
+
+    The file is written through ``ReplacementFile`` on a worker thread, so an
+    interrupted download never leaves a partial file and disk I/O does not
+    hold up the event loop.
+    """
+    target = await asyncio.to_thread(ReplacementFile, path, suffix=".part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async for chunk in resp.aiter_bytes():
+            await asyncio.to_thread(target.write, chunk)
+            digest.update(chunk)
+            size += len(chunk)
+        await asyncio.to_thread(target.commit)
+    except BaseException:
+        target.discard()
+        raise
+    return size, digest.hexdigest()
+
+
+async def _request(
+    url: str,
+    method: str,
+    req_headers: dict[str, str],
+    body: str,
+    max_chars: int,
+    fmt: str,
+    no_cache: bool = False,
+    timeout: Optional[float] = None,
+    save_to: str = "",
+    body_file: str = "",
+) -> str:
+    """
+    Perform one request through the cache and pooled client; errors propagate.
+
+    ``timeout`` overrides the client's timeouts (see ``configure_http``) for this request.
+    """
+    cache = get_http_cache()
+    use_cache = (
+        cache is not None
+        and method == "GET"
+        and not (body or body_file or save_to or no_cache)
+        and "no-store" not in cache_directives(req_headers.get("Cache-Control", ""))
+    )
+    if use_cache:
+        return await _cached_get(cache, url, req_headers, max_chars, fmt, timeout)
+
+    content = body.encode() if body else None
+    if body_file:
+        req_headers = {"Content-Length": str(os.path.getsize(body_file)), **req_headers}
+        content = _file_chunks(body_file)
+
+    async with host_slot(url) as client:
+        async with client.stream(
+            method, url, headers=req_headers, content=content, timeout=request_timeout(timeout)
+        ) as resp:
+            if resp.is_error:
+                text, truncated = await _read_text(resp, _ERROR_BODY_CHARS)
+            elif save_to:
+                size, sha256 = await _save_body(resp, save_to)
+                text, truncated = f"Saved {size} bytes to {save_to} (sha256: {sha256})", False
+            else:
+                text, truncated = await _read_text(resp, max_chars, fmt, url)
+            downloaded = resp.num_bytes_downloaded
+    if cache is not None and method not in ("GET", "HEAD", "OPTIONS") and resp.is_success:
+        await asyncio.to_thread(cache.invalidate, url)
+    return _format_response(resp.status_code, resp.headers, text, truncated, max_chars, downloaded)
 
 
 @tool
-def http_request(url: str, method: str = "GET", headers: str = "", body: str = "") -> str:
+async def http_request(
+    url: str,
+    method: str = "GET",
+    headers: str = "",
+    body: str = "",
+    max_chars: int = 5000,
+    format: str = "raw",
+    no_cache: bool = False,
+    save_to: str = "",
+    body_file: str = "",
+) -> str:
     """
     Make an HTTP request to a URL.
 
+    The body is streamed and decompressed on the fly, and reading stops once
+    ``max_chars`` characters have been received. When the HTTP cache is
+    enabled, GET responses are cached and revalidated per their Cache-Control,
+    ETag and Last-Modified headers. Use save_to and body_file to move large
+    payloads between disk and the network without passing them through here.
+
+    Use format="text" or "markdown" for web pages: scripts, navigation and
+    other page chrome are stripped so the budget goes to the actual content.
+
     Args:
         url: The URL to request
         method: HTTP method (GET, POST, PUT, DELETE, etc.)
         headers: Comma-separated headers in format "Name: Value, Name2: Value2"
         body: Request body for POST/PUT requests
+        max_chars: Maximum number of body characters to return (capped at 100000)
+        format: "raw" for the body as-is, or "text"/"markdown" to extract readable
+            content from HTML responses (other content types are returned raw)
+        no_cache: Skip the HTTP cache and always fetch from the network
+        save_to: Stream the response body into this file instead of returning it;
+            the result reports its size and SHA-256
+        body_file: Stream the request body from this file instead of ``body``
 
     Returns:
-        The response status and body
+        The response status and body, with the Content-Length when the server
+        sent one and a note when the body was truncated or served from cache
     """
+    if format not in FORMATS:
+        return f"Error: format must be one of {', '.join(FORMATS)}"
+    if body and body_file:
+        return "Error: Pass either body or body_file, not both"
+    if body_file and not os.path.isfile(body_file):
+        return f"Error: File not found: {body_file}"
+    max_chars = min(max(max_chars, 1), MAX_RESPONSE_CHARS)
     try:
-        req_headers = {"User-Agent": "ZeroClaw/1.0"}
-        if headers:
-            for h in headers.split(","):
-                if ":" in h:
-                    k, v = h.split(":", 1)
-                    req_headers[k.strip()] = v.strip()
-
-        data = body.encode() if body else None
-        req = urllib.request.Request(url, data=data, headers=req_headers, method=method.upper())
-
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            body_text = resp.read().decode("utf-8", errors="replace")
-            return f"Status: {resp.status}\n{body_text[:5000]}"
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode("utf-8", errors="replace")[:1000]
-        return f"HTTP Error {e.code}: {error_body}"
+        return await _request(
+            url,
+            method.upper(),
+            _parse_headers(headers),
+            body,
+            max_chars,
+            format,
+            no_cache,
+            save_to=save_to,
+            body_file=body_file,
+        )
     except Exception as e:
         return f"Error: {e}"
 
 
+async def _fetch_one(url: str, max_chars: int, fmt: str, timeout: float) -> str:
+    """Fetch one URL for http_fetch_many, turning failures into error text."""
+    try:
+        return await asyncio.wait_for(
+            _request(url, "GET", {}, "", max_chars, fmt, timeout=timeout), timeout
+        )
+    except asyncio.TimeoutError:
+        return f"Error: Timed out after {timeout:g}s"
+    except Exception as e:
+        return f"Error: {e or type(e).__name__}"
+
+
 @tool
-def web_search(query: str) -> str:
+async def http_fetch_many(
+    urls: list[str],
+    per_url_budget: int = 5000,
+    total_budget: int = 50_000,
+    format: str = "raw",
+    timeout: float = 15,
+) -> str:
     """
-    Search the web using Brave Search API.
+    Fetch several URLs concurrently in one call.
 
-    Requires BRAVE_API_KEY environment variable to be set.
+    Results come back in the given order, each under a "=== url ===" header.
+    A URL that fails or times out reports its error without affecting the
+    others. Use this instead of repeated http_request calls when researching.
 
     Args:
-        query: The search query
+        urls: The URLs to GET (at most 50)
+        per_url_budget: Maximum body characters returned per URL
+        total_budget: Maximum body characters returned across all URLs (capped at 200000)
+        format: "raw", "text" or "markdown" (see http_request)
+        timeout: Seconds allowed for each URL, including reading the body
 
     Returns:
-        Search results as formatted text
+        The responses with per-URL headers
     """
-    api_key = os.environ.get("BRAVE_API_KEY", "")
-    if not api_key:
-        return "Error: BRAVE_API_KEY environment variable not set. Get one at https://brave.com/search/api/"
+    if not urls:
+        return "Error: No URLs given"
+    if len(urls) > MAX_FETCH_URLS:
+        return f"Error: At most {MAX_FETCH_URLS} URLs per call"
+    if format not in FORMATS:
+        return f"Error: format must be one of {', '.join(FORMATS)}"
 
-    try:
-        encoded_query = urllib.parse.quote(query)
-        url = f"https://api.search.brave.com/res/v1/web/search?q={encoded_query}"
+    budget = min(max(total_budget, 0), MAX_FETCH_BUDGET)
+    limit = min(max(per_url_budget, 1), MAX_RESPONSE_CHARS, max(budget, 1))
+    slots = asyncio.Semaphore(FETCH_CONCURRENCY)
 
-        req = urllib.request.Request(
-            url, headers={"Accept": "application/json", "X-Subscription-Token": api_key}
-        )
+    async def fetch(url: str) -> str:
+        async with slots:
+            return await _fetch_one(url, limit, format, timeout)
+
+    results = await asyncio.gather(*(fetch(url) for url in urls))
+
+    sections = []
+    for url, result in zip(urls, results):
+        if budget <= 0:
+            sections.append(f"=== {url} ===\n(skipped, total budget exhausted)")
+            continue
+        status, _, text = result.partition("\n")
+        text = text[:budget]
+        budget -= len(text)
+        sections.append(f"=== {url} ===\n{status}" + (f"\n{text}" if text else ""))
+
+    if budget <= 0:
+        sections.append("... (total budget exhausted)")
+    return "\n".join(sections)
+
+
+SEARCH_RESULTS = 5
 
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read().decode())
-            results = []
 
-            for item in data.get("web", {}).get("results", [])[:5]:
-                title = item.get("title", "No title")
-                url_link = item.get("url", "")
-                desc = item.get("description", "")[:200]
-                results.append(f"- {title}\n  {url_link}\n  {desc}")
+def _env_seconds(name: str, default: Optional[float]) -> Optional[float]:
+    value = os.environ.get(name, "").strip()
+    return float(value) if value else default
 
-            if not results:
-                return "No results found"
-            return "\n\n".join(results)
+
+async def _search(query: str, backends: list[SearchBackend]) -> str:
+    """Query the backends and format the merged top results."""
+    results, problems = await search_backends(
+        backends,
+        query,
+        count=SEARCH_RESULTS,
+        deadline=_env_seconds("ZEROCLAW_SEARCH_DEADLINE", DEFAULT_DEADLINE),
+        hedge_after=_env_seconds("ZEROCLAW_SEARCH_HEDGE_AFTER", None),
+    )
+    if not results and problems:
+        raise RuntimeError(f"No search backend answered ({'; '.join(problems)})")
+
+    formatted = [f"- {r.title}\n  {r.url}\n  {r.description[:200]}" for r in results]
+    if not formatted:
+        return "No results found"
+    if problems:
+        formatted.append(f"(partial results: {'; '.join(problems)})")
+        return PartialResult("\n\n".join(formatted))
+    return "\n\n".join(formatted)
+
+
+@tool
+async def web_search(query: str) -> str:
+    """
+    Search the web.
+
+    Uses the configured backends: Brave Search (BRAVE_API_KEY) and/or a
+    SearXNG instance (SEARXNG_URL). Results from several backends are merged
+    and de-duplicated. Results are cached for a while, so repeating a query
+    is cheap.
+
+    Args:
+        query: The search query
+
+    Returns:
+        Search results as formatted text
+    """
+    backends = get_search_backends()
+    if not backends:
+        return (
+            "Error: No search backend configured. Set BRAVE_API_KEY "
+            "(get one at https://brave.com/search/api/) or SEARXNG_URL."
+        )
+
+    try:
+        return await get_search_cache().get_or_fetch(
+            query,
+            lambda: _search(query, backends),
+            backends=[b.name for b in backends],
+            count=SEARCH_RESULTS,
+        )
+    except httpx.HTTPStatusError as e:
+        return f"Error: HTTP {e.response.status_code} from search API"
     except Exception as e:
         return f"Error: {e}"